@@ -0,0 +1,143 @@
+"""
+Benchmark of the vectorised backcast engine.
+
+Checks `backcast` against a per-period loop of the backcast recursion for quarterly
+and monthly data with several drivers, and against the Cumulative Growth of the
+loops the Model Evaluation page used before, over the periods where those loops
+chain the right factors (one driver, quarterly data, the two years before the base
+year). Then times the engine against those loops. Run from the repository root:
+
+    python benchmarks/backcast_engine.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from apppages.utils.backcast_engine import (  # noqa: E402
+    CUMULATIVE,
+    PREDICTED,
+    backcast,
+)
+
+FREQUENCIES = {4: "Q", 12: "M"}
+
+
+def make_problem(n_years, prd, n_drivers, seed=0):
+    """Build a dependent series, driver growth factors and elasticities."""
+    rng = np.random.default_rng(seed)
+    index = pd.period_range("1990-01", periods=n_years * prd, freq=FREQUENCIES[prd])
+    y = pd.Series(rng.uniform(1000, 2000, len(index)), index=index, name="y:Traffic")
+    columns = [f"g: x:v{i}" for i in range(n_drivers)]
+    factors = pd.DataFrame(
+        rng.uniform(0.95, 1.08, (len(index), n_drivers)), index=index, columns=columns
+    )
+    # Growth over a year is only available from the second year on
+    factors = factors.iloc[prd:]
+    elasticities = pd.Series(rng.uniform(0.2, 1.2, n_drivers), index=columns)
+    return y, factors, elasticities
+
+
+def reference_backcast(y, factors, elasticities, step):
+    """Backcast one period at a time, y_hat[t] = y_hat[t + step] / m[t + step]."""
+    growth = (factors.reindex(y.index) ** elasticities).prod(axis=1, skipna=False)
+    growth = growth.to_numpy()
+    predicted = y.to_numpy(dtype=float).copy()
+    for t in range(len(y) - step - 1, -1, -1):
+        predicted[t] = predicted[t + step] / growth[t + step]
+    return predicted
+
+
+def legacy_backcast(y, factors, elasticities):
+    """The Cumulative Growth and Predicted y loops of the old Model Evaluation page."""
+    prd = 4
+    drivers = list(factors.columns)
+    elast_df = factors**elasticities
+    bc_df = pd.DataFrame(data=elast_df.shift(periods=-prd), index=y.index)
+    bc_df[:prd] = elast_df[:prd]
+    bc_df["Cumulative Growth"] = None
+    bc_df.loc[bc_df.index[-prd:], "Cumulative Growth"] = 1
+    for col in drivers:
+        bc_df.loc[bc_df.index[-prd:], col] = 1
+    df_reset = bc_df.reset_index()
+    for col in drivers:
+        for i in range(len(bc_df) - 5, -1, -4):
+            df_reset.loc[i, "Cumulative Growth"] = (
+                df_reset.loc[i, col] * df_reset.loc[i + 4, col]
+            )
+            df_reset.loc[i - 1, "Cumulative Growth"] = (
+                df_reset.loc[i - 1, col] * df_reset.loc[i + 3, col]
+            )
+            df_reset.loc[i - 2, "Cumulative Growth"] = (
+                df_reset.loc[i - 2, col] * df_reset.loc[i + 2, col]
+            )
+            df_reset.loc[i - 3, "Cumulative Growth"] = (
+                df_reset.loc[i - 3, col] * df_reset.loc[i + 1, col]
+            )
+    df_reset["Predicted y"] = None
+    for i in range(0, len(bc_df)):
+        df_reset.loc[i, "Predicted y"] = (
+            df_reset.loc[i, "Cumulative Growth"] * y.iloc[i]
+        )
+    df_reset["Predicted y"] = df_reset["Predicted y"].astype(float)
+    return df_reset.set_index("index")
+
+
+def check_engine():
+    """Assert that the engine matches the loop recursion and the legacy loops."""
+    for prd, n_drivers in [(4, 3), (12, 2)]:
+        y, factors, elasticities = make_problem(12, prd, n_drivers)
+        out = backcast(y, factors, elasticities, step=prd)
+        expected = reference_backcast(y, factors, elasticities, prd)
+        np.testing.assert_allclose(out[PREDICTED].to_numpy(), expected, rtol=1e-12)
+
+    # The legacy loops chain at most two years of growth of the last driver
+    y, factors, elasticities = make_problem(12, 4, 1)
+    out = backcast(y, factors, elasticities, step=4)
+    legacy = legacy_backcast(y, factors, elasticities)
+    recent = slice(-12, None)
+    np.testing.assert_allclose(
+        out[CUMULATIVE].to_numpy()[recent],
+        legacy["Cumulative Growth"].to_numpy(dtype=float)[recent],
+        rtol=1e-12,
+    )
+    print(
+        "backcast matches the per-period recursion, and the legacy Cumulative Growth "
+        "over the two years before the base year.\n"
+    )
+
+
+def best_of(func, repeats=5):
+    """Return the best wall-clock time of `repeats` calls to `func`."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    check_engine()
+    print(
+        f"{'timeline':>10} {'periods':>8} {'drivers':>8} {'legacy ms':>10} "
+        f"{'engine ms':>10} {'speed-up':>9}"
+    )
+    for n_years, prd, n_drivers in [(12, 4, 3), (40, 4, 3), (40, 12, 3), (40, 12, 10)]:
+        y, factors, elasticities = make_problem(n_years, prd, n_drivers)
+        # The legacy loops step through quarters whatever the data's frequency
+        legacy = best_of(lambda: legacy_backcast(y, factors, elasticities), 2)
+        engine = best_of(lambda: backcast(y, factors, elasticities, step=prd))
+        print(
+            f"{FREQUENCIES[prd]:>10} {len(y):>8} {n_drivers:>8} {1000 * legacy:>10.1f} "
+            f"{1000 * engine:>10.2f} {legacy / engine:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of the growth transform.
+
+Compares `growth_transform` with the column-by-column loop that `growth_df` used
+before, on synthetic monthly panels of increasing width, and checks that both give
+the same growth factors. Run from the repository root:
+
+    python benchmarks/growth_transform.py
+"""
+
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from apppages.utils.transforms import growth_transform  # noqa: E402
+
+TYPES = ("abs", "pct_change", "pct_val_or_dummy")
+
+
+def legacy_growth_df(df, var_dict, prd=12):
+    """The previous column-by-column implementation, without the Streamlit state."""
+    df = df.copy()
+    # The repeated column inserts are what made the old loop slow on wide panels
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+    for df_col in df.columns:
+        var_type = var_dict[df_col[2:]]
+        if var_type == "abs":
+            df["g: " + df_col] = df[df_col].pct_change(periods=prd) + 1
+        elif var_type == "pct_val_or_dummy":
+            df["g: " + df_col] = np.exp(df[df_col] - df[df_col].shift(prd))
+        elif var_type == "pct_change":
+            df["g: " + df_col] = df[df_col] + 1
+    g_cols = [c for c in df.columns if c.startswith("g:")]
+    return df[g_cols].dropna(how="all")
+
+
+def make_panel(n_periods, n_vars, seed=0):
+    """Build a random monthly panel with a mix of variable types."""
+    rng = np.random.default_rng(seed)
+    names = [f"{'y' if i % 4 == 0 else 'x'}:v{i}" for i in range(n_vars)]
+    var_dict = {name[2:]: TYPES[i % len(TYPES)] for i, name in enumerate(names)}
+    index = pd.period_range("1990-01", periods=n_periods, freq="M")
+    values = 100 + rng.standard_normal((n_periods, n_vars)).cumsum(axis=0)
+    return pd.DataFrame(values, index=index, columns=names), var_dict
+
+
+def best_of(func, repeats=5):
+    """Return the best wall-clock time of `repeats` calls to `func`."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(
+        f"{'periods':>8} {'variables':>9} {'legacy s':>10} {'new s':>10} {'speed-up':>9}"
+    )
+    for n_periods, n_vars in [(480, 50), (480, 500), (480, 2000), (1200, 2000)]:
+        df, var_dict = make_panel(n_periods, n_vars)
+        expected = legacy_growth_df(df, var_dict)
+        pd.testing.assert_frame_equal(growth_transform(df, var_dict), expected)
+        legacy = best_of(lambda: legacy_growth_df(df, var_dict), repeats=2)
+        new = best_of(lambda: growth_transform(df, var_dict))
+        print(
+            f"{n_periods:>8} {n_vars:>9} {legacy:>10.4f} {new:>10.4f} "
+            f"{legacy / new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
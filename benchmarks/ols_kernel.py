@@ -0,0 +1,113 @@
+"""
+Benchmark of the lean OLS kernel.
+
+Compares `fit_ols` with the path the Regression Control page used on every rerun,
+`sm.OLS(y, X).fit()` followed by `model.summary()`, and with the statsmodels fit on
+its own. Before timing, it checks that every statistic the kernel returns matches
+statsmodels on random models with and without a constant, including the HC3 and HAC
+standard errors. Run from the repository root:
+
+    python benchmarks/ols_kernel.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from statsmodels.stats.stattools import durbin_watson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from apppages.utils.ols import fit_ols  # noqa: E402
+
+# Kernel key to the matching statsmodels results attribute
+STATSMODELS_NAMES = {
+    "params": "params",
+    "bse": "bse",
+    "tvalues": "tvalues",
+    "pvalues": "pvalues",
+    "r2": "rsquared",
+    "adj_r2": "rsquared_adj",
+    "aic": "aic",
+    "bic": "bic",
+    "nobs": "nobs",
+    "df_resid": "df_resid",
+}
+
+
+def make_model(n_periods, n_drivers, seed=0):
+    """Build random quarterly growth factors with a known linear relationship."""
+    rng = np.random.default_rng(seed)
+    index = pd.period_range("1990Q1", periods=n_periods, freq="Q")
+    X = pd.DataFrame(
+        1 + rng.normal(0, 0.02, (n_periods, n_drivers)),
+        index=index,
+        columns=[f"g: x:v{i}" for i in range(n_drivers)],
+    )
+    y = 0.3 + X @ rng.normal(0.5, 0.3, n_drivers) + rng.normal(0, 0.01, n_periods)
+    return y.rename("g: y:traffic"), X
+
+
+def statsmodels_fit(y, X, constant, cov_type="nonrobust", cov_kwds=None):
+    """Fit the model the way the page used to."""
+    exog = sm.add_constant(X, prepend=False) if constant else X
+    return sm.OLS(y, exog).fit(cov_type=cov_type, cov_kwds=cov_kwds)
+
+
+def check_against_statsmodels():
+    """Assert that the kernel reproduces statsmodels on a range of models."""
+    for seed, (n_periods, n_drivers) in enumerate([(44, 1), (44, 3), (120, 8)]):
+        y, X = make_model(n_periods, n_drivers, seed)
+        for constant in (True, False):
+            fit = fit_ols(y, X, constant)
+            model = statsmodels_fit(y, X, constant)
+            assert fit["names"] == list(model.params.index)
+            for key, attribute in STATSMODELS_NAMES.items():
+                np.testing.assert_allclose(
+                    fit[key], getattr(model, attribute), rtol=1e-9, err_msg=key
+                )
+            np.testing.assert_allclose(
+                fit["durbin_watson"], durbin_watson(model.resid), rtol=1e-9
+            )
+            for cov_type, cov_kwds in [("HC3", None), ("HAC", {"maxlags": 3})]:
+                robust = fit_ols(y, X, constant, cov_type, 3)
+                model = statsmodels_fit(y, X, constant, cov_type, cov_kwds)
+                for key in ("bse", "pvalues"):
+                    np.testing.assert_allclose(
+                        robust[key], getattr(model, key), rtol=1e-7, err_msg=cov_type
+                    )
+    print("fit_ols matches statsmodels OLS on every statistic.\n")
+
+
+def best_of(func, repeats=20):
+    """Return the best wall-clock time of `repeats` calls to `func`."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    check_against_statsmodels()
+    print(
+        f"{'periods':>8} {'drivers':>8} {'fit+summary ms':>15} {'fit ms':>8} "
+        f"{'kernel ms':>10} {'speed-up':>9}"
+    )
+    for n_periods, n_drivers in [(44, 2), (44, 6), (200, 10), (1000, 20)]:
+        y, X = make_model(n_periods, n_drivers)
+        page = best_of(lambda: statsmodels_fit(y, X, True).summary())
+        fit_only = best_of(lambda: statsmodels_fit(y, X, True))
+        kernel = best_of(lambda: fit_ols(y, X, True))
+        print(
+            f"{n_periods:>8} {n_drivers:>8} {1000 * page:>15.2f} "
+            f"{1000 * fit_only:>8.2f} {1000 * kernel:>10.2f} {page / kernel:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
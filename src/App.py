@@ -54,14 +54,20 @@ def initialise_session_state():
         )
     if "df" not in st.session_state:
         st.session_state.df = None
+    if "df_hashes" not in st.session_state:
+        st.session_state.df_hashes = {}
     if "df_index" not in st.session_state:
         st.session_state.df_index = None
+    if "panel_df" not in st.session_state:
+        st.session_state.panel_df = None
+    if "panel_report" not in st.session_state:
+        st.session_state.panel_report = None
     if "g_df_idx" not in st.session_state:
         st.session_state.g_df_idx = None
     if "var_dict" not in st.session_state:
         st.session_state.var_dict = {}
     if "prd_dict" not in st.session_state:
-        st.session_state.prd_dict = {"Monthly": 12, "Quarterly": 4, "Yearly": 12}
+        st.session_state.prd_dict = {"Monthly": 12, "Quarterly": 4, "Yearly": 1}
     if "y_sel" not in st.session_state:
         st.session_state.y_sel = []
     if "x_sel" not in st.session_state:
@@ -72,14 +78,42 @@ def initialise_session_state():
         st.session_state.x_sel_g = []
     if "g_df" not in st.session_state:
         st.session_state.g_df = None
+    if "growth_tensor" not in st.session_state:
+        st.session_state.growth_tensor = None
+    if "growth_settings" not in st.session_state:
+        st.session_state.growth_settings = {
+            "horizons": None,
+            "log": False,
+            "float32": False,
+        }
+    if "horizon" not in st.session_state:
+        st.session_state.horizon = None
     if "r_df" not in st.session_state:
         st.session_state.r_df = None
     if "bc_df" not in st.session_state:
         st.session_state.bc_df = None
     if "bc_plot_df" not in st.session_state:
         st.session_state.bc_plot_df = None
+    if "search_results" not in st.session_state:
+        st.session_state.search_results = None
+    if "search_report" not in st.session_state:
+        st.session_state.search_report = None
+    if "design_terms" not in st.session_state:
+        st.session_state.design_terms = {
+            "seasonal": False,
+            "trend": 0,
+            "steps": (),
+            "pulses": (),
+            "breaks": (),
+        }
+    if "design_columns" not in st.session_state:
+        st.session_state.design_columns = []
+    if "penalised_results" not in st.session_state:
+        st.session_state.penalised_results = None
     if "model_params" not in st.session_state:
         st.session_state.model_params = []
+    if "model_intervals" not in st.session_state:
+        st.session_state.model_intervals = None
 
 
 def main():
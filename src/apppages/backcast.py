@@ -1,19 +1,25 @@
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from apppages.utils.streamlit_tools import stringify
+from apppages.utils.backcast_engine import backcast
+from apppages.utils.bootstrap import matches_model
+from apppages.utils.streamlit_tools import (
+    select_growth_horizon,
+    stored_models_section,
+    stringify,
+)
+from apppages.utils.timeline import periods_per_year, with_period_labels
+from apppages.utils.transforms import horizon_label
 
 
 def main():
-    # 4 for quarterly data
-    prd = st.session_state.prd_dict["Quarterly"]
-
-    print(prd)
     st.set_page_config(page_title="Backcast")
     st.sidebar.success(
         "In this page, the user will use the linear regression coefficients to backcast traffic"
     )
     st.header("Backcast traffic based on regression coefficients")
+    # Models fitted earlier on these inputs, e.g. before a browser refresh
+    stored_models_section()
 
     # x_cols = [x for x in st.session_state.df.columns if x[0] == "x"]
     y_cols = [y for y in st.session_state.df.columns if y[0] == "y"]
@@ -50,6 +56,13 @@ def main():
     test_df = pd.DataFrame(st.session_state.model_params)
     # st.dataframe(test_df)
     edited_df = st.data_editor(test_df, num_rows="dynamic")
+    # Bootstrap intervals are only shown while they belong to the unedited model
+    if matches_model(st.session_state.model_intervals, st.session_state.model_params):
+        st.caption(
+            f"{st.session_state.model_intervals.attrs['level']:.0%} block-bootstrap "
+            "confidence intervals of the elasticities:"
+        )
+        st.dataframe(st.session_state.model_intervals)
     # print(edited_df)
     # print(base_year_start)
     # print('original df: ',st.session_state.df[st.session_state.x_sel][:base_year_start])
@@ -58,78 +71,49 @@ def main():
     # print(st.session_state.g_df.columns)
     st.header("Base year data:")
     st.dataframe(
-        st.session_state.df[st.session_state.y_sel][base_year_start : base_year_end + 1]
+        with_period_labels(
+            st.session_state.df[[st.session_state.y_sel]].iloc[
+                base_year_start : base_year_end + 1
+            ]
+        )
     )
     st.header("Growth rates:")
-    # growth rate of GDP
-    elast_df = (
-        st.session_state.g_df[st.session_state.x_sel_g]
-        ** edited_df[st.session_state.x_sel_g].iloc[0][st.session_state.x_sel_g]
+    # Switching horizon only slices the growth tensor built on the regression page
+    horizon = select_growth_horizon(
+        st.session_state.growth_tensor, key="backcast_horizon"
     )
-    st.dataframe(elast_df)
-    # st.write(edited_df[st.session_state.x_sel_g].iloc[0][st.session_state.x_sel_g])
-    st.header("Backcast:")
-    st.session_state.bc_df = pd.DataFrame(
-        data=elast_df.shift(periods=-prd), index=st.session_state.df.index
+    g_df = st.session_state.growth_tensor.frame(horizon, factors=True)
+    params = edited_df.iloc[0]
+    drivers = [x for x in st.session_state.x_sel_g if x in params.index]
+    # Generated terms are not growth factors of the data; they are taken as fitted
+    terms = [x for x in drivers if x not in g_df.columns]
+    factors = [x for x in drivers if x in g_df.columns]
+    st.caption(
+        f"Each period is backcast from the same phase of the base year, chaining "
+        f"growth over {horizon_label(horizon, periods_per_year(g_df.index))}."
     )
-    # print(st.session_state.bc_df[:prd])
-    st.session_state.bc_df[:prd] = elast_df[:prd]
-    st.session_state.bc_df["Cumulative Growth"] = None
-    # set the final four timesteps to one #to-do: this needs to be more flexible
-    st.session_state.bc_df.loc[
-        st.session_state.bc_df.index[-prd:], "Cumulative Growth"
-    ] = 1
-
-    # print(len(st.session_state.bc_df))
-    # print('GDP col:', st.session_state.x_sel_g)
-    for col in st.session_state.x_sel_g:
-        print(col)
-        st.session_state.bc_df.loc[st.session_state.bc_df.index[-prd:], col] = 1
-    df_reset = st.session_state.bc_df.reset_index()
-
-    for col in st.session_state.x_sel_g:
-        for i in range(len(st.session_state.bc_df) - 5, -1, -4):
-            df_reset.loc[i, "Cumulative Growth"] = (
-                df_reset.loc[i, col] * df_reset.loc[i + 4, col]
-            )
-            df_reset.loc[i - 1, "Cumulative Growth"] = (
-                df_reset.loc[i - 1, col] * df_reset.loc[i + 3, col]
-            )
-            df_reset.loc[i - 2, "Cumulative Growth"] = (
-                df_reset.loc[i - 2, col] * df_reset.loc[i + 2, col]
-            )
-            df_reset.loc[i - 3, "Cumulative Growth"] = (
-                df_reset.loc[i - 3, col] * df_reset.loc[i + 1, col]
-            )
-        # df_reset.loc[i, 'Cumulative Growth'] =
-        #   df_reset.loc[i, 'g: x:GDP'] * df_reset.loc[i + 4, 'g: x:GDP']
-        # df_reset.loc[i - 1, 'Cumulative Growth'] =
-        #   df_reset.loc[i - 1, 'g: x:GDP'] * df_reset.loc[i + 3, 'g: x:GDP']
-        # df_reset.loc[i - 2, 'Cumulative Growth'] =
-        #   df_reset.loc[i - 2, 'g: x:GDP'] * df_reset.loc[i + 2, 'g: x:GDP']
-        # df_reset.loc[i - 3, 'Cumulative Growth'] =
-        #   df_reset.loc[i - 3, 'g: x:GDP'] * df_reset.loc[i + 1, 'g: x:GDP']
-    st.session_state.bc_df = df_reset
-    # st.dataframe(st.session_state.bc_df)
-    # calcs for back casting
-    df_reset["Predicted y"] = None
-    for i in range(0, len(st.session_state.bc_df)):
-        df_reset.loc[i, "Predicted y"] = (
-            df_reset.loc[i, "Cumulative Growth"]
-            * st.session_state.df[st.session_state.y_sel][i]
-        )
-    df_reset["Predicted y"] = df_reset["Predicted y"].astype(float)
-    st.session_state.bc_df = st.session_state.bc_df.set_index("index")
+    st.session_state.bc_df = backcast(
+        st.session_state.df[st.session_state.y_sel],
+        g_df[factors],
+        params[factors],
+        step=horizon,
+        base_end=base_year_end,
+        terms=st.session_state.g_df[terms],
+        coefficients=params[terms],
+    )
+    # Driver growth raised to its elasticity
+    st.dataframe(with_period_labels(st.session_state.bc_df[factors].dropna(how="all")))
+    st.header("Backcast:")
     st.session_state.bc_df[st.session_state.y_sel] = st.session_state.df[
         st.session_state.y_sel
     ]
-    st.dataframe(st.session_state.bc_df)
+    st.dataframe(with_period_labels(st.session_state.bc_df))
     # visualise_data(st.session_state.bc_plot_df,0,len(st.session_state.bc_plot_df)-1)
     # to-do: Either modify the visualise_data function to be more flexbile (e.g. add input title)
     #   or create a new visualisation funciton
-    st.session_state.bc_plot_df = st.session_state.bc_df[
-        ["Predicted y", st.session_state.y_sel]
-    ]
+    st.session_state.bc_plot_df = with_period_labels(
+        st.session_state.bc_df[["Predicted y", st.session_state.y_sel]]
+    )
     fig = px.line(
         st.session_state.bc_plot_df,
         x=st.session_state.bc_plot_df.index,
@@ -19,7 +19,7 @@ Modules:
 
 from pathlib import Path
 import streamlit as st
-from apppages.utils.excel import create_input_template  # pylint: disable=import-error
+from apppages.utils.excel import write_input_template  # pylint: disable=import-error
 
 
 def delete_x_y_variable(var_type, var_name):
@@ -153,6 +153,10 @@ def main():
     file_name = st.text_input(
         "Enter the file name (without quotes):", value=f"{project} Regression Inputs"
     )
+    write_only = st.checkbox(
+        "Fast generation (recommended for long timelines or many variables)",
+        value=True,
+    )
 
     # Button to generate Excel template
     if st.button("Generate Excel Template"):
@@ -176,13 +180,14 @@ def main():
                     f"The folder path '{output_folder_path}' does not exist."
                 )
 
-            create_input_template(
+            write_input_template(
                 name_variables,
                 st.session_state.y_vars,
                 st.session_state.x_vars,
                 timeline_inputs,
                 file_name,
                 output_folder_path,
+                write_only=write_only,
             )
             st.success("Excel template generated successfully!")
             inputs_file_path = output_folder / f"{file_name}.xlsx"
@@ -7,7 +7,10 @@ data in both table and chart formats.
 """
 
 import streamlit as st
-from apppages.utils.excel import spreadsheet_to_df
+from apppages.utils.batch import load_templates
+from apppages.utils.readers import read_input_file, template_to_parquet, READERS
+from apppages.utils.reload import apply_reload
+from apppages.utils.validation import InputValidationError
 from apppages.utils.streamlit_tools import visualise_data, create_and_show_df, stringify
 
 DEFAULT_FILE_PATH_FOR_TESTING = (
@@ -33,13 +36,46 @@ def main():
         "Enter the full file path (without quotes):",
         value=st.session_state.inputs_file_path,
         # value=DEFAULT_FILE_PATH_FOR_TESTING, # use this when testing
+        help=f"Supported file types: {', '.join(sorted(READERS))}",
     )
 
-    if st.button("Read spreadsheet"):
-        st.session_state.df, st.session_state.df_index, st.session_state.var_dict = (
-            spreadsheet_to_df(input_file_path)
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button("Read spreadsheet"):
+            try:
+                reload = apply_reload(
+                    st.session_state, *read_input_file(input_file_path)
+                )
+                st.session_state.inputs_file_path = input_file_path
+                show_reload_summary(reload)
+            except InputValidationError as validation_error:
+                st.error(f"{validation_error}. Fix the cells listed below and reload.")
+                st.dataframe(validation_error.report, hide_index=True)
+            except ValueError as val_error:
+                st.error(f"Value error: {val_error}")
+    with col2:
+        if st.button("Save a Parquet copy for faster reloads"):
+            try:
+                parquet_path = template_to_parquet(input_file_path)
+                st.success(f"Saved {parquet_path}")
+            except ValueError as val_error:
+                st.error(f"Value error: {val_error}")
+
+    with st.expander("Load a folder of completed templates"):
+        batch_source = st.text_input(
+            "Enter a folder path or glob pattern (e.g. C:\\inputs\\*.xlsx):",
+            key="batch_source",
         )
-        st.session_state.inputs_file_path = input_file_path
+        if st.button("Read all templates"):
+            st.session_state.panel_df, st.session_state.panel_report = load_templates(
+                batch_source
+            )
+        if st.session_state.panel_report is not None:
+            failed = st.session_state.panel_report["error"].notna().sum()
+            if failed:
+                st.warning(f"{failed} template(s) could not be read.")
+            st.dataframe(st.session_state.panel_report)
+            st.dataframe(st.session_state.panel_df)
 
     if st.session_state.df is not None:
         st.header("Filter Timeline:")
@@ -95,6 +131,37 @@ def main():
                 )
 
 
+def show_reload_summary(reload: dict) -> None:
+    """
+    Report which variables changed since the previous load and what was recomputed.
+
+    Args:
+        reload (dict): The summary returned by `apply_reload`.
+
+    Returns:
+        None
+    """
+    if reload["full_reload"]:
+        st.success("Inputs loaded.")
+        return
+    changes = {
+        key: reload[key] for key in ("changed", "added", "removed") if reload[key]
+    }
+    if not changes:
+        st.success("No variables changed since the last load; results were kept.")
+        return
+    st.info(
+        "; ".join(
+            f"{key.capitalize()}: {', '.join(cols)}" for key, cols in changes.items()
+        )
+        + ". Growth rates were recomputed for these variables only."
+    )
+    if reload["invalidated"]:
+        st.warning(
+            "The selected regression or backcast used a changed variable and must be rerun."
+        )
+
+
 def data_selection_buttons(
     slider_value_start: int,
     slider_value_end: int,
@@ -6,9 +6,41 @@ It allows users to define dependent and independent variables, choose a time ran
 regression results.
 """
 
+import pandas as pd
+import plotly.express as px
 import streamlit as st
 import statsmodels.api as sm
-from apppages.utils.streamlit_tools import growth_df, stringify_g_df, create_and_show_df
+from apppages.utils.breaks import TRIM, break_scan, sup_f_critical_value
+from apppages.utils.bootstrap import (
+    block_bootstrap_ols,
+    default_block_length,
+    matches_model,
+)
+from apppages.utils.cross_validation import SCHEMES, cross_validate
+from apppages.utils.design import add_design_terms
+from apppages.utils.lag_search import base_column, best_lag_structures
+from apppages.utils.model_search import CRITERIA, CV_CRITERIA, METHODS, best_subsets
+from apppages.utils.model_store import fit_or_load, params_dict
+from apppages.utils.ols import (
+    CONSTANT,
+    COV_TYPES,
+    FIT_COLUMNS,
+    default_maxlags,
+    fit_multi_ols,
+    robust_inference,
+)
+from apppages.utils.regularisation import PENALTIES, penalised_models
+from apppages.utils.rolling import MODES, rolling_ols
+from apppages.utils.streamlit_tools import (
+    create_and_show_df,
+    growth_settings,
+    select_growth_horizon,
+    select_model,
+    session_cached,
+    session_model_spec,
+    stringify_g_df,
+)
+from apppages.utils.timeline import period_labels, with_period_labels
 
 
 def main():
@@ -22,7 +54,8 @@ def main():
     1. Set the dependent and independent variables.
     2. Define the time range for the analysis.
     3. Optionally add a constant to the regression model.
-    4. Display regression results including model parameters and summary statistics.
+    4. Display regression results including model parameters and fit statistics, with
+       the full statsmodels summary on request.
 
     Returns:
     None
@@ -34,38 +67,53 @@ def main():
     )
     st.header("Define Regression Parameters:")
 
-    prd = None
-    # Load or create growth dataframe if not already available
-    if st.session_state.g_df is None and prd is None:
-        st.session_state.g_df, st.session_state.g_df_idx = growth_df(
-            st.session_state.df
-        )
+    # Growth rates are precomputed for every horizon; choosing one only slices them
+    tensor = growth_settings()
+    select_growth_horizon(tensor, key="regression_horizon")
+
+    design_terms_section()
 
     # Extract independent (x) and dependent (y) variables from the growth dataframe
     x_cols = [x for x in st.session_state.g_df.columns if x[3] == "x"]
     y_cols = [y for y in st.session_state.g_df.columns if y[3] == "y"]
 
-    # User selects the dependent (y) variable
+    # User selects the dependent (y) variable. The y, x and window widgets are keyed
+    # so that choosing a searched or stored model can set them (see select_model)
+    if st.session_state.get("y_sel_widget") not in y_cols:
+        st.session_state.pop("y_sel_widget", None)
     st.session_state.y_sel_g = st.selectbox(
-        "Choose the dependent (endogenous) variable:", options=y_cols
+        "Choose the dependent (endogenous) variable:",
+        options=y_cols,
+        key="y_sel_widget",
     )
 
-    # User selects the independent (x) variables
+    # User selects the independent (x) variables; generated terms dropped by a reload
+    # leave the selection
+    if "x_sel_widget" in st.session_state:
+        st.session_state.x_sel_widget = [
+            x for x in st.session_state.x_sel_widget if x in x_cols
+        ]
     st.session_state.x_sel_g = st.multiselect(
         "Choose independent (exogenous) variables:",
         options=x_cols,
+        key="x_sel_widget",
     )
 
     # Option to add a constant to the regression model
     constant_sel = st.selectbox("Add constant?:", options=["Yes", "No"])
 
     # Slider for selecting the time range to analyze
+    # A chosen stored model sets the default range (see select_model)
+    window = st.session_state.get("regression_window_default")
+    if window is None or window[1] >= len(st.session_state.g_df):
+        window = (0, len(st.session_state.g_df) - 1)
     st.session_state.slider_value_start, st.session_state.slider_value_end = (
         st.select_slider(
             "Choose the range of points to be plotted",
             options=range(0, len(st.session_state.g_df)),
-            value=(0, len(st.session_state.g_df) - 1),
+            value=window,
             format_func=stringify_g_df,
+            key="regression_window",
         )
     )
 
@@ -86,27 +134,905 @@ def main():
             and st.session_state.y_sel_g is not None
         ):
             if st.session_state.r_df is not None:
-                y = st.session_state.r_df[st.session_state.y_sel_g][
-                    st.session_state.slider_value_start : st.session_state.slider_value_end
-                ]
-                if constant_sel == "Yes":
-                    x = st.session_state.r_df[st.session_state.x_sel_g][
-                        st.session_state.slider_value_start : st.session_state.slider_value_end
-                    ]
-                    x = sm.add_constant(x, prepend=False)
-                else:
-                    x = st.session_state.r_df[st.session_state.x_sel_g][
-                        st.session_state.slider_value_start : st.session_state.slider_value_end
-                    ]
-
-                model = sm.OLS(y, x).fit()
-                st.text(model.summary())
-                st.session_state.model_params = dict(model.params)
-    except ValueError:
-        st.error("Please make sure you chose at least one independent (x) variable.")
+                # The regression dataframe already holds the selected time range
+                y = st.session_state.r_df[st.session_state.y_sel_g]
+                x = st.session_state.r_df[st.session_state.x_sel_g]
+                if y.empty:
+                    raise ValueError("The selected time range holds no periods.")
+
+                # A stored fit of the same specification is reused; otherwise the
+                # lean kernel gives the numbers and statsmodels only runs on request
+                spec = session_model_spec(
+                    st.session_state.y_sel_g,
+                    st.session_state.x_sel_g,
+                    constant_sel == "Yes",
+                    (y.index[0], y.index[-1]),
+                )
+                fit, stored = fit_or_load(spec, y, x)
+                if stored:
+                    st.caption("Loaded from the model store.")
+                # Robust inference reuses the stored residuals; the coefficients
+                # do not change
+                cov = cov_options("fit", len(y))
+                show_fit(robust_inference(fit, y, x, **cov))
+                st.session_state.model_params = params_dict(fit)
+                if st.toggle("Show the full statsmodels summary"):
+                    exog = (
+                        sm.add_constant(x, prepend=False)
+                        if constant_sel == "Yes"
+                        else x
+                    )
+                    cov_kwds = (
+                        {"maxlags": cov["maxlags"]}
+                        if cov["cov_type"] == "HAC"
+                        else None
+                    )
+                    st.text(
+                        sm.OLS(y, exog)
+                        .fit(cov_type=cov["cov_type"], cov_kwds=cov_kwds)
+                        .summary()
+                    )
+                bootstrap_section(y, x, constant_sel == "Yes")
+    except ValueError as val_error:
+        if st.session_state.x_sel_g:
+            st.error(f"Value error: {val_error}")
+        else:
+            st.error(
+                "Please make sure you chose at least one independent (x) variable."
+            )
     except KeyError:
         st.error("Please click the Update Dataframe button to reload the data.")
 
+    batch_fit_section(y_cols, constant_sel == "Yes")
+    coefficient_stability_section(constant_sel == "Yes")
+    cross_validation_section(constant_sel == "Yes")
+    structural_break_section(constant_sel == "Yes")
+    model_search_section(x_cols, y_cols)
+    penalised_section(x_cols, y_cols)
+
+
+def cov_options(key, nobs):
+    """
+    Let the user choose the covariance estimator behind standard errors.
+
+    Growth rates over overlapping periods give autocorrelated residuals, so the
+    autocorrelation-robust lags default to at least the growth horizon less one.
+
+    Parameters:
+    key (str): Prefix of the widget keys, so the options can appear more than once.
+    nobs (int): Number of periods the models are fitted on.
+
+    Returns:
+    dict: The "cov_type" and "maxlags" keyword arguments of the OLS functions.
+    """
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        cov_type = st.selectbox(
+            "Standard errors:",
+            options=list(COV_TYPES),
+            format_func={
+                "nonrobust": "Classical OLS",
+                "HC3": "Heteroskedasticity-robust (HC3)",
+                "HAC": "Autocorrelation-robust (Newey-West HAC)",
+            }.get,
+            key=f"{key}_cov_type",
+        )
+    with col2:
+        maxlags = st.number_input(
+            "HAC lags:",
+            min_value=0,
+            value=default_maxlags(nobs, st.session_state.horizon or 1),
+            disabled=cov_type != "HAC",
+            key=f"{key}_maxlags",
+        )
+    return {"cov_type": cov_type, "maxlags": int(maxlags)}
+
+
+def show_fit(fit):
+    """
+    Display the coefficients and fit statistics of a regression as tables.
+
+    Parameters:
+    fit (dict): The results returned by `fit_ols` or the model store.
+
+    Returns:
+    None
+    """
+    if fit.get("cov_type", "nonrobust") != "nonrobust":
+        st.caption(
+            f"Standard errors and p-values use the {fit['cov_type']} covariance "
+            "(normal approximation)."
+        )
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "coef": fit["params"],
+                "std_err": fit["bse"],
+                "t_value": fit["tvalues"],
+                "p_value": fit["pvalues"],
+            },
+            index=pd.Index(fit["names"], name="variable"),
+        )
+    )
+    st.dataframe(
+        pd.DataFrame({key: [fit[key]] for key in FIT_COLUMNS[1:]}), hide_index=True
+    )
+
+
+def bootstrap_section(y, x, constant):
+    """
+    Estimate block-bootstrap confidence intervals for the fitted elasticities.
+
+    The intervals are stored with the model parameters so the Model Evaluation page
+    can show them.
+
+    Parameters:
+    y (pd.Series): The dependent series the model was fitted on.
+    x (pd.DataFrame): The drivers the model was fitted on, without the constant.
+    constant (bool): Whether the regression includes a constant.
+
+    Returns:
+    None
+    """
+    with st.expander("Bootstrap confidence intervals"):
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            n_boot = st.number_input("Replicates:", min_value=100, value=2000, step=500)
+        with col2:
+            block_length = st.number_input(
+                "Block length (periods):",
+                min_value=1,
+                max_value=max(len(y), 1),
+                value=min(default_block_length(len(y)), max(len(y), 1)),
+            )
+        with col3:
+            level = st.selectbox(
+                "Confidence level:", options=[0.9, 0.95, 0.99], index=1
+            )
+        if st.button("Run bootstrap"):
+            try:
+                st.session_state.model_intervals = block_bootstrap_ols(
+                    y,
+                    x,
+                    constant,
+                    n_boot=int(n_boot),
+                    block_length=int(block_length),
+                    level=level,
+                )
+            except ValueError as val_error:
+                st.error(f"Value error: {val_error}")
+        intervals = st.session_state.model_intervals
+        if matches_model(intervals, st.session_state.model_params):
+            st.caption(
+                f"{intervals.attrs['level']:.0%} percentile intervals from "
+                f"{intervals.attrs['n_boot']} replicates of "
+                f"{intervals.attrs['block_length']}-period blocks."
+            )
+            if intervals.attrs.get("dropped"):
+                st.caption(
+                    f"{intervals.attrs['dropped']} replicates missed every non-zero "
+                    "value of a driver; the coefficients they could not estimate are "
+                    "left out of those intervals."
+                )
+            st.dataframe(intervals)
+
+
+def batch_fit_section(y_cols, constant):
+    """
+    Fit several dependent variables on the selected drivers in one batch.
+
+    All series are solved against a single factorisation of the drivers over the time
+    range selected above, and reported as tables rather than one summary per series.
+    The batch is only fitted while the section is switched on, and refitted when its
+    inputs change.
+
+    Parameters:
+    y_cols (list): The dependent (y) growth columns.
+    constant (bool): Whether the regressions include a constant.
+
+    Returns:
+    None
+    """
+    with st.expander("Fit several dependent variables at once"):
+        batch_y = st.multiselect(
+            "Dependent variables:", options=y_cols, default=y_cols, key="batch_y"
+        )
+        if not batch_y or not st.session_state.x_sel_g:
+            st.info("Choose at least one dependent variable and one driver.")
+            return
+        if not st.toggle("Fit the batch", key="batch_run"):
+            return
+        window = st.session_state.g_df.iloc[
+            st.session_state.slider_value_start : st.session_state.slider_value_end + 1
+        ]
+        try:
+            coefficients, fit = session_cached(
+                "batch_fit",
+                (
+                    tuple(batch_y),
+                    tuple(st.session_state.x_sel_g),
+                    st.session_state.slider_value_start,
+                    st.session_state.slider_value_end,
+                    constant,
+                ),
+                lambda: fit_multi_ols(
+                    window[batch_y], window[st.session_state.x_sel_g], constant
+                ),
+            )
+        except ValueError as val_error:
+            st.error(f"Value error: {val_error}")
+            return
+        st.subheader("Fit statistics")
+        st.dataframe(fit, hide_index=True)
+        st.subheader("Coefficients")
+        st.dataframe(coefficients, hide_index=True)
+
+
+def coefficient_stability_section(constant):
+    """
+    Show how the coefficients of the selected model change across time windows.
+
+    The windows are taken within the time range selected above. The windows are only
+    fitted while the section is switched on, and refitted when their inputs change.
+
+    Parameters:
+    constant (bool): Whether the regression includes a constant.
+
+    Returns:
+    None
+    """
+    with st.expander("Coefficient stability over time"):
+        if not st.session_state.x_sel_g or not st.session_state.y_sel_g:
+            st.info("Choose a dependent variable and at least one driver above.")
+            return
+        window_df = (
+            st.session_state.g_df[[st.session_state.y_sel_g, *st.session_state.x_sel_g]]
+            .iloc[
+                st.session_state.slider_value_start : st.session_state.slider_value_end
+                + 1
+            ]
+            .dropna()
+        )
+        mode = st.radio(
+            "Window:",
+            options=list(MODES),
+            format_func={
+                "expanding": "Expanding (from the first period)",
+                "rolling": "Rolling (fixed length)",
+            }.get,
+            horizontal=True,
+        )
+        n_params = len(st.session_state.x_sel_g) + int(constant)
+        window = None
+        if mode == "rolling":
+            window = st.number_input(
+                "Window length (periods):",
+                min_value=n_params + 1,
+                max_value=max(len(window_df), n_params + 1),
+                value=max(min(20, len(window_df)), n_params + 1),
+            )
+        if len(window_df) <= n_params:
+            st.warning("Not enough periods in the selected range for this model.")
+            return
+        if not st.toggle("Fit every window", key="stability_run"):
+            return
+
+        window = None if window is None else int(window)
+        path = session_cached(
+            "stability_path",
+            (
+                st.session_state.y_sel_g,
+                tuple(st.session_state.x_sel_g),
+                st.session_state.slider_value_start,
+                st.session_state.slider_value_end,
+                constant,
+                window,
+            ),
+            lambda: rolling_ols(
+                window_df[st.session_state.y_sel_g],
+                window_df[st.session_state.x_sel_g],
+                window=window,
+                constant=constant,
+            ).dropna(),
+        )
+        st.dataframe(with_period_labels(path))
+        coefs = with_period_labels(path.drop(columns=["nobs", "r2"]))
+        fig = px.line(
+            coefs,
+            x=coefs.index,
+            y=coefs.columns,
+            title=f"Coefficients of {st.session_state.y_sel_g} by window end",
+        )
+        fig.update_layout(xaxis_title="Window end", yaxis_title="Coefficient")
+        st.plotly_chart(fig)
+
+
+def cv_options(key):
+    """
+    Let the user choose how the sample is split into cross-validation folds.
+
+    Parameters:
+    key (str): Prefix of the widget keys, so the options can appear more than once.
+
+    Returns:
+    dict: The "scheme", "n_folds" and "gap" keyword arguments of `make_folds`.
+    """
+    scheme = st.radio(
+        "Folds:",
+        options=list(SCHEMES),
+        format_func={
+            "rolling_origin": "Rolling origin (fit the past, test what follows)",
+            "blocked_kfold": "Blocked k-fold (test each block in turn)",
+        }.get,
+        horizontal=True,
+        key=f"{key}_scheme",
+    )
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        n_folds = st.number_input(
+            "Number of folds:", min_value=2, value=5, key=f"{key}_folds"
+        )
+    with col2:
+        gap = st.number_input(
+            "Periods left out around each test block:",
+            min_value=0,
+            value=0,
+            key=f"{key}_gap",
+        )
+    return {"scheme": scheme, "n_folds": int(n_folds), "gap": int(gap)}
+
+
+def cross_validation_section(constant):
+    """
+    Show how well the selected model predicts periods it was not fitted on.
+
+    The folds are taken within the time range selected above. The folds are only
+    fitted while the section is switched on, and refitted when their inputs change.
+
+    Parameters:
+    constant (bool): Whether the regression includes a constant.
+
+    Returns:
+    None
+    """
+    with st.expander("Out-of-sample check (cross-validation)"):
+        if not st.session_state.x_sel_g or not st.session_state.y_sel_g:
+            st.info("Choose a dependent variable and at least one driver above.")
+            return
+        options = cv_options("cv")
+        if not st.toggle("Run the cross-validation", key="cv_run"):
+            return
+        window = st.session_state.g_df.iloc[
+            st.session_state.slider_value_start : st.session_state.slider_value_end + 1
+        ]
+        try:
+            folds, summary = session_cached(
+                "cv_results",
+                (
+                    st.session_state.y_sel_g,
+                    tuple(st.session_state.x_sel_g),
+                    st.session_state.slider_value_start,
+                    st.session_state.slider_value_end,
+                    constant,
+                    tuple(options.items()),
+                ),
+                lambda: cross_validate(
+                    window[st.session_state.y_sel_g],
+                    window[st.session_state.x_sel_g],
+                    constant=constant,
+                    **options,
+                ),
+            )
+        except ValueError as val_error:
+            st.error(f"Value error: {val_error}")
+            return
+        st.subheader("All folds")
+        st.dataframe(summary, hide_index=True)
+        st.subheader("Per fold")
+        st.dataframe(folds, hide_index=True)
+
+
+def _set_design_terms(**changes):
+    """
+    Change the generated terms of the growth dataframe.
+
+    Run as a widget callback, before the page reruns, so that the driver selection
+    widgets can be updated: terms that are added are selected as drivers and as
+    search candidates, and terms that are removed are dropped from both. Settings
+    whose terms have the name of an input variable are not applied; the error is
+    shown by `design_terms_section`.
+
+    Parameters:
+    **changes: New values of the design term settings, e.g. breaks=("2020 Q2",).
+
+    Returns:
+    None
+    """
+    state = st.session_state
+    before = set(state.g_df.columns)
+    terms = {**state.design_terms, **changes}
+    try:
+        state.g_df, state.design_columns = add_design_terms(
+            state.g_df, terms, state.design_columns
+        )
+    except ValueError as val_error:
+        state.design_terms_error = str(val_error)
+        return
+    state.design_terms = terms
+    added = [x for x in state.g_df.columns if x not in before]
+    state.x_sel_widget = [x for x in state.x_sel_g if x in state.g_df.columns] + added
+    state.x_sel_g = state.x_sel_widget
+    for key in ("search_x", "penalised_x"):
+        if key in state:
+            state[key] = [x for x in state[key] if x in state.g_df.columns] + added
+    if state.r_df is not None:
+        state.r_df = state.g_df.iloc[
+            state.slider_value_start : state.slider_value_end + 1
+        ][[state.y_sel_g, *state.x_sel_g]]
+
+
+def design_terms_section():
+    """
+    Generate seasonal, trend and event drivers from the timeline.
+
+    The generated terms are added to the growth dataframe as "g: x:" drivers, so that
+    they can be used by the regression, the model search and the penalised paths.
+
+    Returns:
+    None
+    """
+    terms = st.session_state.design_terms
+    if "design_terms_error" in st.session_state:
+        st.error(f"Value error: {st.session_state.pop('design_terms_error')}")
+    with st.expander("Seasonal, trend and event drivers"):
+        labels = period_labels(st.session_state.g_df.index)
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            seasonal = st.checkbox("Seasonal dummies", value=terms["seasonal"])
+        with col2:
+            trend = st.selectbox(
+                "Time trend:",
+                options=[0, 1, 2],
+                index=int(terms["trend"]),
+                format_func={0: "None", 1: "Linear", 2: "Quadratic"}.get,
+            )
+        steps = st.multiselect(
+            "Step dummies (0 before the date, 1 from it on):",
+            options=labels,
+            default=[date for date in terms["steps"] if date in labels],
+        )
+        pulses = st.multiselect(
+            "Pulse dummies (1 at the date only):",
+            options=labels,
+            default=[date for date in terms["pulses"] if date in labels],
+        )
+        st.button(
+            "Apply",
+            key="design_terms_apply",
+            on_click=_set_design_terms,
+            kwargs={
+                "seasonal": seasonal,
+                "trend": trend,
+                "steps": tuple(steps),
+                "pulses": tuple(pulses),
+            },
+        )
+
+
+def structural_break_section(constant):
+    """
+    Scan the selected model for a structural break at every period.
+
+    The scan uses the time range selected above. The best break dates can be added to
+    the model as step dummies. The scan only runs while the section is switched on,
+    and reruns when its inputs change.
+
+    Parameters:
+    constant (bool): Whether the regression includes a constant.
+
+    Returns:
+    None
+    """
+    with st.expander("Structural breaks (Chow / sup-F scan)"):
+        if not st.session_state.x_sel_g or not st.session_state.y_sel_g:
+            st.info("Choose a dependent variable and at least one driver above.")
+            return
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            trim = st.slider(
+                "Share of the range excluded at either end:",
+                min_value=0.05,
+                max_value=0.3,
+                value=TRIM,
+                step=0.05,
+            )
+        with col2:
+            n_breaks = st.number_input(
+                "Break dates to report:", min_value=1, max_value=5, value=2
+            )
+        if st.session_state.design_terms["breaks"]:
+            st.caption(
+                "Break dummies in the data: "
+                + ", ".join(st.session_state.design_terms["breaks"])
+                + ". They stay available as drivers until removed."
+            )
+            st.button(
+                "Remove break dummies",
+                on_click=_set_design_terms,
+                kwargs={"breaks": ()},
+            )
+        if not st.toggle("Scan for breaks", key="breaks_run"):
+            return
+        window = st.session_state.g_df.iloc[
+            st.session_state.slider_value_start : st.session_state.slider_value_end + 1
+        ]
+        try:
+            profile, best = session_cached(
+                "break_results",
+                (
+                    st.session_state.y_sel_g,
+                    tuple(st.session_state.x_sel_g),
+                    st.session_state.slider_value_start,
+                    st.session_state.slider_value_end,
+                    constant,
+                    trim,
+                    int(n_breaks),
+                ),
+                lambda: break_scan(
+                    window[st.session_state.y_sel_g],
+                    window[st.session_state.x_sel_g],
+                    constant=constant,
+                    trim=trim,
+                    n_breaks=int(n_breaks),
+                ),
+            )
+        except ValueError as val_error:
+            st.error(f"Value error: {val_error}")
+            return
+
+        st.write(
+            f"sup-F = {best.attrs['sup_f']:.2f}, asymptotic p-value "
+            f"{best.attrs['sup_f_pvalue']:.3f} (all {best.attrs['k_params']} "
+            "coefficients allowed to change)."
+        )
+        critical = sup_f_critical_value(best.attrs["k_params"], trim)
+        profile = with_period_labels(profile)
+        fig = px.line(
+            profile, x=profile.index, y="f_stat", title="Chow F by break date"
+        )
+        fig.add_hline(
+            y=critical, line_dash="dash", annotation_text="5% sup-F critical value"
+        )
+        fig.update_layout(xaxis_title="First period after the break", yaxis_title="F")
+        st.plotly_chart(fig)
+        st.dataframe(best, hide_index=True)
+
+        dates = st.multiselect(
+            "Break dates to add to the model as dummies:",
+            options=best["date"].tolist(),
+            default=best["date"].tolist()[:1],
+        )
+        st.button(
+            "Add break dummies to the model",
+            on_click=_set_design_terms,
+            kwargs={"breaks": tuple(dates)},
+            disabled=not dates,
+        )
+
+
+def model_search_section(x_cols, y_cols):
+    """
+    Search every combination of drivers and rank the resulting models.
+
+    The search uses the time range selected above. Choosing a ranked model makes it
+    the model used on the Model Evaluation page.
+
+    Parameters:
+    x_cols (list): The candidate independent (x) growth columns.
+    y_cols (list): The dependent (y) growth columns.
+
+    Returns:
+    None
+    """
+    with st.expander("Search all driver combinations"):
+        search_y = st.multiselect(
+            "Dependent variables to search:",
+            options=y_cols,
+            default=[st.session_state.y_sel_g] if st.session_state.y_sel_g else [],
+        )
+        search_x = st.multiselect(
+            "Candidate drivers:",
+            options=x_cols,
+            # Once set, the candidates are kept in session state (see _set_design_terms)
+            default=None if "search_x" in st.session_state else x_cols,
+            key="search_x",
+        )
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            max_size = st.number_input(
+                "Maximum drivers per model:",
+                min_value=1,
+                max_value=max(len(search_x), 1),
+                value=min(4, max(len(search_x), 1)),
+            )
+        with col2:
+            criterion = st.selectbox(
+                "Rank by:",
+                options=list(CRITERIA),
+                format_func={
+                    "adj_r2": "Adjusted R²",
+                    "aic": "AIC",
+                    "bic": "BIC",
+                    "cv_rmse": "Out-of-sample RMSE",
+                    "cv_mape": "Out-of-sample MAPE",
+                }.get,
+            )
+        with col3:
+            alpha = st.number_input(
+                "Significance level:", min_value=0.001, max_value=0.5, value=0.05
+            )
+        positive = st.multiselect(
+            "Drivers expected to have a positive elasticity:", options=search_x
+        )
+        negative = st.multiselect(
+            "Drivers expected to have a negative elasticity:",
+            options=[x for x in search_x if x not in positive],
+        )
+        constant = st.checkbox("Include a constant", value=True)
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            max_lag = st.number_input(
+                "Largest driver lag to try (periods):", min_value=0, value=0
+            )
+        with col2:
+            max_lags_per_driver = st.number_input(
+                "Lags of one driver per model:",
+                min_value=1,
+                value=1,
+                disabled=max_lag == 0,
+            )
+        method = st.radio(
+            "Search method:",
+            options=list(METHODS),
+            format_func={
+                "exhaustive": "Exhaustive (every combination)",
+                "branch_and_bound": "Branch and bound (best models per size)",
+            }.get,
+            horizontal=True,
+            disabled=max_lag > 0,
+        )
+        if max_lag > 0:
+            st.caption(
+                "With lags, every combination of lagged drivers is fitted on the "
+                "periods where all lags are available."
+            )
+        top_k, time_budget = 5, None
+        if method == "branch_and_bound" and max_lag == 0:
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                top_k = st.number_input(
+                    "Best models kept per number of drivers:", min_value=1, value=5
+                )
+            with col2:
+                time_budget = st.number_input(
+                    "Time budget per dependent variable (seconds):",
+                    min_value=1.0,
+                    value=30.0,
+                )
+
+        cv = cv_options("search_cv") if criterion in CV_CRITERIA else None
+        window = st.session_state.g_df.iloc[
+            st.session_state.slider_value_start : st.session_state.slider_value_end + 1
+        ]
+        cov = cov_options("search", len(window))
+
+        if st.button("Search models") and search_y and search_x:
+            signs = {**{x: 1 for x in positive}, **{x: -1 for x in negative}}
+            try:
+                if max_lag > 0:
+                    (
+                        st.session_state.search_results,
+                        st.session_state.search_report,
+                    ) = best_lag_structures(
+                        window,
+                        search_y,
+                        search_x,
+                        max_lag=int(max_lag),
+                        max_size=int(max_size),
+                        max_lags_per_driver=int(max_lags_per_driver),
+                        constant=constant,
+                        criterion=criterion,
+                        alpha=alpha,
+                        expected_signs=signs,
+                        cv=cv,
+                        **cov,
+                    )
+                else:
+                    (
+                        st.session_state.search_results,
+                        st.session_state.search_report,
+                    ) = best_subsets(
+                        window,
+                        search_y,
+                        search_x,
+                        max_size=int(max_size),
+                        constant=constant,
+                        criterion=criterion,
+                        alpha=alpha,
+                        expected_signs=signs,
+                        method=method,
+                        top_k=int(top_k),
+                        time_budget=time_budget,
+                        cv=cv,
+                        **cov,
+                    )
+            except ValueError as val_error:
+                st.error(f"Value error: {val_error}")
+
+        results = st.session_state.search_results
+        if results is None or results.empty:
+            return
+        report = st.session_state.search_report
+        if not report["complete"].all():
+            st.warning(
+                "The time budget ran out before the search finished; the models shown "
+                "are the best found so far."
+            )
+        st.dataframe(report, hide_index=True)
+        st.dataframe(results, hide_index=True)
+        choice = st.selectbox(
+            "Model to evaluate:",
+            options=results.index,
+            format_func=lambda i: f"{results.at[i, 'y']} ~ {results.at[i, 'drivers']}",
+        )
+        lagged = any(
+            base_column(name) != name
+            for name in results.at[choice, "drivers"].split(" + ")
+        )
+        if lagged:
+            st.info(
+                "Models with lagged drivers cannot be evaluated on the Model "
+                "Evaluation page yet."
+            )
+        model = results.loc[choice]
+        drivers = model["drivers"].split(" + ")
+        params = {
+            name: float(model[name])
+            for name in drivers + [CONSTANT]
+            if name in model and pd.notna(model[name])
+        }
+        if st.button(
+            "Use this model on the Model Evaluation page",
+            disabled=lagged,
+            on_click=select_model,
+            args=(model["y"], drivers, params),
+        ):
+            st.success(f"Selected {model['y']} ~ {model['drivers']}.")
+
+
+def penalised_section(x_cols, y_cols):
+    """
+    Fit penalised regressions over a grid of penalties for wide driver sets.
+
+    The penalty of each dependent variable is chosen by cross-validation within the
+    time range selected above. Choosing a result makes its drivers and coefficients
+    the model used on the Model Evaluation page.
+
+    Parameters:
+    x_cols (list): The candidate independent (x) growth columns.
+    y_cols (list): The dependent (y) growth columns.
+
+    Returns:
+    None
+    """
+    with st.expander("Penalised regression for many drivers"):
+        st.caption(
+            "Lasso and elastic net drop drivers as the penalty grows; ridge keeps "
+            "every driver and shrinks them all."
+        )
+        penalised_y = st.multiselect(
+            "Dependent variables:",
+            options=y_cols,
+            default=[st.session_state.y_sel_g] if st.session_state.y_sel_g else [],
+            key="penalised_y",
+        )
+        penalised_x = st.multiselect(
+            "Candidate drivers:",
+            options=x_cols,
+            # Once set, the candidates are kept in session state (see _set_design_terms)
+            default=None if "penalised_x" in st.session_state else x_cols,
+            key="penalised_x",
+        )
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            penalty = st.selectbox(
+                "Penalty:",
+                options=list(PENALTIES),
+                format_func={
+                    "lasso": "Lasso",
+                    "elastic_net": "Elastic net",
+                    "ridge": "Ridge",
+                }.get,
+            )
+        with col2:
+            l1_ratio = st.slider(
+                "Share of the lasso penalty:",
+                min_value=0.05,
+                max_value=0.95,
+                value=0.5,
+                disabled=penalty != "elastic_net",
+            )
+        with col3:
+            criterion = st.selectbox(
+                "Choose the penalty by:",
+                options=list(CV_CRITERIA),
+                format_func={
+                    "cv_rmse": "Out-of-sample RMSE",
+                    "cv_mape": "Out-of-sample MAPE",
+                }.get,
+                key="penalised_criterion",
+            )
+        constant = st.checkbox("Include a constant", value=True, key="penalised_const")
+        cv = cv_options("penalised_cv")
+
+        if st.button("Fit penalised models") and penalised_y and penalised_x:
+            window = st.session_state.g_df.iloc[
+                st.session_state.slider_value_start : st.session_state.slider_value_end
+                + 1
+            ]
+            try:
+                st.session_state.penalised_results = penalised_models(
+                    window,
+                    penalised_y,
+                    penalised_x,
+                    penalty=penalty,
+                    l1_ratio=l1_ratio,
+                    constant=constant,
+                    cv=cv,
+                    criterion=criterion,
+                )
+            except ValueError as val_error:
+                st.error(f"Value error: {val_error}")
+
+        if st.session_state.penalised_results is None:
+            return
+        selected, paths = st.session_state.penalised_results
+        st.dataframe(selected, hide_index=True)
+        choice = st.selectbox(
+            "Model to inspect:",
+            options=selected.index,
+            format_func=lambda i: f"{selected.at[i, 'y']} ~ {selected.at[i, 'drivers']}",
+        )
+        model = selected.loc[choice]
+        path = paths[model["y"]]
+        drivers = [x for x in path.columns if x[3:4] == "x"]
+        fig = px.line(
+            path.reset_index(),
+            x="alpha",
+            y=drivers,
+            log_x=True,
+            title=f"Coefficient path of {model['y']}",
+        )
+        fig.add_vline(x=model["alpha"], line_dash="dash")
+        fig.update_layout(xaxis_title="Penalty", yaxis_title="Coefficient")
+        st.plotly_chart(fig)
+        st.dataframe(path)
+
+        kept = model["drivers"].split(" + ") if model["drivers"] else []
+        params = {
+            name: float(model[name])
+            for name in kept + [CONSTANT]
+            if name in model and pd.notna(model[name])
+        }
+        if st.button(
+            "Use this model on the Model Evaluation page",
+            key="penalised_use",
+            disabled=not model["drivers"],
+            on_click=select_model,
+            args=(model["y"], kept, params),
+        ):
+            st.success(f"Selected {model['y']} ~ {model['drivers']}.")
+
 
 if __name__ == "__page__":
     main()
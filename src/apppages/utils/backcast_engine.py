@@ -0,0 +1,157 @@
+"""
+Backcast Engine.
+
+A backcast runs the model backwards from a base year. With growth factors over a
+horizon of h periods, the model predicts the growth of traffic from period t - h to
+t as the product of the driver growth factors raised to their elasticities,
+
+    m[t] = prod_x g_x[t] ** e_x.
+
+Each period of the base year (the last h periods up to the base period) keeps its
+observed traffic, and every earlier period is reached by dividing by the predicted
+growth of the h periods that follow it:
+
+    y_hat[t] = y_hat[t + h] / m[t + h] = y[b] / (m[t + h] * m[t + 2h] * ... * m[b]),
+
+where b is the base-year period of the same phase (t mod h). With h equal to the
+number of periods per year, the phases are the quarters or months, so each quarter
+is backcast from the same quarter of the base year.
+
+The timeline is padded at the start to a whole number of horizons and reshaped to
+(years, phases). The chained growth of every period is then one reversed cumulative
+product down the years of each phase, and the backcast one array division, instead
+of a Python loop over the periods.
+
+Generated drivers (seasonal, trend and event terms, see `design`) are not growth
+factors of the data. Their coefficient b enters the predicted growth as exp(b * d),
+as a pct_val_or_dummy variable does.
+
+Constants:
+- CUMULATIVE (str), PREDICTED (str): Names of the chained growth and backcast
+  columns.
+
+Functions:
+- growth_multipliers(factors, elasticities, terms, coefficients):
+    Returns the predicted growth factor of every period.
+
+- chained_growth(multipliers, step, base_end):
+    Returns the growth from every period to the base year of its phase.
+
+- backcast(y, factors, elasticities, step, base_end, terms, coefficients):
+    Returns the chained growth and the backcast of the dependent series.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Constants
+CUMULATIVE = "Cumulative Growth"
+PREDICTED = "Predicted y"
+
+
+def growth_multipliers(factors, elasticities, terms=None, coefficients=None):
+    """
+    Compute the predicted growth factor of every period.
+
+    Parameters:
+        factors (np.ndarray): Driver growth factors, shape (periods, drivers).
+        elasticities (np.ndarray): The elasticity of each driver.
+        terms (np.ndarray, optional): Generated drivers, shape (periods, terms).
+        coefficients (np.ndarray, optional): The coefficient of each term.
+
+    Returns:
+        np.ndarray: prod(factors ** elasticities) * exp(terms @ coefficients), NaN
+                    where a driver is missing.
+    """
+    growth = np.prod(factors ** np.asarray(elasticities, dtype=float), axis=1)
+    if terms is not None and np.size(terms):
+        growth = growth * np.exp(terms @ np.asarray(coefficients, dtype=float))
+    return growth
+
+
+def chained_growth(multipliers, step, base_end=None):
+    """
+    Chain the predicted growth from every period to the base year of its phase.
+
+    Parameters:
+        multipliers (np.ndarray): Predicted growth over `step` periods ending at each
+                                  period, shape (periods,).
+        step (int): The growth horizon in periods, e.g. 4 for annual growth of
+                    quarterly data.
+        base_end (int, optional): Position of the last period of the base year.
+                                  Defaults to the last period.
+
+    Returns:
+        np.ndarray: The chained growth, 1 in the base year, NaN after the base year
+                    and before a missing multiplier.
+    """
+    n_periods = len(multipliers)
+    base_end = n_periods - 1 if base_end is None else int(base_end)
+    length = base_end + 1
+    pad = -length % step
+    years = np.concatenate([np.full(pad, np.nan), multipliers[:length]]).reshape(
+        -1, step
+    )
+    # Growth into each year from the year before, the base year contributing none
+    chained = np.ones_like(years)
+    np.cumprod(years[:0:-1], axis=0, out=chained[-2::-1])
+    out = np.full(n_periods, np.nan)
+    out[:length] = chained.ravel()[pad:]
+    return out
+
+
+def backcast(
+    y,
+    factors,
+    elasticities,
+    step,
+    base_end=None,
+    terms=None,
+    coefficients=None,
+):
+    """
+    Backcast the dependent series from the base year with the model's elasticities.
+
+    Parameters:
+        y (pd.Series): The observed dependent series, indexed by period.
+        factors (pd.DataFrame): Driver growth factors over `step` periods, indexed by
+                                period; missing periods are treated as NaN.
+        elasticities (pd.Series or dict): Elasticity of each column of `factors`.
+        step (int): The growth horizon in periods.
+        base_end (int, optional): Position in `y` of the last period of the base
+                                  year. Defaults to the last period.
+        terms (pd.DataFrame, optional): Generated drivers, indexed by period.
+        coefficients (pd.Series or dict, optional): Coefficient of each column of
+                                                    `terms`.
+
+    Returns:
+        pd.DataFrame: Indexed like `y`, with the driver growth raised to its
+                      elasticity, "Cumulative Growth" and "Predicted y".
+    """
+    factors = factors.reindex(y.index)
+    elasticities = pd.Series(elasticities, dtype=float)[factors.columns]
+    powered = factors.to_numpy(dtype=float) ** elasticities.to_numpy()
+    term_values = None
+    if terms is not None and len(terms.columns):
+        terms = terms.reindex(y.index)
+        coefficients = pd.Series(coefficients, dtype=float)[terms.columns]
+        term_values = terms.to_numpy(dtype=float)
+
+    multipliers = growth_multipliers(
+        factors.to_numpy(dtype=float),
+        elasticities.to_numpy(),
+        term_values,
+        None if term_values is None else coefficients.to_numpy(),
+    )
+    cumulative = chained_growth(multipliers, step, base_end)
+
+    values = y.to_numpy(dtype=float)
+    base_end = len(values) - 1 if base_end is None else int(base_end)
+    # Observed value in the base year of each period's phase
+    base = np.full(len(values), np.nan)
+    positions = np.arange(base_end + 1)
+    base[: base_end + 1] = values[base_end - (base_end - positions) % step]
+    out = pd.DataFrame(powered, index=y.index, columns=factors.columns)
+    out[CUMULATIVE] = cumulative
+    out[PREDICTED] = base / cumulative
+    return out
@@ -0,0 +1,156 @@
+"""
+Batch Ingestion of Completed Templates.
+
+This module loads many completed input templates (for example one per corridor or
+site) in one go. The templates are parsed in parallel with `spreadsheet_to_df` in a
+process pool and combined into a single long-format panel tagged by source file,
+alongside a report of the time taken and any error raised for each file.
+
+Constants:
+- TEMPLATE_SUFFIXES (tuple): File suffixes picked up when a directory is given.
+
+Functions:
+- find_templates(source):
+    Resolves a directory, glob pattern or single file into a sorted list of paths.
+
+- load_templates(source, max_workers):
+    Parses every template found in `source` and returns the combined panel and a
+    per-file report.
+"""
+
+import glob
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl.utils.exceptions import InvalidFileException
+from apppages.utils.excel import spreadsheet_to_df
+
+# Constants
+TEMPLATE_SUFFIXES = (".xlsx", ".xlsm")
+PANEL_COLUMNS = ["source", "period", "variable", "type", "value"]
+
+
+def find_templates(source):
+    """
+    Resolve the templates to load from a directory, glob pattern or file path.
+
+    Parameters:
+        source (str): A directory (all templates directly inside it are used), a glob
+                      pattern such as "data/reg_input/**/*.xlsx", or a single file.
+
+    Returns:
+        list: Sorted list of template file paths.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.lower().endswith(TEMPLATE_SUFFIXES) and not name.startswith("~$")
+        )
+    if os.path.isfile(source):
+        return [source]
+    return sorted(
+        path for path in glob.glob(source, recursive=True) if os.path.isfile(path)
+    )
+
+
+def _load_one(file_path):
+    """
+    Parse a single template, timing it and capturing any error.
+
+    Parameters:
+        file_path (str): The path of the template to parse.
+
+    Returns:
+        tuple: (file_path, df, var_dict, seconds, error) where df and var_dict are
+               None and error holds the message if parsing failed.
+    """
+    start = time.perf_counter()
+    try:
+        df, _, var_dict = spreadsheet_to_df(file_path)
+        error = None
+    except (
+        OSError,
+        ValueError,
+        KeyError,
+        TypeError,
+        zipfile.BadZipFile,
+        InvalidFileException,
+    ) as e:
+        df, var_dict, error = None, None, f"{type(e).__name__}: {e}"
+    return file_path, df, var_dict, time.perf_counter() - start, error
+
+
+def _to_long(file_path, df, var_dict):
+    """
+    Reshape one parsed template into the long panel layout.
+
+    Parameters:
+        file_path (str): The path of the template, used as the source tag.
+        df (pd.DataFrame): The parsed template.
+        var_dict (dict): The variable type dictionary of the template.
+
+    Returns:
+        pd.DataFrame: Long-format frame with the PANEL_COLUMNS columns.
+    """
+    long_df = (
+        df.rename_axis("period")
+        .reset_index()
+        .melt(id_vars="period", var_name="variable", value_name="value")
+    )
+    long_df["type"] = long_df["variable"].str[2:].map(var_dict)
+    long_df["source"] = file_path
+    return long_df[PANEL_COLUMNS]
+
+
+def load_templates(source, max_workers=None):
+    """
+    Load every template found in `source` into a single long-format panel.
+
+    Templates are parsed in a process pool so the work scales with the number of
+    cores. Files that fail to parse are skipped and listed in the report.
+
+    Parameters:
+        source (str): A directory, glob pattern or single template path.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+                                     number of CPUs; 1 parses in the calling process.
+
+    Returns:
+        tuple: A tuple containing:
+            - panel (pd.DataFrame): Long-format data with columns "source", "period",
+              "variable", "type" and "value".
+            - report (pd.DataFrame): One row per file with the parse time in seconds,
+              the number of variables and periods read, and the error (if any).
+    """
+    paths = find_templates(source)
+    if max_workers == 1 or len(paths) <= 1:
+        results = [_load_one(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_load_one, paths))
+
+    frames, report = [], []
+    for file_path, df, var_dict, seconds, error in results:
+        report.append(
+            {
+                "source": file_path,
+                "seconds": seconds,
+                "variables": None if df is None else df.shape[1],
+                "periods": None if df is None else df.shape[0],
+                "error": error,
+            }
+        )
+        if df is not None:
+            frames.append(_to_long(file_path, df, var_dict))
+
+    panel = (
+        pd.concat(frames, ignore_index=True)
+        if frames
+        else pd.DataFrame(columns=PANEL_COLUMNS)
+    )
+    return panel, pd.DataFrame(
+        report, columns=["source", "seconds", "variables", "periods", "error"]
+    )
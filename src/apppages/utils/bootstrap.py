@@ -0,0 +1,252 @@
+"""
+Block Bootstrap Confidence Intervals.
+
+OLS standard errors assume independent residuals, which growth rates of quarterly
+traffic and economic series rarely have, and on 40-odd observations their normal
+approximation is rough. This module estimates the sampling spread of the elasticities
+with a moving block bootstrap instead: every replicate rebuilds a sample of the same
+length from randomly chosen blocks of consecutive periods (rows of y and X together),
+which keeps the serial correlation within each block.
+
+A replicate only changes how many times each period is drawn, so its normal equations
+are a weighted sum of the per-period cross-products: with a (replicates x periods)
+matrix of draw counts W, the Gram matrices of all replicates are one matrix product
+W @ vec(z z') and are then solved in one batched call. Replicates are processed in
+chunks sized to a memory budget; when there is enough work the chunks are spread over
+worker processes, each with its own random stream so the results do not depend on the
+number of workers.
+
+A resample can miss every non-zero value of a dummy, leaving its coefficient
+unidentified. Each replicate's Gram matrix is checked for rank on its own: full-rank
+replicates are solved as usual, and in the others the coefficients that the sample
+cannot identify are set to NaN and left out of their intervals, rather than taking
+the zero a pseudo-inverse would give them.
+
+Constants:
+- MEMORY_BUDGET (int): Default bytes of working memory per chunk of replicates.
+- RANK_TOL (float), NULL_TOL (float): Tolerances of the per-replicate rank check.
+
+Functions:
+- default_block_length(nobs):
+    Returns the default block length, the cube root of the sample size.
+
+- block_bootstrap_ols(y, X, constant, n_boot, block_length, level, seed,
+  memory_budget, max_workers):
+    Returns percentile intervals of the coefficients of a regression.
+
+- matches_model(intervals, model_params):
+    Checks that stored intervals belong to the current model parameters.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from apppages.utils.ols import CONSTANT
+
+# Constants
+MEMORY_BUDGET = 64 * 1024**2
+PARALLEL_MIN_DRAWS = 20_000_000
+RANK_TOL = 1e-10
+NULL_TOL = 1e-8
+
+
+def default_block_length(nobs):
+    """
+    Choose the block length for a sample, the rounded cube root of its size.
+
+    Parameters:
+        nobs (int): Number of periods.
+
+    Returns:
+        int: The block length, at least one period.
+    """
+    return max(int(round(nobs ** (1 / 3))), 1)
+
+
+def _draw_counts(rng, n_boot, nobs, block_length):
+    """
+    Draw moving-block resamples and count how often each period is used.
+
+    Parameters:
+        rng (np.random.Generator): The random stream.
+        n_boot (int): Number of replicates.
+        nobs (int): Number of periods.
+        block_length (int): Length of each block.
+
+    Returns:
+        np.ndarray: Draw counts of shape (n_boot, nobs); every row sums to nobs.
+    """
+    n_blocks = -(-nobs // block_length)
+    starts = rng.integers(0, nobs - block_length + 1, size=(n_boot, n_blocks))
+    rows = (starts[:, :, None] + np.arange(block_length)).reshape(n_boot, -1)
+    rows = rows[:, :nobs] + nobs * np.arange(n_boot)[:, None]
+    return np.bincount(rows.ravel(), minlength=n_boot * nobs).reshape(n_boot, nobs)
+
+
+def _bootstrap_chunk(job, Z, y, block_length):
+    """
+    Solve the normal equations of one chunk of replicates in a batched call.
+
+    Parameters:
+        job (tuple): The (seed, n_boot) of the chunk.
+        Z (np.ndarray): The design matrix, shape (nobs, k).
+        y (np.ndarray): The dependent series, shape (nobs,).
+        block_length (int): Length of each block.
+
+    Returns:
+        np.ndarray: The coefficients of each replicate, shape (n_boot, k); NaN for
+                    the coefficients a replicate cannot identify.
+    """
+    seed, n_boot = job
+    nobs, k_params = Z.shape
+    counts = _draw_counts(np.random.default_rng(seed), n_boot, nobs, block_length)
+    outer = np.einsum("ti,tj->tij", Z, Z).reshape(nobs, -1)
+    gram = (counts @ outer).reshape(n_boot, k_params, k_params)
+    xty = counts @ (Z * y[:, None])
+    # The rank is checked on each Gram matrix scaled to a unit diagonal, so that it
+    # does not depend on the units of the drivers
+    diag = np.einsum("bii->bi", gram)
+    scale = np.sqrt(np.where(diag > 0, diag, 1.0))
+    eigvals, eigvecs = np.linalg.eigh(gram / scale[:, :, None] / scale[:, None, :])
+    null = eigvals <= RANK_TOL * eigvals[:, -1:]
+    full = ~null.any(axis=1)
+
+    draws = np.empty((n_boot, k_params))
+    draws[full] = np.linalg.solve(gram[full], xty[full][:, :, None])[:, :, 0]
+    if not full.all():
+        # Some resamples can miss every non-zero value of a dummy. Only the
+        # coefficients with a component in the null space are unidentified, and the
+        # diagonal scaling leaves the components that are zero unchanged
+        deficient = ~full
+        unidentified = (
+            np.einsum("bij,bj->bi", eigvecs[deficient] ** 2, null[deficient]) > NULL_TOL
+        )
+        partial_draws = np.einsum(
+            "bij,bj->bi",
+            np.linalg.pinv(gram[deficient], hermitian=True),
+            xty[deficient],
+        )
+        partial_draws[unidentified] = np.nan
+        draws[deficient] = partial_draws
+    return draws
+
+
+def block_bootstrap_ols(
+    y,
+    X,
+    constant=True,
+    n_boot=2000,
+    block_length=None,
+    level=0.95,
+    seed=None,
+    memory_budget=MEMORY_BUDGET,
+    max_workers=None,
+):
+    """
+    Estimate percentile confidence intervals of regression coefficients.
+
+    Periods where the series or any driver is missing are dropped first.
+
+    Parameters:
+        y (pd.Series): The dependent series, indexed by period.
+        X (pd.DataFrame): The drivers, without a constant column.
+        constant (bool): Whether the regression includes a constant.
+        n_boot (int): Number of bootstrap replicates.
+        block_length (int, optional): Periods per block. Defaults to
+                                      `default_block_length`.
+        level (float): Coverage of the intervals, e.g. 0.95.
+        seed (int, optional): Seed of the random streams, for reproducible
+                              intervals.
+        memory_budget (int): Bytes of working memory allowed per chunk.
+        max_workers (int, optional): Number of worker processes. None uses every
+                                     CPU when the work is large enough; 1 solves
+                                     every chunk in the calling process.
+
+    Returns:
+        pd.DataFrame: Indexed by coefficient (drivers, then "const"), with the full
+                      sample estimate "coef", the bootstrap "std_err" and the
+                      "lower" and "upper" percentile bounds. The settings are kept
+                      in `attrs` ("level", "n_boot" and "block_length"), with the
+                      number of replicates that could not identify every
+                      coefficient ("dropped").
+
+    Raises:
+        ValueError: If there are not more periods than coefficients.
+    """
+    sample = pd.concat([y, X], axis=1).dropna()
+    names = list(X.columns) + ([CONSTANT] if constant else [])
+    nobs = len(sample)
+    if nobs <= len(names):
+        raise ValueError("There are not enough periods to fit the model.")
+    block_length = min(int(block_length or default_block_length(nobs)), nobs)
+
+    # Shift by the means for conditioning; the constant absorbs the shift
+    y_values = sample.iloc[:, 0].to_numpy(dtype=float)
+    x_values = sample.iloc[:, 1:].to_numpy(dtype=float)
+    y_shift = y_values.mean() if constant else 0.0
+    x_shift = x_values.mean(axis=0) if constant else np.zeros(x_values.shape[1])
+    Z = x_values - x_shift
+    if constant:
+        Z = np.column_stack([Z, np.ones(nobs)])
+    yc = y_values - y_shift
+
+    k_params = Z.shape[1]
+    bytes_per_draw = 8 * (3 * nobs + 5 * k_params * k_params + 3 * k_params)
+    chunk = max(min(memory_budget // bytes_per_draw, n_boot), 1)
+    sizes = [min(chunk, n_boot - start) for start in range(0, n_boot, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = list(zip(seeds, sizes))
+    solve = partial(_bootstrap_chunk, Z=Z, y=yc, block_length=block_length)
+    large = n_boot * nobs >= PARALLEL_MIN_DRAWS
+    if max_workers == 1 or len(jobs) <= 1 or (max_workers is None and not large):
+        draws = np.vstack([solve(job) for job in jobs])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            draws = np.vstack(list(executor.map(solve, jobs)))
+
+    coef = np.linalg.lstsq(Z, yc, rcond=None)[0]
+    if constant:
+        draws[:, -1] += y_shift - draws[:, :-1] @ x_shift
+        coef[-1] += y_shift - coef[:-1] @ x_shift
+    tail = 100 * (1 - level) / 2
+    lower, upper = np.nanpercentile(draws, [tail, 100 - tail], axis=0)
+    intervals = pd.DataFrame(
+        {
+            "coef": coef,
+            "std_err": np.nanstd(draws, axis=0, ddof=1),
+            "lower": lower,
+            "upper": upper,
+        },
+        index=pd.Index(names, name="variable"),
+    )
+    intervals.attrs = {
+        "level": level,
+        "n_boot": n_boot,
+        "block_length": block_length,
+        "dropped": int(np.isnan(draws).any(axis=1).sum()),
+    }
+    return intervals
+
+
+def matches_model(intervals, model_params):
+    """
+    Check that bootstrap intervals were estimated for the given model.
+
+    Parameters:
+        intervals (pd.DataFrame): Intervals returned by `block_bootstrap_ols`, or
+                                  None.
+        model_params (dict): Coefficient name to value (or one-element list, as
+                             kept by the Model Evaluation page).
+
+    Returns:
+        bool: True if the intervals cover exactly these coefficients and their
+              point estimates are the same.
+    """
+    if intervals is None or not model_params:
+        return False
+    if set(intervals.index) != set(model_params):
+        return False
+    values = [np.ravel(model_params[name])[0] for name in intervals.index]
+    return bool(np.allclose(intervals["coef"].to_numpy(), values))
@@ -0,0 +1,257 @@
+"""
+Structural Break Scan.
+
+Events such as COVID or a change of tolls can break the relationship between traffic
+and its drivers. This module tests every candidate breakpoint of a regression with a
+Chow F-test: the model is fitted separately before and after the break, and the fall
+in the residual sum of squares (RSS) is compared with the single fit.
+
+The scan never refits the model per breakpoint. The cross-products Z'Z, Z'y and y'y
+are accumulated once over the periods; the moments of the periods before a break are
+a prefix of these running sums and those after it the remainder, so every candidate
+break costs one small k x k solve from the sums, done for all breaks in one batched
+call. As in `cross_validation`, the data are shifted by their means first to keep the
+sums well conditioned.
+
+The largest F-statistic over the candidate breaks (sup-F, Andrews 1993) has a
+non-standard distribution. Its p-value is taken from the asymptotic null
+distribution, the supremum of a normalised squared Brownian bridge, which is
+simulated once per number of coefficients and trimming fraction. Pointwise p-values
+of each candidate from the F distribution are also reported, but only the sup-F
+p-value accounts for having searched over the breaks.
+
+The break dates found can be added to the model as step dummies, which are built
+with the other generated terms in `design`.
+
+Constants:
+- TRIM (float): Default share of the sample excluded at either end of the scan.
+
+Functions:
+- chow_profile(y, X, constant, trim):
+    Returns the Chow F-statistic of every candidate breakpoint.
+
+- sup_f_pvalue(sup_f, k_params, trim):
+    Returns the asymptotic p-value of the sup-F statistic.
+
+- sup_f_critical_value(k_params, trim, level):
+    Returns the asymptotic critical value of the sup-F statistic.
+
+- break_scan(y, X, constant, trim, n_breaks, min_distance):
+    Returns the F-statistic profile and the best separated break dates.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from apppages.utils.timeline import format_period
+
+# Constants
+TRIM = 0.15
+N_SIMULATIONS = 5000
+SIMULATION_GRID = 1000
+SIMULATION_CHUNK = 250
+
+
+def _segment_rss(cum_gram, cum_xty, cum_yty, start, stop):
+    """
+    Compute the RSS of the periods start:stop for arrays of segments at once.
+
+    Parameters:
+        cum_gram (np.ndarray): Running sums of z z', shape (nobs + 1, k, k).
+        cum_xty (np.ndarray): Running sums of z y, shape (nobs + 1, k).
+        cum_yty (np.ndarray): Running sums of y², shape (nobs + 1,).
+        start (np.ndarray): First period of each segment.
+        stop (np.ndarray): Period after the last of each segment.
+
+    Returns:
+        np.ndarray: The RSS of each segment.
+    """
+    gram = cum_gram[stop] - cum_gram[start]
+    xty = cum_xty[stop] - cum_xty[start]
+    yty = cum_yty[stop] - cum_yty[start]
+    try:
+        params = np.linalg.solve(gram, xty[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # A dummy can be all zero on one side of a break
+        params = np.einsum("bij,bj->bi", np.linalg.pinv(gram, hermitian=True), xty)
+    return np.maximum(yty - np.einsum("bi,bi->b", params, xty), 0.0)
+
+
+def chow_profile(y, X, constant=True, trim=TRIM):
+    """
+    Compute the Chow F-statistic of every candidate breakpoint.
+
+    A break at period b splits the sample into periods 0..b-1 and b..nobs-1; every
+    coefficient, including the constant, may change at the break. Breaks are tried
+    where both sides keep at least `trim` of the sample and more periods than
+    coefficients.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers).
+        constant (bool): Whether the model includes a constant.
+        trim (float): Share of the sample excluded at either end.
+
+    Returns:
+        tuple: The candidate break positions, their F-statistics and pointwise
+               p-values, and the number of coefficients k.
+
+    Raises:
+        ValueError: If the sample is too short for any candidate break.
+    """
+    nobs = len(y)
+    y_shift = y.mean() if constant else 0.0
+    x_shift = X.mean(axis=0) if constant else np.zeros(X.shape[1])
+    Z = X - x_shift
+    if constant:
+        Z = np.column_stack([Z, np.ones(nobs)])
+    yc = y - y_shift
+    k_params = Z.shape[1]
+
+    first = max(int(np.ceil(trim * nobs)), k_params + 1)
+    last = min(nobs - first, nobs - k_params - 1)
+    if last < first:
+        raise ValueError("The sample is too short to test for a break.")
+
+    cum_gram = np.zeros((nobs + 1, k_params, k_params))
+    np.cumsum(np.einsum("ti,tj->tij", Z, Z), axis=0, out=cum_gram[1:])
+    cum_xty = np.zeros((nobs + 1, k_params))
+    np.cumsum(Z * yc[:, None], axis=0, out=cum_xty[1:])
+    cum_yty = np.zeros(nobs + 1)
+    np.cumsum(yc**2, out=cum_yty[1:])
+
+    breaks = np.arange(first, last + 1)
+    zeros = np.zeros_like(breaks)
+    ends = np.full_like(breaks, nobs)
+    sums = (cum_gram, cum_xty, cum_yty)
+    rss_full = _segment_rss(*sums, zeros[:1], ends[:1])[0]
+    rss_split = _segment_rss(*sums, zeros, breaks) + _segment_rss(*sums, breaks, ends)
+    df_resid = nobs - 2 * k_params
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_stats = (rss_full - rss_split) / k_params / (rss_split / df_resid)
+    return breaks, f_stats, stats.f.sf(f_stats, k_params, df_resid), k_params
+
+
+@lru_cache(maxsize=32)
+def _sup_f_null(k_params, trim, seed=0):
+    """
+    Simulate the asymptotic null distribution of the sup-F statistic.
+
+    Parameters:
+        k_params (int): Number of coefficients tested.
+        trim (float): Share of the sample excluded at either end.
+        seed (int): Seed of the simulation.
+
+    Returns:
+        np.ndarray: Sorted draws of the sup-F statistic.
+    """
+    rng = np.random.default_rng(seed)
+    share = np.arange(1, SIMULATION_GRID + 1) / SIMULATION_GRID
+    inside = (share >= trim) & (share <= 1 - trim)
+    draws = []
+    for start in range(0, N_SIMULATIONS, SIMULATION_CHUNK):
+        n_sims = min(SIMULATION_CHUNK, N_SIMULATIONS - start)
+        steps = rng.standard_normal((n_sims, SIMULATION_GRID, k_params))
+        walk = np.cumsum(steps, axis=1) / np.sqrt(SIMULATION_GRID)
+        bridge = walk[:, inside] - share[inside, None] * walk[:, -1:, :]
+        wald = (bridge**2).sum(axis=2) / (share[inside] * (1 - share[inside]))
+        draws.append(wald.max(axis=1) / k_params)
+    return np.sort(np.concatenate(draws))
+
+
+def sup_f_pvalue(sup_f, k_params, trim=TRIM):
+    """
+    Compute the asymptotic p-value of a sup-F statistic.
+
+    Parameters:
+        sup_f (float): The largest Chow F-statistic of the scan.
+        k_params (int): Number of coefficients tested.
+        trim (float): Share of the sample excluded at either end.
+
+    Returns:
+        float: The share of simulated null draws at least as large.
+    """
+    null = _sup_f_null(int(k_params), round(float(trim), 4))
+    return float(1 - np.searchsorted(null, sup_f) / len(null))
+
+
+def sup_f_critical_value(k_params, trim=TRIM, level=0.05):
+    """
+    Compute the asymptotic critical value of the sup-F statistic.
+
+    Parameters:
+        k_params (int): Number of coefficients tested.
+        trim (float): Share of the sample excluded at either end.
+        level (float): Significance level.
+
+    Returns:
+        float: The value the sup-F statistic exceeds with probability `level` when
+               there is no break.
+    """
+    null = _sup_f_null(int(k_params), round(float(trim), 4))
+    return float(np.quantile(null, 1 - level))
+
+
+def break_scan(y, X, constant=True, trim=TRIM, n_breaks=3, min_distance=None):
+    """
+    Scan a regression for a structural break at every candidate period.
+
+    Periods where the series or any driver is missing are dropped first.
+
+    Parameters:
+        y (pd.Series): The dependent series, indexed by period.
+        X (pd.DataFrame): The drivers, without a constant column.
+        constant (bool): Whether the model includes a constant.
+        trim (float): Share of the sample excluded at either end.
+        n_breaks (int): Number of break dates reported.
+        min_distance (int, optional): Fewest periods between reported break dates.
+                                      Defaults to the trimmed share of the sample.
+
+    Returns:
+        tuple: A tuple containing:
+            - profile (pd.DataFrame): Indexed by the first period after each
+              candidate break, with "f_stat" and the pointwise "p_value".
+            - best (pd.DataFrame): The `n_breaks` highest peaks of the profile at
+              least `min_distance` apart, strongest first, with "date", "f_stat"
+              and "p_value". The sup-F statistic and its p-value are kept in
+              `attrs` ("sup_f", "sup_f_pvalue", "k_params" and "trim").
+
+    Raises:
+        ValueError: If the sample is too short to test for a break.
+    """
+    sample = pd.concat([y, X], axis=1).dropna()
+    breaks, f_stats, p_values, k_params = chow_profile(
+        sample.iloc[:, 0].to_numpy(dtype=float),
+        sample.iloc[:, 1:].to_numpy(dtype=float),
+        constant,
+        trim,
+    )
+    profile = pd.DataFrame(
+        {"f_stat": f_stats, "p_value": p_values},
+        index=sample.index[breaks],
+    )
+
+    min_distance = max(int(min_distance or np.ceil(trim * len(sample))), 1)
+    chosen = []
+    for position in np.argsort(-np.nan_to_num(f_stats, nan=-np.inf), kind="stable"):
+        if len(chosen) >= n_breaks:
+            break
+        if all(abs(position - other) >= min_distance for other in chosen):
+            chosen.append(position)
+    best = pd.DataFrame(
+        {
+            "date": [format_period(period) for period in profile.index[chosen]],
+            "f_stat": f_stats[chosen],
+            "p_value": p_values[chosen],
+        }
+    )
+    sup_f = float(np.nanmax(f_stats))
+    best.attrs = {
+        "sup_f": sup_f,
+        "sup_f_pvalue": sup_f_pvalue(sup_f, k_params, trim),
+        "k_params": k_params,
+        "trim": trim,
+    }
+    return profile, best
@@ -0,0 +1,225 @@
+"""
+Bulk Excel Input Template Generation.
+
+This module generates the Excel input templates of many projects in one go, outside
+the Streamlit form. Projects are described in a YAML or JSON manifest and their
+templates are created concurrently in a process pool with `write_input_template`.
+Instead of printing errors, every project's outcome (output path, time taken and any
+error) is returned as a row of a summary table.
+
+A manifest lists the projects under "projects". Each project uses the parameter
+names of `write_input_template`; keys under "defaults" apply to every project that
+does not set them itself:
+
+    defaults:
+      output_folder_path: data/reg_input
+      write_only: true
+      timeline_inputs:
+        Timestep: Quarterly
+        Start Year: 2012
+        Start Timestep: 1
+        End Year: 2023
+        End Timestep: 4
+    projects:
+      - name_variables: {Client: Client A, Project: A32 Corridor}
+        y_variables: {A32 LV Traffic AADT: abs}
+        x_variables: {GDP: abs, Unemployment: pct_val_or_dummy}
+
+When "file_name" is omitted it defaults to "{Project} Regression Inputs", as on the
+Input Template page.
+
+Functions:
+- load_manifest(manifest_path):
+    Reads a YAML or JSON manifest and returns the list of fully specified projects.
+
+- generate_templates(projects, max_workers):
+    Creates the template of every project in a process pool and returns a summary.
+
+- main(argv):
+    Command-line entry point (see `src/generate_templates.py`).
+"""
+
+import argparse
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import yaml
+from openpyxl.utils.exceptions import InvalidFileException
+from apppages.utils.excel import write_input_template
+
+# Constants
+SUMMARY_COLUMNS = [
+    "project",
+    "file_name",
+    "output_path",
+    "seconds",
+    "status",
+    "error_type",
+    "error_message",
+]
+
+
+def load_manifest(manifest_path):
+    """
+    Read a manifest of projects from a YAML or JSON file.
+
+    Parameters:
+        manifest_path (str): Path to the manifest (".yaml", ".yml" or ".json").
+
+    Returns:
+        list: One dictionary of `write_input_template` arguments per project, with the
+              manifest defaults applied. Entries that are not mappings are kept as
+              they are, to be reported as failed projects.
+
+    Raises:
+        ValueError: If the manifest has no "projects" list, or its "defaults" are
+                    not a mapping.
+    """
+    with open(manifest_path, encoding="utf-8") as f:
+        if manifest_path.lower().endswith(".json"):
+            manifest = json.load(f)
+        else:
+            manifest = yaml.safe_load(f)
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("projects"), list):
+        raise ValueError("The manifest must contain a list of 'projects'.")
+
+    defaults = manifest.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("The manifest 'defaults' must be a mapping.")
+    projects = []
+    for project in manifest["projects"]:
+        if not isinstance(project, dict):
+            projects.append(project)
+            continue
+        project = {**defaults, **project}
+        if "file_name" not in project:
+            # Malformed name variables are reported when the project is generated
+            names = project.get("name_variables")
+            name = names.get("Project", "") if isinstance(names, dict) else ""
+            project["file_name"] = f"{name} Regression Inputs"
+        projects.append(project)
+    return projects
+
+
+def _generate_one(project):
+    """
+    Create the template of a single project, timing it and capturing any error.
+
+    Parameters:
+        project (dict): The `write_input_template` arguments of the project.
+
+    Returns:
+        dict: One row of the summary table.
+    """
+    start = time.perf_counter()
+    result = {
+        "project": None,
+        "file_name": None,
+        "output_path": None,
+        "status": "ok",
+        "error_type": None,
+        "error_message": None,
+    }
+    try:
+        if not isinstance(project, dict):
+            raise TypeError(
+                f"A project must be a mapping of template arguments, not {project!r}."
+            )
+        result["file_name"] = project.get("file_name")
+        result["project"] = (project.get("name_variables") or {}).get("Project")
+        output_folder_path = project["output_folder_path"]
+        if not os.path.isdir(output_folder_path):
+            raise FileNotFoundError(
+                f"The folder path '{output_folder_path}' does not exist."
+            )
+        result["output_path"] = write_input_template(
+            project["name_variables"],
+            project.get("y_variables") or {},
+            project.get("x_variables") or {},
+            project["timeline_inputs"],
+            project["file_name"],
+            output_folder_path,
+            write_only=project.get("write_only", True),
+        )
+    except (
+        AttributeError,
+        KeyError,
+        TypeError,
+        ValueError,
+        OSError,
+        zipfile.BadZipFile,
+        InvalidFileException,
+    ) as e:
+        result["status"] = "failed"
+        result["error_type"] = type(e).__name__
+        result["error_message"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def generate_templates(projects, max_workers=None):
+    """
+    Create the Excel input template of every project in a process pool.
+
+    Parameters:
+        projects (list): One dictionary of `write_input_template` arguments per
+                         project, as returned by `load_manifest`.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+                                     number of CPUs; 1 runs in the calling process.
+
+    Returns:
+        pd.DataFrame: One row per project with the output path, time taken in seconds,
+                      status ("ok" or "failed") and the error type and message.
+    """
+    if max_workers == 1 or len(projects) <= 1:
+        results = [_generate_one(project) for project in projects]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_generate_one, projects))
+    return pd.DataFrame(results, columns=SUMMARY_COLUMNS)
+
+
+def main(argv=None):
+    """
+    Generate the templates of a manifest from the command line.
+
+    Parameters:
+        argv (list, optional): Command-line arguments; defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Exit code, 0 if every template was created and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate Excel input templates for every project in a manifest."
+    )
+    parser.add_argument("manifest", help="Path to a YAML or JSON project manifest.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--output-folder",
+        default=None,
+        help="Override the output folder of every project.",
+    )
+    parser.add_argument(
+        "--summary", default=None, help="Optional CSV path for the run summary."
+    )
+    args = parser.parse_args(argv)
+
+    projects = load_manifest(args.manifest)
+    if args.output_folder is not None:
+        for project in projects:
+            if isinstance(project, dict):
+                project["output_folder_path"] = args.output_folder
+
+    summary = generate_templates(projects, max_workers=args.workers)
+    print(summary.to_string(index=False))
+    if args.summary:
+        summary.to_csv(args.summary, index=False)
+
+    return int((summary["status"] != "ok").any())
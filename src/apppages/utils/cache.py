@@ -0,0 +1,255 @@
+"""
+Parse Cache for Input Workbooks.
+
+This module keeps the parsed contents of completed input templates on disk so that
+re-reading an unchanged workbook does not go through openpyxl again. Each parsed
+workbook is stored as a Parquet sidecar holding the DataFrame together with a JSON
+metadata file holding the time series index and the variable type dictionary.
+
+Entries are addressed by a hash of the workbook contents. A small JSON index maps
+each source path, file size and modification time to its content hash, so an
+unchanged file is recognised from `os.stat` alone and only a changed (or renamed)
+file has to be hashed. The cache lives on disk and is therefore shared by every
+Streamlit session running on the same server. Its total size is bounded and the
+least recently used entries are evicted first.
+
+Constants:
+- CACHE_DIR (str): Default directory holding the cache entries and index.
+- MAX_CACHE_BYTES (int): Default upper bound on the total size of the cache.
+
+Functions:
+- file_digest(file_path):
+    Returns the BLAKE2b hex digest of a file's contents.
+
+- cached_spreadsheet_to_df(input_file_path, cache_dir, max_bytes):
+    Drop-in replacement for `spreadsheet_to_df` that serves repeated reads of an
+    unchanged workbook from the cache.
+
+- clear_cache(cache_dir):
+    Removes every entry from the cache.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+from apppages.utils.excel import spreadsheet_to_df
+from apppages.utils.timeline import labels_to_period_index, period_labels
+
+# Constants
+CACHE_DIR = "data/cache"
+MAX_CACHE_BYTES = 512 * 1024**2
+INDEX_FILE = "index.json"
+DATA_FILE = "data.parquet"
+META_FILE = "meta.json"
+
+# Streamlit serves every session from the same process, so one lock is enough to
+# keep concurrent sessions from interleaving index updates.
+_LOCK = threading.Lock()
+
+
+def file_digest(file_path, chunk_size=1024**2):
+    """
+    Compute the content hash of a file.
+
+    Parameters:
+        file_path (str): The path of the file to hash.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The BLAKE2b hex digest of the file's contents.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path, data):
+    """
+    Write JSON data atomically by replacing the target with a fully written file.
+
+    Parameters:
+        path (str): The destination path.
+        data (dict): JSON-serialisable data.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _load_index(cache_dir):
+    """
+    Load the cache index, returning an empty index if it is missing or unreadable.
+
+    Parameters:
+        cache_dir (str): The cache directory.
+
+    Returns:
+        dict: The index with "paths" and "entries" sections.
+    """
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    index.setdefault("paths", {})
+    index.setdefault("entries", {})
+    return index
+
+
+def _entry_size(entry_dir):
+    """
+    Return the total size in bytes of the files of one cache entry.
+
+    Parameters:
+        entry_dir (str): The directory of the cache entry.
+
+    Returns:
+        int: The size of the entry on disk.
+    """
+    return sum(
+        os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir)
+    )
+
+
+def _evict(index, cache_dir, max_bytes):
+    """
+    Remove least recently used entries until the cache fits within `max_bytes`.
+
+    Parameters:
+        index (dict): The cache index, updated in place.
+        cache_dir (str): The cache directory.
+        max_bytes (int): The upper bound on the total size of the cache.
+    """
+    entries = index["entries"]
+    total = sum(entry["bytes"] for entry in entries.values())
+    for digest in sorted(entries, key=lambda d: entries[d]["last_access"]):
+        if total <= max_bytes:
+            break
+        total -= entries.pop(digest)["bytes"]
+        shutil.rmtree(os.path.join(cache_dir, digest), ignore_errors=True)
+
+    live = set(entries)
+    index["paths"] = {
+        path: info for path, info in index["paths"].items() if info["digest"] in live
+    }
+
+
+def _read_entry(entry_dir):
+    """
+    Read a parsed workbook back from a cache entry.
+
+    Parameters:
+        entry_dir (str): The directory of the cache entry.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple returned by `spreadsheet_to_df`.
+    """
+    with open(os.path.join(entry_dir, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    df = pd.read_parquet(os.path.join(entry_dir, DATA_FILE))
+    df.index = labels_to_period_index(meta["df_index"])
+    return df, df.index, meta["var_dict"]
+
+
+def _write_entry(entry_dir, df, var_dict, source):
+    """
+    Store a parsed workbook as a Parquet sidecar plus JSON metadata.
+
+    Parameters:
+        entry_dir (str): The directory of the cache entry.
+        df (pd.DataFrame): The parsed DataFrame.
+        var_dict (dict): The variable type dictionary.
+        source (dict): Path, size and modification time of the source workbook.
+    """
+    tmp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    df.to_parquet(os.path.join(tmp_dir, DATA_FILE), index=False)
+    meta = {
+        "df_index": period_labels(df.index),
+        "var_dict": var_dict,
+        "source": source,
+        "created": time.time(),
+    }
+    _write_json(os.path.join(tmp_dir, META_FILE), meta)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another session stored the same contents first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def cached_spreadsheet_to_df(
+    input_file_path, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES
+):
+    """
+    Read a completed template, serving unchanged workbooks from the parse cache.
+
+    The workbook is looked up by path, size and modification time first; only if
+    those do not match a known file is its content hashed. A cache miss parses the
+    workbook with `spreadsheet_to_df` and stores the result for later reads.
+
+    Parameters:
+        input_file_path (str): The file path to the input Excel file.
+        cache_dir (str): Directory holding the cache entries and index.
+        max_bytes (int): Upper bound on the total size of the cache in bytes.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple returned by `spreadsheet_to_df`.
+    """
+    path = os.path.abspath(input_file_path)
+    stat = os.stat(path)
+    source = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    with _LOCK:
+        os.makedirs(cache_dir, exist_ok=True)
+        index = _load_index(cache_dir)
+        known = index["paths"].get(path)
+        if (
+            known is not None
+            and known["size"] == stat.st_size
+            and known["mtime_ns"] == stat.st_mtime_ns
+        ):
+            digest = known["digest"]
+        else:
+            digest = file_digest(path)
+        entry_dir = os.path.join(cache_dir, digest)
+
+        if digest in index["entries"] and os.path.isdir(entry_dir):
+            try:
+                result = _read_entry(entry_dir)
+            except (OSError, ValueError):
+                result = None
+        else:
+            result = None
+
+        if result is None:
+            result = spreadsheet_to_df(path)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            _write_entry(entry_dir, result[0], result[2], source)
+            index["entries"][digest] = {"bytes": _entry_size(entry_dir)}
+
+        index["entries"][digest]["last_access"] = time.time()
+        index["paths"][path] = {**source, "digest": digest}
+        _evict(index, cache_dir, max_bytes)
+        _write_json(os.path.join(cache_dir, INDEX_FILE), index)
+
+    return result
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """
+    Remove every entry from the parse cache.
+
+    Parameters:
+        cache_dir (str): Directory holding the cache entries and index.
+    """
+    with _LOCK:
+        shutil.rmtree(cache_dir, ignore_errors=True)
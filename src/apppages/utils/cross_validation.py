@@ -0,0 +1,312 @@
+"""
+Time-Series Cross-Validation.
+
+This module measures how well a growth-rate regression predicts periods it was not
+fitted on. The sample is split into folds that respect the order of time:
+
+- "rolling_origin": each fold fits the periods before a forecast origin and tests the
+  block of periods that follows it; the origin moves forward fold by fold, so every
+  training window expands.
+- "blocked_kfold": the sample is cut into contiguous blocks; each block is tested in
+  turn on a model fitted to the other blocks, leaving out `gap` periods on either side
+  of the test block to limit leakage through autocorrelation.
+
+Every training set is at most two contiguous ranges of periods, so its cross-product
+(Gram) matrix is the difference of two running sums. The running sums of Z'Z and Z'y
+are accumulated once and every fold, and every candidate model within a fold, is
+solved from them without touching the observations again. Folds are evaluated in a
+process pool when there is enough work to pay for it.
+
+Errors are measured on the growth factors: the root mean squared error (RMSE) and the
+mean absolute percentage error (MAPE, in percent). The aggregate row pools the
+prediction errors of all folds.
+
+Constants:
+- SCHEMES (tuple): The fold schemes: "rolling_origin" and "blocked_kfold".
+- FOLD_COLUMNS (list): Columns of the per-fold table.
+
+Functions:
+- make_folds(nobs, scheme, n_folds, min_train, gap):
+    Returns the training ranges and test range of each fold.
+
+- fold_moments(y, X, folds, constant):
+    Returns the cross-products of every fold's training set from running sums.
+
+- subset_cv_errors(moments, subsets, max_workers):
+    Returns the per-fold and aggregate errors of a batch of driver subsets.
+
+- cross_validate(y, X, scheme, n_folds, min_train, gap, constant, max_workers):
+    Returns the per-fold and aggregate errors of one model as tables.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# Constants
+SCHEMES = ("rolling_origin", "blocked_kfold")
+FOLD_COLUMNS = [
+    "fold",
+    "train_periods",
+    "test_start",
+    "test_end",
+    "n_train",
+    "n_test",
+    "rmse",
+    "mape",
+]
+PARALLEL_MIN_FITS = 50_000
+
+
+def make_folds(nobs, scheme="rolling_origin", n_folds=5, min_train=None, gap=0):
+    """
+    Split `nobs` ordered periods into training and test sets.
+
+    Parameters:
+        nobs (int): Number of periods in the sample.
+        scheme (str): One of SCHEMES.
+        n_folds (int): Number of folds.
+        min_train (int, optional): Periods in the first training window of the
+                                   rolling-origin scheme. Defaults to half the
+                                   sample.
+        gap (int): Periods left out between the training and test sets.
+
+    Returns:
+        list: One (train_ranges, test_range) tuple per fold, where train_ranges is a
+              tuple of (start, stop) position ranges and test_range a (start, stop)
+              range.
+
+    Raises:
+        ValueError: If the scheme is unknown or the sample is too short.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(
+            f"Unknown fold scheme '{scheme}'. Choose one of {', '.join(SCHEMES)}."
+        )
+    gap = max(int(gap), 0)
+    if scheme == "rolling_origin":
+        min_train = nobs // 2 if min_train is None else int(min_train)
+        n_test = nobs - min_train - gap
+        if min_train < 1 or n_test < 1:
+            raise ValueError("The sample is too short for the first training window.")
+        n_folds = min(n_folds, n_test)
+        edges = min_train + gap + np.linspace(0, n_test, n_folds + 1).round()
+        return [
+            (((0, int(start) - gap),), (int(start), int(stop)))
+            for start, stop in zip(edges[:-1], edges[1:])
+        ]
+
+    if n_folds < 2 or nobs < n_folds:
+        raise ValueError("Blocked k-fold needs at least two folds and a period each.")
+    edges = np.linspace(0, nobs, n_folds + 1).round().astype(int).tolist()
+    folds = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        train = ((0, max(start - gap, 0)), (min(stop + gap, nobs), nobs))
+        folds.append((tuple(r for r in train if r[1] > r[0]), (start, stop)))
+    return folds
+
+
+def fold_moments(y, X, folds, constant=True):
+    """
+    Compute the training cross-products of every fold from running sums.
+
+    When the models include a constant, the data are shifted by their sample means
+    first and a column of ones is appended as the last column of the design.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The candidate drivers, shape (nobs, drivers).
+        folds (list): The folds returned by `make_folds`.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        dict: "gram" (folds, k, k) and "xty" (folds, k) of the training sets,
+              "n_train" (folds,), the shifted design "Z" and series "y", the shift
+              "y_shift", the "folds" and "constant".
+    """
+    y_shift = y.mean() if constant else 0.0
+    x_shift = X.mean(axis=0) if constant else np.zeros(X.shape[1])
+    Z = X - x_shift
+    if constant:
+        Z = np.column_stack([Z, np.ones(len(Z))])
+    yc = y - y_shift
+
+    k_cols = Z.shape[1]
+    cum_gram = np.zeros((len(Z) + 1, k_cols, k_cols))
+    np.cumsum(np.einsum("ti,tj->tij", Z, Z), axis=0, out=cum_gram[1:])
+    cum_xty = np.zeros((len(Z) + 1, k_cols))
+    np.cumsum(Z * yc[:, None], axis=0, out=cum_xty[1:])
+
+    gram = np.zeros((len(folds), k_cols, k_cols))
+    xty = np.zeros((len(folds), k_cols))
+    n_train = np.zeros(len(folds), dtype=int)
+    for f, (train, _) in enumerate(folds):
+        for start, stop in train:
+            gram[f] += cum_gram[stop] - cum_gram[start]
+            xty[f] += cum_xty[stop] - cum_xty[start]
+            n_train[f] += stop - start
+    return {
+        "gram": gram,
+        "xty": xty,
+        "n_train": n_train,
+        "Z": Z,
+        "y": yc,
+        "y_shift": y_shift,
+        "folds": folds,
+        "constant": constant,
+    }
+
+
+def _fold_errors(job, subsets, y_shift):
+    """
+    Fit a batch of subsets on one fold's training set and score its test set.
+
+    Parameters:
+        job (tuple): The fold's (gram, xty, n_train, Z_test, y_test).
+        subsets (np.ndarray): Integer array (models, size) of design columns,
+                              including the constant column if any.
+        y_shift (float): The shift removed from the dependent series.
+
+    Returns:
+        tuple: The sum of squared errors and of absolute percentage errors, and
+               the number of percentage errors, per model.
+    """
+    gram, xty, n_train, Z_test, y_test = job
+    if n_train <= subsets.shape[1]:
+        nan = np.full(len(subsets), np.nan)
+        return nan, nan, np.zeros(len(subsets))
+    sub_gram = gram[subsets[:, :, None], subsets[:, None, :]]
+    sub_xty = xty[subsets]
+    try:
+        params = np.linalg.solve(sub_gram, sub_xty[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        params = np.einsum(
+            "mij,mj->mi", np.linalg.pinv(sub_gram, hermitian=True), sub_xty
+        )
+    errors = np.einsum("tmi,mi->mt", Z_test[:, subsets], params) - y_test
+    actual = y_test + y_shift
+    valid = actual != 0
+    ape = np.abs(errors[:, valid] / actual[valid])
+    return (errors**2).sum(axis=1), ape.sum(axis=1), np.full(len(subsets), valid.sum())
+
+
+def subset_cv_errors(moments, subsets, max_workers=1):
+    """
+    Cross-validate a batch of driver subsets from the shared fold moments.
+
+    Parameters:
+        moments (dict): The cross-products returned by `fold_moments`.
+        subsets (np.ndarray): Integer array (models, size) of driver positions; the
+                              constant is added when the moments include one.
+        max_workers (int, optional): Number of worker processes over the folds.
+                                     None uses every CPU when the batch is large;
+                                     1 evaluates the folds in the calling process.
+
+    Returns:
+        dict: "rmse" and "mape" of shape (models, folds), and the pooled
+              "cv_rmse" and "cv_mape" of shape (models,).
+    """
+    subsets = np.asarray(subsets, dtype=np.intp)
+    if moments["constant"]:
+        const_col = np.full((len(subsets), 1), moments["Z"].shape[1] - 1)
+        subsets = np.hstack([subsets, const_col])
+    jobs = [
+        (
+            moments["gram"][f],
+            moments["xty"][f],
+            moments["n_train"][f],
+            moments["Z"][start:stop],
+            moments["y"][start:stop],
+        )
+        for f, (_, (start, stop)) in enumerate(moments["folds"])
+    ]
+    score = partial(_fold_errors, subsets=subsets, y_shift=moments["y_shift"])
+    large = len(subsets) * len(jobs) >= PARALLEL_MIN_FITS
+    if max_workers == 1 or len(jobs) <= 1 or (max_workers is None and not large):
+        results = [score(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(score, jobs))
+
+    sse, ape, n_ape = (np.stack(parts, axis=1) for parts in zip(*results))
+    n_test = np.array([stop - start for _, (start, stop) in moments["folds"]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "rmse": np.sqrt(sse / n_test),
+            "mape": 100 * ape / n_ape,
+            "cv_rmse": np.sqrt(sse.sum(axis=1) / n_test.sum()),
+            "cv_mape": 100 * ape.sum(axis=1) / n_ape.sum(axis=1),
+        }
+
+
+def cross_validate(
+    y,
+    X,
+    scheme="rolling_origin",
+    n_folds=5,
+    min_train=None,
+    gap=0,
+    constant=True,
+    max_workers=None,
+):
+    """
+    Cross-validate one regression over ordered folds of its sample.
+
+    Periods where the series or any driver is missing are dropped first.
+
+    Parameters:
+        y (pd.Series): The dependent series, indexed by period.
+        X (pd.DataFrame): The drivers, with the same index as `y`.
+        scheme (str): One of SCHEMES.
+        n_folds (int): Number of folds.
+        min_train (int, optional): First training window of the rolling-origin
+                                   scheme. Defaults to half the sample.
+        gap (int): Periods left out between the training and test sets.
+        constant (bool): Whether the regression includes a constant.
+        max_workers (int, optional): Number of worker processes over the folds.
+
+    Returns:
+        tuple: A tuple containing:
+            - folds (pd.DataFrame): One row per fold with FOLD_COLUMNS.
+            - summary (pd.DataFrame): One row with the number of folds and test
+              periods and the pooled "rmse" and "mape".
+
+    Raises:
+        ValueError: If the scheme is unknown or the sample is too short.
+    """
+    sample = pd.concat([y, X], axis=1).dropna()
+    y_values = sample.iloc[:, 0].to_numpy(dtype=float)
+    x_values = sample.iloc[:, 1:].to_numpy(dtype=float)
+    folds = make_folds(len(sample), scheme, n_folds, min_train, gap)
+    moments = fold_moments(y_values, x_values, folds, constant)
+    subsets = np.arange(x_values.shape[1])[None, :]
+    errors = subset_cv_errors(moments, subsets, max_workers)
+
+    index = sample.index
+    table = pd.DataFrame(
+        {
+            "fold": np.arange(1, len(folds) + 1),
+            "train_periods": [
+                ", ".join(f"{index[a]}–{index[b - 1]}" for a, b in train)
+                for train, _ in folds
+            ],
+            "test_start": [index[start] for _, (start, _) in folds],
+            "test_end": [index[stop - 1] for _, (_, stop) in folds],
+            "n_train": moments["n_train"],
+            "n_test": [stop - start for _, (start, stop) in folds],
+            "rmse": errors["rmse"][0],
+            "mape": errors["mape"][0],
+        }
+    )
+    summary = pd.DataFrame(
+        {
+            "scheme": [scheme],
+            "folds": [len(folds)],
+            "n_test": [int(table["n_test"].sum())],
+            "rmse": errors["cv_rmse"],
+            "mape": errors["cv_mape"],
+        }
+    )
+    return table[FOLD_COLUMNS], summary
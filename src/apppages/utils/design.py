@@ -0,0 +1,235 @@
+"""
+Design Terms.
+
+Seasonal, event and trend drivers used to have to be typed into the Excel template
+by hand as "pct_val_or_dummy" variables. This module generates them from the
+timeline instead and appends them to the growth dataframe as "g: x:" drivers, so
+single fits, searches and penalised paths can all select them like any other
+driver.
+
+Every term is computed from the PeriodIndex of the growth dataframe as a whole
+array: the seasonal dummies compare the phase of every period with every season at
+once, event dummies compare the period positions with the event positions, and the
+trend powers are taken of one time array. The terms are written into the column
+slices of a single preallocated block, which becomes one DataFrame appended to the
+growth columns, instead of inserting the columns into the DataFrame one by one.
+
+- Seasonal dummies ("g: x:Season Q2", "g: x:Season Feb"): 1 in that quarter or
+  month. The first season is left out, as it is implied by the constant.
+- Step dummies ("g: x:Step 2020 Q2"): 0 before the date and 1 from it on.
+- Pulse dummies ("g: x:Pulse 2020 Q2"): 1 at the date only.
+- Break dummies ("g: x:Break 2020 Q2"): step dummies at the dates found by the
+  structural break scan (see `breaks`).
+- Trend terms ("g: x:Trend", "g: x:Trend^2"): years since the first period, and its
+  powers up to the chosen degree.
+
+The terms in use are described by a dict (see `NO_TERMS`) that is kept in session
+state, so that they are rebuilt whenever the growth dataframe is, e.g. on a change
+of horizon. The names of the terms built are kept next to it, so that only those
+columns are replaced when the settings change.
+
+Constants:
+- TERM_PREFIX (str): Prefix of the generated driver names.
+- EVENT_KINDS (dict): Event term key to the label of its dummies.
+- NO_TERMS (dict): Terms settings that generate no terms.
+- SEASON_PREFIX (str), TREND_NAME (str): Names of the seasonal and trend terms.
+
+Functions:
+- seasonal_dummies(index):
+    Returns the seasonal dummy names and values of a timeline.
+
+- event_dummies(index, dates, kind):
+    Returns the step, pulse or break dummy names and values of event dates.
+
+- trend_terms(index, degree):
+    Returns the trend term names and values of a timeline.
+
+- term_name(kind, date):
+    Returns the driver name of an event dummy.
+
+- design_terms(index, terms):
+    Returns every term of the settings as one DataFrame.
+
+- add_design_terms(g_df, terms, generated):
+    Returns the growth dataframe with the generated terms appended, and their names.
+"""
+
+from calendar import month_abbr
+
+import numpy as np
+import pandas as pd
+from apppages.utils.timeline import format_period, period_labels, periods_per_year
+
+# Constants
+TERM_PREFIX = "g: x:"
+EVENT_KINDS = {"steps": "Step", "pulses": "Pulse", "breaks": "Break"}
+NO_TERMS = {"seasonal": False, "trend": 0, "steps": (), "pulses": (), "breaks": ()}
+SEASON_PREFIX = "Season "
+TREND_NAME = "Trend"
+
+
+def _period_index(index):
+    """
+    Check that a timeline has a monthly, quarterly or yearly frequency.
+
+    Raises:
+        ValueError: If `index` is not a PeriodIndex.
+    """
+    if not isinstance(index, pd.PeriodIndex):
+        raise ValueError(
+            "Design terms need a monthly, quarterly or yearly timeline index."
+        )
+    return index
+
+
+def seasonal_dummies(index):
+    """
+    Build a dummy per season (quarter or month) of a timeline, except the first.
+
+    Parameters:
+        index (pd.PeriodIndex): The timeline.
+
+    Returns:
+        tuple: The driver names and the dummies, shape (periods, seasons - 1). Yearly
+               data has no seasons and returns no dummies.
+    """
+    prd = periods_per_year(_period_index(index))
+    if prd == 1:
+        return [], np.empty((len(index), 0))
+    # Period ordinals count from 1970 Q1 or January, so they give the season directly
+    phase = index.asi8 % prd
+    seasons = np.arange(1, prd)
+    labels = [f"Q{s + 1}" for s in seasons] if prd == 4 else month_abbr[2:]
+    names = [f"{TERM_PREFIX}{SEASON_PREFIX}{label}" for label in labels]
+    return names, np.equal.outer(phase, seasons).astype(float)
+
+
+def term_name(kind, date):
+    """
+    Name the dummy of an event date as a growth driver.
+
+    Parameters:
+        kind (str): "steps", "pulses" or "breaks".
+        date (pd.Period or str): The event period, or its template label.
+
+    Returns:
+        str: E.g. "g: x:Step 2020 Q2".
+    """
+    label = date if isinstance(date, str) else format_period(date)
+    return f"{TERM_PREFIX}{EVENT_KINDS[kind]} {label}"
+
+
+def event_dummies(index, dates, kind="steps"):
+    """
+    Build a step or pulse dummy per event date.
+
+    Parameters:
+        index (pd.PeriodIndex): The timeline.
+        dates (iterable): Event dates as template labels, e.g. "2020 Q2".
+        kind (str): "steps" and "breaks" are 0 before the date and 1 from it on;
+                    "pulses" are 1 at the date only.
+
+    Returns:
+        tuple: The driver names and the dummies, shape (periods, dates). Dates
+               outside the timeline are skipped.
+    """
+    labels = pd.Index(period_labels(_period_index(index)))
+    dates = [date for date in dict.fromkeys(dates) if date in labels]
+    positions = labels.get_indexer(dates)
+    compare = np.equal if kind == "pulses" else np.greater_equal
+    values = compare.outer(np.arange(len(index)), positions).astype(float)
+    return [term_name(kind, date) for date in dates], values
+
+
+def trend_terms(index, degree=1):
+    """
+    Build a time trend and its powers.
+
+    The trend counts years since the first period of the timeline, so that its
+    coefficient reads as a change per year whatever the frequency.
+
+    Parameters:
+        index (pd.PeriodIndex): The timeline.
+        degree (int): The highest power; 0 builds no terms.
+
+    Returns:
+        tuple: The driver names and the terms, shape (periods, degree).
+    """
+    index = _period_index(index)
+    years = (index.asi8 - index.asi8[0]) / periods_per_year(index)
+    powers = np.arange(1, degree + 1)
+    names = [
+        f"{TERM_PREFIX}{TREND_NAME}" + (f"^{power}" if power > 1 else "")
+        for power in powers
+    ]
+    return names, np.power.outer(years, powers)
+
+
+def design_terms(index, terms):
+    """
+    Build every term of the settings as one DataFrame.
+
+    Parameters:
+        index (pd.PeriodIndex): The timeline.
+        terms (dict): Settings as in `NO_TERMS`: "seasonal" (bool), "trend" (int
+                      degree) and the event date labels of "steps", "pulses" and
+                      "breaks".
+
+    Returns:
+        pd.DataFrame: The terms, indexed by `index`, in the order seasonal, trend,
+                      steps, pulses and breaks.
+
+    Raises:
+        ValueError: If terms are requested for an index that is not a PeriodIndex.
+    """
+    terms = {**NO_TERMS, **(terms or {})}
+    parts = []
+    if terms["seasonal"]:
+        parts.append(seasonal_dummies(index))
+    if terms["trend"]:
+        parts.append(trend_terms(index, int(terms["trend"])))
+    for kind in EVENT_KINDS:
+        if terms[kind]:
+            parts.append(event_dummies(index, terms[kind], kind))
+
+    names = [name for part_names, _ in parts for name in part_names]
+    block = np.empty((len(index), len(names)))
+    start = 0
+    for part_names, values in parts:
+        block[:, start : start + len(part_names)] = values
+        start += len(part_names)
+    return pd.DataFrame(block, index=index, columns=names)
+
+
+def add_design_terms(g_df, terms, generated=()):
+    """
+    Append the generated terms to the growth dataframe.
+
+    The terms generated by an earlier call are replaced, so the result holds exactly
+    the terms of the settings. Only the columns listed in `generated` are replaced:
+    an input variable is never taken for a generated term, whatever its name.
+
+    Parameters:
+        g_df (pd.DataFrame): The growth dataframe, indexed by period.
+        terms (dict): Settings as in `NO_TERMS`.
+        generated (iterable): The term names returned by the call that built `g_df`.
+
+    Returns:
+        tuple: The growth columns followed by the terms, and the names of the terms.
+               `g_df` itself is returned when there are no terms to add or remove.
+
+    Raises:
+        ValueError: If a term has the name of a variable of `g_df`.
+    """
+    stale = [column for column in generated if column in g_df.columns]
+    block = design_terms(g_df.index, terms)
+    clashes = g_df.columns.drop(stale).intersection(block.columns)
+    if len(clashes):
+        raise ValueError(
+            "The generated terms "
+            + ", ".join(clashes)
+            + " have the name of an input variable. Rename the variable to use them."
+        )
+    if block.empty and not stale:
+        return g_df, []
+    return pd.concat([g_df.drop(columns=stale), block], axis=1), list(block.columns)
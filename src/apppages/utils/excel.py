@@ -25,8 +25,13 @@ Functions:
     and end year. Returns a dictionary with years, steps, and combined timeline
     strings.
 
+- write_input_template(name_variables, y_variables, x_variables,
+    timeline_inputs, file_name, output_folder_path, write_only):
+    Creates and saves an Excel input template, raising any error encountered and
+    returning the path of the saved file.
+
 - create_input_template(name_variables, y_variables, x_variables,
-    timeline_inputs, file_name, output_folder_path):
+    timeline_inputs, file_name, output_folder_path, write_only):
     Creates an Excel input template based on provided project details, variables,
     and timeline inputs. Handles exceptions related to file operations and
     input validation, saving the final template to the specified directory.
@@ -43,6 +48,26 @@ Functions:
     Adds variable names, types, and corresponding timeline data to the worksheet,
     including the header and value styling.
 
+- build_write_only_template(name_variables, y_variables, x_variables,
+    timeline_inputs, file_name):
+    Builds the same template as a write-only workbook, registering each style
+    once as a named style instead of copying styles cell by cell.
+
+- scan_spreadsheet(input_file_path):
+    Streams a completed template once in read-only mode, collecting variable
+    names, types, the timeline header and the raw time series block.
+
+- numeric_values(values):
+    Converts every cell of the raw time series block to a float (or None).
+
+- values_to_array(converted):
+    Converts the numeric block into a float array, cutting each series at its
+    first non-numeric cell.
+
+- spreadsheet_to_df(input_file_path):
+    Reads a completed template into a DataFrame, its time series index and a
+    dictionary of variable types.
+
 This module is designed to facilitate the creation of structured Excel templates
 for the tool, ensuring consistency and accuracy in the data analysis.
 """
@@ -50,8 +75,14 @@ for the tool, ensuring consistency and accuracy in the data analysis.
 import os
 from copy import copy
 from calendar import month_abbr
+import numpy as np
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
+from openpyxl.utils.indexed_list import IndexedList
 import pandas as pd
+from apppages.utils.timeline import labels_to_period_index
+from apppages.utils.validation import InputValidationError, validate_scan
 
 # Constants
 TEMPLATE_PATH = "data/utils/excel_template_v0.01.xlsx"
@@ -150,16 +181,23 @@ def generate_timeline(timeline_inputs):
     return timelines
 
 
-def create_input_template(
+def write_input_template(
     name_variables,
     y_variables,
     x_variables,
     timeline_inputs,
     file_name,
     output_folder_path,
+    write_only=False,
 ):
     """
-    Create an Excel input template based on project details, variables, and timeline inputs.
+    Create an Excel input template and save it, raising any error encountered.
+
+    By default the template workbook is loaded, columns are inserted for the timeline
+    and cell styles are copied cell by cell. With `write_only=True` the same layout is
+    instead streamed into a write-only workbook whose styles are registered once as
+    named styles (see `build_write_only_template`), which is much faster for long
+    timelines and many variables.
 
     Parameters:
         name_variables (dict): Project and client names.
@@ -168,15 +206,24 @@ def create_input_template(
         timeline_inputs (dict): Timeline details.
         file_name (str): Desired name for the output file.
         output_folder_path (str): Directory path where the file will be saved.
+        write_only (bool): Whether to use the write-only generation mode.
+
+    Returns:
+        str: The path of the saved template.
 
     Raises:
         FileNotFoundError: If the template file is not found.
         KeyError: If a required key is missing in input dictionaries.
         TypeError: If there is a type mismatch in the inputs.
+        ValueError: If the timeline inputs are invalid.
         openpyxl.utils.exceptions.InvalidFileException: If the Excel template is invalid.
         OSError: If there is a problem with file I/O operations.
     """
-    try:
+    if write_only:
+        wb = build_write_only_template(
+            name_variables, y_variables, x_variables, timeline_inputs, file_name
+        )
+    else:
         wb = openpyxl.load_workbook(TEMPLATE_PATH)
         ws = wb.active
 
@@ -195,10 +242,46 @@ def create_input_template(
             ws, x_variables, "Independent Variables", last_row + 5, timelines
         )
 
-        output_path = os.path.join(output_folder_path, f"{file_name}.xlsx")
-        wb.save(output_path)
-        wb.close()
+    output_path = os.path.join(output_folder_path, f"{file_name}.xlsx")
+    wb.save(output_path)
+    wb.close()
+    return output_path
+
+
+def create_input_template(
+    name_variables,
+    y_variables,
+    x_variables,
+    timeline_inputs,
+    file_name,
+    output_folder_path,
+    write_only=False,
+):
+    """
+    Create an Excel input template based on project details, variables, and timeline inputs.
+
+    This wraps `write_input_template`, reporting any file or input error with a
+    printed message instead of raising it.
 
+    Parameters:
+        name_variables (dict): Project and client names.
+        y_variables (dict): Dependent variables and their types.
+        x_variables (dict): Independent variables and their types.
+        timeline_inputs (dict): Timeline details.
+        file_name (str): Desired name for the output file.
+        output_folder_path (str): Directory path where the file will be saved.
+        write_only (bool): Whether to use the write-only generation mode.
+    """
+    try:
+        output_path = write_input_template(
+            name_variables,
+            y_variables,
+            x_variables,
+            timeline_inputs,
+            file_name,
+            output_folder_path,
+            write_only=write_only,
+        )
         print(f"Template created successfully: {output_path}")
 
     except FileNotFoundError:
@@ -303,13 +386,325 @@ def add_variables_with_timeline(ws, variables, header_text, start_row, timelines
     return row
 
 
+def _register_style(wb, name, source_cell):
+    """
+    Register the style of a template cell as a named style of the workbook.
+
+    Parameters:
+        wb (openpyxl.Workbook): The workbook to register the style with.
+        name (str): The name of the new named style.
+        source_cell (openpyxl.cell.Cell): The cell whose style is registered.
+
+    Returns:
+        str: The name of the registered style.
+    """
+    style = NamedStyle(
+        name=name,
+        font=copy(source_cell.font),
+        border=copy(source_cell.border),
+        fill=copy(source_cell.fill),
+        number_format=source_cell.number_format,
+        alignment=copy(source_cell.alignment),
+        protection=copy(source_cell.protection),
+    )
+    wb.add_named_style(style)
+    return name
+
+
+def _grid_variables(grid, variables, header_text, start_row, timelines, styles):
+    """
+    Lay out a block of variables and its timeline header in the cell grid.
+
+    This mirrors `add_variables_with_timeline` for the write-only generation mode.
+
+    Parameters:
+        grid (dict): Row number to {column number: (value, style name)} mapping.
+        variables (dict): A dictionary of variables and their types.
+        header_text (str): The header text to display.
+        start_row (int): The starting row for adding the variables.
+        timelines (dict): The generated timeline data.
+        styles (dict): Named styles for the "header", "value" and "year_step" cells.
+
+    Returns:
+        int: The last row index after adding the variables.
+    """
+    num_columns = len(timelines["combined"])
+    header_row = grid.setdefault(start_row, {})
+    header_row[4] = (header_text, styles["header"])
+    header_row[5] = ("abs/pct", styles["header"])
+
+    for row, key, style in (
+        (start_row - 2, "years", styles["year_step"]),
+        (start_row - 1, "steps", styles["year_step"]),
+        (start_row, "combined", styles["header"]),
+    ):
+        cells = grid.setdefault(row, {})
+        for col, value in enumerate(timelines[key], start=7):
+            cells[col] = (value, style)
+
+    row = start_row
+    for key, item in variables.items():
+        row += 1
+        cells = grid.setdefault(row, {})
+        cells[4] = (key, styles["value"])
+        cells[5] = (item, styles["value"])
+        for col in range(7, 7 + num_columns):
+            cells[col] = (None, styles["value"])
+
+    return row
+
+
+def build_write_only_template(
+    name_variables, y_variables, x_variables, timeline_inputs, file_name
+):
+    """
+    Build the input template as a write-only workbook with shared named styles.
+
+    The template file is only read to pick up its content, layout and styles. Each
+    distinct style is registered once as a named style and referenced by every cell
+    that uses it, and the rows are then streamed to a write-only worksheet. The
+    result looks the same as the template produced by the default generation mode,
+    but the time taken grows linearly with the number of cells.
+
+    Parameters:
+        name_variables (dict): Project and client names.
+        y_variables (dict): Dependent variables and their types.
+        x_variables (dict): Independent variables and their types.
+        timeline_inputs (dict): Timeline details.
+        file_name (str): Desired name for the output file.
+
+    Returns:
+        openpyxl.Workbook: The write-only workbook, ready to be saved.
+    """
+    template_wb = openpyxl.load_workbook(TEMPLATE_PATH)
+    template_ws = template_wb.active
+    timelines = generate_timeline(timeline_inputs)
+    num_columns = len(timelines["combined"])
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(template_ws.title)
+    # Unstyled cells fall back to the workbook default font, which openpyxl only
+    # exposes through its private style tables
+    default_font = copy(template_wb._fonts[0])  # pylint: disable=protected-access
+    wb._fonts = IndexedList([default_font])  # pylint: disable=protected-access
+    wb._named_styles["Normal"].font = default_font  # pylint: disable=protected-access
+
+    # Register each distinct template style once
+    style_names = {}
+
+    def style_of(cell):
+        if not cell.has_style:
+            return None
+        if cell.style_id not in style_names:
+            style_names[cell.style_id] = _register_style(
+                wb, f"Template {len(style_names) + 1}", cell
+            )
+        return style_names[cell.style_id]
+
+    # Template content, shifted right of the inserted timeline columns
+    grid = {}
+    for row in template_ws.iter_rows():
+        for cell in row:
+            if cell.value is None and not cell.has_style:
+                continue
+            col = cell.column if cell.column < 7 else cell.column + num_columns
+            grid.setdefault(cell.row, {})[col] = (cell.value, style_of(cell))
+
+    # Inserted timeline columns take the style of the column they were inserted before
+    for row in range(1, template_ws.max_row + 1):
+        style = style_of(template_ws.cell(row=row, column=7))
+        if style is not None:
+            cells = grid.setdefault(row, {})
+            for col in range(7, 7 + num_columns):
+                cells[col] = (None, style)
+
+    for coordinate, value in (
+        ("B2", name_variables["Client"]),
+        ("B3", name_variables["Project"]),
+        ("B4", file_name),
+        ("B6", "Regression Inputs"),
+    ):
+        source = template_ws[coordinate]
+        grid.setdefault(source.row, {})[source.column] = (value, style_of(source))
+
+    styles = {
+        "header": style_of(template_ws[HEADER_STYLE_CELL]),
+        "value": style_of(template_ws[VALUE_STYLE_CELL]),
+        "year_step": style_of(template_ws["D12"]),
+    }
+    last_row = _grid_variables(
+        grid, y_variables, "Dependent Variables", 13, timelines, styles
+    )
+    _grid_variables(
+        grid, x_variables, "Independent Variables", last_row + 5, timelines, styles
+    )
+
+    # Sheet-level layout must be set before any rows are written
+    # A column dimension can span several columns (the template's "B" covers B:S),
+    # and the default mode leaves the spans where they are when it inserts columns
+    for key, dimension in template_ws.column_dimensions.items():
+        ws.column_dimensions[key].width = dimension.width
+        ws.column_dimensions[key].min = dimension.min
+        ws.column_dimensions[key].max = dimension.max
+    for key, dimension in template_ws.row_dimensions.items():
+        if dimension.height:
+            ws.row_dimensions[key].height = dimension.height
+    ws.sheet_view.showGridLines = template_ws.sheet_view.showGridLines
+    ws.sheet_view.zoomScale = template_ws.sheet_view.zoomScale
+    ws.sheet_properties.tabColor = copy(template_ws.sheet_properties.tabColor)
+    ws.sheet_format = copy(template_ws.sheet_format)
+    template_wb.close()
+
+    for row in range(1, max(grid) + 1):
+        cells = grid.get(row, {})
+        row_cells = [None] * max(cells, default=0)
+        for col, (value, style) in cells.items():
+            cell = WriteOnlyCell(ws, value=value)
+            if style is not None:
+                cell.style = style
+            row_cells[col - 1] = cell
+        ws.append(row_cells)
+
+    return wb
+
+
+def _cell_to_float(value):
+    """
+    Convert a raw cell value to a float, returning None if it is not numeric.
+
+    Mirrors the ``float(str(value))`` conversion used when the template was read
+    cell by cell, so blanks (None) and text terminate a variable's series.
+
+    Parameters:
+        value: The raw cell value as returned by openpyxl.
+
+    Returns:
+        float or None: The numeric value, or None if the cell is not numeric.
+    """
+    try:
+        return float(str(value))
+    except ValueError:
+        return None
+
+
+def scan_spreadsheet(input_file_path):
+    """
+    Stream the Excel template once and collect everything needed to build the inputs.
+
+    The workbook is opened in read-only, values-only mode and every row is visited a
+    single time. During that pass the variable names in column D, their "abs/pct"
+    types in column E, the timeline header row and the raw time series values from
+    column G onwards are gathered.
+
+    Parameters:
+        input_file_path (str): The file path to the input Excel file.
+
+    Returns:
+        dict: A dictionary with keys:
+            - "names" (list): Variable names prefixed with "y:" or "x:", in sheet order.
+            - "rows" (list): The worksheet row number of each variable.
+            - "values" (np.ndarray): Object array (variables x timeline columns) of raw
+              cell values read from column G onwards.
+            - "labels" (list): The timeline labels of the header row as strings.
+            - "var_dict" (dict): Variable name to unit type (e.g. "abs/pct") mapping.
+    """
+    workbook = openpyxl.load_workbook(input_file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+
+        names, rows, data_rows = [], [], []
+        var_dict = {}
+        labels = []
+        dependent_flag = 1
+        idx_row = None
+        for row_num, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            name = row[3] if len(row) > 3 else None  # Column D
+            var_type = row[4] if len(row) > 4 else None  # Column E
+            series = row[6:]  # Column G onwards
+
+            # Timeline header is 2 rows below the first non-empty cell in column G
+            if idx_row is None and series and series[0] is not None:
+                idx_row = row_num + 2
+            if row_num == idx_row:
+                labels = [str(v) for v in series if v is not None]
+
+            if var_type is not None and var_type != "abs/pct":
+                var_dict[name] = var_type
+
+            if name is None:
+                continue
+            if name == "Dependent Variables":
+                dependent_flag = 1
+                continue
+            if name == "Independent Variables":
+                dependent_flag = 0
+                continue
+            names.append(("y:" if dependent_flag == 1 else "x:") + str(name))
+            rows.append(row_num)
+            data_rows.append(series)
+    finally:
+        workbook.close()
+
+    width = max((len(r) for r in data_rows), default=0)
+    values = np.full((len(data_rows), width), None, dtype=object)
+    for i, series in enumerate(data_rows):
+        values[i, : len(series)] = series
+
+    return {
+        "names": names,
+        "rows": rows,
+        "values": values,
+        "labels": labels,
+        "var_dict": var_dict,
+    }
+
+
+def numeric_values(values):
+    """
+    Convert every cell of the raw object block of a scanned template to a number.
+
+    Parameters:
+        values (np.ndarray): Object array (variables x timeline columns) of raw cells.
+
+    Returns:
+        np.ndarray: Object array of the same shape holding floats, or None for cells
+                    that are not numeric.
+    """
+    return np.frompyfunc(_cell_to_float, 1, 1)(values)
+
+
+def values_to_array(converted):
+    """
+    Convert the numeric block of a scanned template into a float array.
+
+    Each variable's series runs from column G until its first non-numeric cell;
+    everything from that cell onwards is set to NaN.
+
+    Parameters:
+        converted (np.ndarray): Object array returned by `numeric_values`.
+
+    Returns:
+        tuple: A tuple containing:
+            - data (np.ndarray): Float array of the same shape with NaN padding.
+            - lengths (np.ndarray): The length of each variable's numeric series.
+    """
+    numeric = np.not_equal(converted, None)
+    # Position of the first non-numeric cell in each row (row width if none)
+    padded = np.concatenate([numeric, np.zeros((len(numeric), 1), bool)], axis=1)
+    lengths = np.argmin(padded, axis=1)
+    in_series = np.arange(numeric.shape[1]) < lengths[:, None]
+    data = np.where(in_series, converted, np.nan).astype(float)
+    return data, lengths
+
+
 def spreadsheet_to_df(input_file_path):
     """
     Convert data in the Excel spreadsheet temlate into a pandas DataFrame.
 
-    This function reads an Excel file, processes specific columns and rows to extract dependent
-    and independent variables data, and then constructs a DataFrame. It also identifies the
-    time series index and gathers variable type/unit information into a dictionary.
+    This function streams the Excel file once (see `scan_spreadsheet`), extracts the
+    dependent and independent variables data into a single 2-D NumPy array and then
+    constructs a DataFrame from it. It also identifies the time series index and
+    gathers variable type/unit information into a dictionary.
 
     Assumptions for the following script to work:
     Column D only has values for dependent and independent variables
@@ -317,9 +712,14 @@ def spreadsheet_to_df(input_file_path):
     Data for each variable found in Column D is being read from column G onwards
     until an empty cell is found (None)
     Output dataframe will name each variable before "Independent Variables" cell
-    as X:{variable name} and every variable after "Independent Variables" cell as Y:{variable name}
+    as Y:{variable name} and every variable after "Independent Variables" cell as X:{variable name}
     Building the index of the df assuming column G is empty (on all rows above data)
-    and column G is the first time series column
+    and column G is the first time series column. The timeline labels are parsed into
+    a monthly, quarterly or yearly PeriodIndex.
+
+    Before the DataFrame is built the whole sheet is validated (see `validate_scan`),
+    so every non-numeric cell, gap, ragged series, duplicate name and unknown type is
+    reported together.
 
     Parameters:
         input_file_path (str): The file path to the input Excel file.
@@ -327,79 +727,24 @@ def spreadsheet_to_df(input_file_path):
     Returns:
         tuple: A tuple containing:
             - df (pd.DataFrame): The resulting DataFrame with dependent and independent variables.
-            - df_index (list): A list representing the DataFrame's time series index.
+            - df_index (pd.PeriodIndex): The DataFrame's time series index.
             - var_dict (dict): A dictionary mapping variables to their unit type (e.g. "abs/pct").
+
+    Raises:
+        InputValidationError: If the sheet fails validation; its `report` attribute
+                              holds the validation report.
     """
-    workbook = openpyxl.load_workbook(input_file_path, data_only=True)
-    sheet = workbook.active
-
-    # Read column names and row names so that the dataframe is filled
-    df_cols = []
-    dependent_flag = 1
-    col = 4  # start from Column D for variable names
-    for row in range(1, sheet.max_row + 1):
-        if sheet.cell(row=row, column=col).value is not None:
-            if sheet.cell(row=row, column=col).value == "Dependent Variables":
-                dependent_flag = 1
-                continue
-            if sheet.cell(row=row, column=col).value == "Independent Variables":
-                dependent_flag = 0
-                continue
-            if dependent_flag == 1:
-                df_cols.append("y:" + sheet.cell(row=row, column=col).value)
-            elif dependent_flag == 0:
-                df_cols.append("x:" + sheet.cell(row=row, column=col).value)
-
-    # Build dataframe by iterating over the columns for each variable
-    df = pd.DataFrame(columns=df_cols)
-    for c in df_cols:
-        temp_list = []
-        for row in range(1, sheet.max_row + 1):
-            if sheet.cell(row=row, column=col).value == c[2:]:
-                start_row = row
-                break
-        cell_names = sheet[start_row]
-        for cell_obj in cell_names[6:]:
-            try:
-                val = float(str(cell_obj.value))
-                temp_list.append(val)
-            except ValueError:
-                break
-        df[c] = temp_list
-
-    # Build the index of the df assuming column G is empty
-    # and column G is the first time series column
-    col = 7  # Start at Col G
-    for row in range(1, sheet.max_row + 1):
-        if sheet.cell(row=row, column=col).value is not None:
-            start_row = row
-            # print(start_row)
-            break
-    idx_row = start_row + 2  # 2 rows below first non-empty cell
-
-    temp_list = []
-    cell_names = sheet[idx_row]
-    for cell_obj in cell_names[(col - 1) :]:
-        try:
-            val = str(cell_obj.value)
-            if val != "None":
-                temp_list.append(val)
-        except ValueError:
-            break
-    df_idx = temp_list
-    df.index = df_idx
-
-    # Read variable type/unit and build a dictionary
-    var_dict = {}
-    col = 5  # Start at Column E
-    for row in range(1, sheet.max_row + 1):
-        if sheet.cell(row=row, column=col).value == "abs/pct" or (
-            sheet.cell(row=row, column=col).value is None
-        ):
-            continue
-        var_dict[sheet.cell(row=row, column=col - 1).value] = sheet.cell(
-            row=row, column=col
-        ).value
+    scan = scan_spreadsheet(input_file_path)
+    converted = numeric_values(scan["values"])
+    report = validate_scan(scan, converted)
+    if not report.empty:
+        raise InputValidationError(report)
+
+    data, lengths = values_to_array(converted)
+    n_rows = int(lengths.max()) if len(lengths) else 0
+
+    df = pd.DataFrame(data[:, :n_rows].T, columns=scan["names"])
+    df.index = labels_to_period_index(scan["labels"])
     df_index = df.index
 
-    return df, df_index, var_dict
+    return df, df_index, scan["var_dict"]
@@ -0,0 +1,366 @@
+"""
+Distributed-Lag Model Search.
+
+Traffic often responds to its drivers with a delay. This module extends the model
+search to lagged drivers: every candidate driver is offered at each lag 0..L, and
+models combine up to `max_size` of these lagged columns, by default with at most one
+lag per driver (several lags of the same driver give a distributed lag).
+
+The lagged design is never materialised as shifted DataFrames. A sliding window view
+over the growth array exposes lag j of driver i at period t as element [t, i, j]
+without copying, and the cross-product (Gram) matrix of all lagged columns is formed
+from that view in one einsum. Every candidate model is then solved from sub-matrices
+of it in batches, exactly as in the ordinary model search, and ranked with the same
+criteria. All models of a series are fitted on the same periods, those where the
+series and every driver at every lag are available, so their criteria are comparable.
+
+Constants:
+- LAG_METHOD (str): The method name shown in the search report.
+
+Functions:
+- lag_name(column, lag):
+    Returns the name of a lagged driver column.
+
+- base_column(name):
+    Returns the growth column a lagged driver column was built from.
+
+- lag_moments(y, X, max_lag, constant):
+    Returns the cross-products of every lagged driver from a strided view.
+
+- search_lags(y, X, x_names, max_lag, max_size, max_lags_per_driver, constant, cv):
+    Fits every admissible combination of lagged drivers for one series.
+
+- best_lag_structures(g_df, y_cols, x_cols, max_lag, ...):
+    Searches and ranks the lag structures of several series in a process pool.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import combinations, islice
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from apppages.utils.cross_validation import fold_moments, make_folds, subset_cv_errors
+from apppages.utils.model_search import (
+    CHUNK_SIZE,
+    CV_CRITERIA,
+    METRIC_COLUMNS,
+    REPORT_COLUMNS,
+    fit_subsets,
+    models_frame,
+    rank_models,
+)
+
+# Constants
+LAG_METHOD = "distributed_lag"
+
+
+def lag_name(column, lag):
+    """
+    Name a lagged driver column; lag 0 keeps the growth column's own name.
+
+    Parameters:
+        column (str): The growth column, e.g. "g: x:GDP".
+        lag (int): The lag in periods.
+
+    Returns:
+        str: E.g. "g: x:GDP (lag 4)".
+    """
+    return column if lag == 0 else f"{column} (lag {lag})"
+
+
+def base_column(name):
+    """
+    Recover the growth column of a (possibly) lagged driver column name.
+
+    Parameters:
+        name (str): E.g. "g: x:GDP (lag 4)" or "g: x:GDP".
+
+    Returns:
+        str: The growth column, e.g. "g: x:GDP".
+    """
+    return name.split(" (lag ")[0]
+
+
+def _lag_windows(y, X, max_lag):
+    """
+    Expose the lags of every driver as a strided view and find the usable periods.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers); NaN where missing.
+        max_lag (int): The largest lag.
+
+    Returns:
+        tuple: The view of shape (nobs - max_lag, drivers, max_lag + 1) whose
+               element [s, i, j] is driver i lagged j periods at period s + max_lag,
+               the matching dependent values and the mask of usable periods.
+    """
+    missing = np.isnan(X)
+    windows = sliding_window_view(np.where(missing, 0.0, X), max_lag + 1, axis=0)
+    gaps = sliding_window_view(missing, max_lag + 1, axis=0).any(axis=(1, 2))
+    y_aligned = y[max_lag:]
+    valid = ~(gaps | np.isnan(y_aligned))
+    return windows[:, :, ::-1], np.where(valid, y_aligned, 0.0), valid
+
+
+def lag_moments(y, X, max_lag, constant=True):
+    """
+    Compute the cross-products of every lagged driver, as `sample_moments` does.
+
+    The drivers are shifted by their means before the view is taken, so the
+    centring correction applied afterwards is small and the Gram matrix stays
+    accurate for growth factors close to one.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers); NaN where missing.
+        max_lag (int): The largest lag.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        dict: The moments expected by `fit_subsets` ("gram", "xty", "yty",
+              "x_mean", "y_mean", "nobs" and "constant") over the lagged columns,
+              ordered driver by driver and lag by lag, plus the "view" and "valid"
+              mask of usable periods.
+
+    Raises:
+        ValueError: If no period has the series and every lag available.
+    """
+    x_shift = np.nanmean(X, axis=0) if constant else np.zeros(X.shape[1])
+    view, y_aligned, valid = _lag_windows(y, X - x_shift, max_lag)
+    nobs = int(valid.sum())
+    if nobs == 0:
+        raise ValueError("No period has the series and every lagged driver.")
+    weight = valid.astype(float)
+    y_mean = y_aligned.sum() / nobs if constant else 0.0
+    yc = (y_aligned - y_mean) * weight
+
+    n_cols = view.shape[1] * view.shape[2]
+    mean = np.einsum("t,tia->ia", weight, view).ravel() / nobs
+    gram = np.einsum("t,tia,tjb->iajb", weight, view, view, optimize=True)
+    gram = gram.reshape(n_cols, n_cols)
+    xty = np.einsum("tia,t->ia", view, yc).ravel()
+    if constant:
+        gram -= nobs * np.outer(mean, mean)
+        xty -= mean * yc.sum()
+    else:
+        mean = np.zeros(n_cols)
+    return {
+        "gram": gram,
+        "xty": xty,
+        "yty": yc @ yc,
+        "x_mean": mean + np.repeat(x_shift, max_lag + 1),
+        "y_mean": y_mean,
+        "nobs": nobs,
+        "constant": constant,
+        "view": view,
+        "valid": valid,
+    }
+
+
+def _admissible(subsets, n_lags, max_lags_per_driver):
+    """Keep the sorted subsets with at most `max_lags_per_driver` lags per driver."""
+    drivers = subsets // n_lags
+    if subsets.shape[1] <= max_lags_per_driver:
+        return subsets
+    repeated = drivers[:, max_lags_per_driver:] == drivers[:, :-max_lags_per_driver]
+    return subsets[~repeated.any(axis=1)]
+
+
+def search_lags(
+    y,
+    X,
+    x_names,
+    max_lag=4,
+    max_size=2,
+    max_lags_per_driver=1,
+    constant=True,
+    cv=None,
+    cov_type="nonrobust",
+    maxlags=None,
+):
+    """
+    Fit every admissible combination of lagged drivers for one dependent series.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers); NaN where missing.
+        x_names (list): The names of the drivers.
+        max_lag (int): The largest lag tried for each driver.
+        max_size (int): The largest number of lagged columns in a model.
+        max_lags_per_driver (int): The most lags of one driver in a model.
+        constant (bool): Whether the models include a constant.
+        cv (dict, optional): Keyword arguments of `make_folds`; when given, every
+                             model is also cross-validated.
+        cov_type (str): The covariance the p-values are based on, one of COV_TYPES.
+        maxlags (int, optional): Lags of the HAC estimator.
+
+    Returns:
+        pd.DataFrame: One row per model, laid out as by `search_models`, with one
+                      coefficient column per lagged driver.
+    """
+    n_lags = max_lag + 1
+    names = [lag_name(name, lag) for name in x_names for lag in range(n_lags)]
+    moments = lag_moments(y, X, max_lag, constant)
+    nobs = moments["nobs"]
+    cv_moments = None
+    if cv is not None or cov_type != "nonrobust":
+        # Cross-validation and robust covariances need the observations, so only
+        # then are they copied
+        design = moments["view"][moments["valid"]].reshape(nobs, -1)
+        y_valid = y[max_lag:][moments["valid"]]
+        moments["Xc"] = design - design.mean(axis=0) if constant else design
+        moments["yc"] = y_valid - moments["y_mean"]
+    if cv is not None:
+        cv_moments = fold_moments(
+            y_valid, design, make_folds(nobs, **cv), constant=constant
+        )
+
+    frames = []
+    for size in range(1, min(max_size, len(names)) + 1):
+        if nobs - size - int(constant) <= 0:
+            break
+        subsets_iter = combinations(range(len(names)), size)
+        while True:
+            chunk = np.array(list(islice(subsets_iter, CHUNK_SIZE)), dtype=np.intp)
+            if not len(chunk):
+                break
+            subsets = _admissible(chunk, n_lags, max_lags_per_driver)
+            if not len(subsets):
+                continue
+            fits = fit_subsets(moments, subsets, cov_type, maxlags)
+            cv_errors = (
+                subset_cv_errors(cv_moments, subsets, max_workers=1)
+                if cv_moments is not None
+                else None
+            )
+            frames.append(models_frame(fits, subsets, names, nobs, cv_errors))
+    if not frames:
+        return pd.DataFrame(columns=["drivers", "n_drivers", *METRIC_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _search_series(job, settings, criterion, alpha, signs, top_n):
+    """
+    Search and rank the lag structures of one series; run in a worker process.
+
+    Parameters:
+        job (tuple): The (y_col, y, X) of the series.
+        settings (dict): Keyword arguments of `search_lags`.
+        criterion, alpha, signs, top_n: See `best_lag_structures`.
+
+    Returns:
+        tuple: The `top_n` best models of the series and its report row.
+    """
+    y_col, y, X = job
+    start = time.perf_counter()
+    models = search_lags(y, X, **settings)
+    ranked = rank_models(models, criterion, alpha, signs).head(top_n)
+    ranked.insert(0, "y", y_col)
+    report = {
+        "y": y_col,
+        "method": LAG_METHOD,
+        "evaluated": len(models),
+        "pruned": 0,
+        "total": len(models),
+        "seconds": time.perf_counter() - start,
+        "complete": True,
+    }
+    return ranked, report
+
+
+def best_lag_structures(
+    g_df,
+    y_cols,
+    x_cols,
+    max_lag=4,
+    max_size=2,
+    max_lags_per_driver=1,
+    constant=True,
+    criterion="adj_r2",
+    alpha=0.05,
+    expected_signs=None,
+    top_n=20,
+    max_workers=None,
+    cv=None,
+    cov_type="nonrobust",
+    maxlags=None,
+):
+    """
+    Search the lagged driver combinations of each dependent series and rank them.
+
+    Parameters:
+        g_df (pd.DataFrame): The growth dataframe, restricted to the estimation
+                             window.
+        y_cols (list): The dependent series ("g: y:" columns).
+        x_cols (list): The candidate drivers ("g: x:" columns).
+        max_lag (int): The largest lag tried for each driver.
+        max_size (int): The largest number of lagged columns in a model.
+        max_lags_per_driver (int): The most lags of one driver in a model.
+        constant (bool): Whether the models include a constant.
+        criterion (str): Ranking criterion, one of CRITERIA.
+        alpha (float): Significance level every driver must meet.
+        expected_signs (dict, optional): Driver name to expected sign (+1 or -1),
+                                         applied to every lag of the driver.
+        top_n (int): Number of models kept per series.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+                                     number of CPUs; 1 searches in the calling
+                                     process.
+        cv (dict, optional): Keyword arguments of `make_folds`, as in
+                             `best_subsets`.
+        cov_type (str): The covariance the significance rule uses, as in
+                        `best_subsets`.
+        maxlags (int, optional): Lags of the HAC estimator.
+
+    Returns:
+        tuple: A tuple containing:
+            - models (pd.DataFrame): The best models of every series, laid out as
+              by `best_subsets`.
+            - report (pd.DataFrame): One row per series with the number of models
+              fitted and the seconds taken.
+    """
+    if criterion in CV_CRITERIA and cv is None:
+        cv = {}
+    signs = {
+        lag_name(driver, lag): sign
+        for driver, sign in (expected_signs or {}).items()
+        for lag in range(max_lag + 1)
+    }
+    jobs = [
+        (
+            y_col,
+            g_df[y_col].to_numpy(dtype=float),
+            g_df[list(x_cols)].to_numpy(dtype=float),
+        )
+        for y_col in y_cols
+    ]
+    search = partial(
+        _search_series,
+        settings={
+            "x_names": list(x_cols),
+            "max_lag": max_lag,
+            "max_size": max_size,
+            "max_lags_per_driver": max_lags_per_driver,
+            "constant": constant,
+            "cv": cv,
+            "cov_type": cov_type,
+            "maxlags": maxlags,
+        },
+        criterion=criterion,
+        alpha=alpha,
+        signs=signs,
+        top_n=top_n,
+    )
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [search(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(search, jobs))
+    report = pd.DataFrame([row for _, row in results], columns=REPORT_COLUMNS)
+    if not results:
+        empty = pd.DataFrame(columns=["y", "drivers", "n_drivers", *METRIC_COLUMNS])
+        return empty, report
+    return pd.concat([models for models, _ in results], ignore_index=True), report
@@ -0,0 +1,783 @@
+"""
+Best-Subset Model Search.
+
+This module fits every combination of candidate drivers ("g: x:" columns) up to a
+given size for each dependent series ("g: y:" column) and ranks the models. Rather
+than calling statsmodels once per model, the cross-product (Gram) matrix of all
+drivers is formed once per series and every candidate model is solved from the
+matching sub-matrix, in batches of stacked small systems. When the models include a
+constant the data are centred first, which keeps the systems well conditioned and
+recovers the constant and its standard error analytically.
+
+All models of one series are fitted on the same sample: the periods where the series
+and every candidate driver are available. Series are searched in parallel in a
+process pool.
+
+Exhaustive enumeration grows combinatorially with the number of drivers, so a
+branch-and-bound mode (in the spirit of Furnival and Wilson's "leaps and bounds") is
+also available. It walks the tree of driver subsets depth first and skips a whole
+branch when the residual sum of squares (RSS) of the largest model in the branch,
+which no smaller model in the branch can beat, is already no better than the k-th best
+model of every size the branch could still contribute. For a fixed number of drivers
+the RSS orders models the same way as adjusted R-squared, AIC and BIC, so the k
+models kept per size are provably the best ones unless the time budget runs out.
+
+Models are ranked by elasticity sign rules first, then by whether every driver is
+significant (optionally judged with HC3 or HAC standard errors, computed in batches
+from the residuals of each chunk of models), then by the chosen criterion: adjusted
+R-squared, AIC, BIC or an out-of-sample error. The out-of-sample errors come from
+time-series cross-validation (see `cross_validation`), which reuses one set of
+running cross-product sums for every fold and candidate model; branch and bound
+cross-validates only the models it keeps.
+
+Constants:
+- CRITERIA (dict): Ranking criterion to whether larger values are better.
+- CV_CRITERIA (tuple): The criteria that need cross-validation.
+- METHODS (tuple): The search methods: "exhaustive" and "branch_and_bound".
+- REPORT_COLUMNS (list): Columns of the search report.
+- VIF_LIMIT (float): Variance inflation factor from which a model's drivers count
+  as collinear.
+
+Functions:
+- regression_sample(g_df, y_col, x_cols):
+    Returns the periods where a series and all its candidate drivers are available.
+
+- sample_moments(y, X, constant):
+    Returns the cross-product matrices from which every candidate model is solved.
+
+- fit_subsets(moments, subsets):
+    Fits a batch of driver subsets of the same size from the shared moments.
+
+- models_frame(fits, subsets, x_names, nobs, cv_errors):
+    Lays out a batch of fits as rows with one coefficient column per driver.
+
+- search_models(y, X, x_names, max_size, constant, cv, max_workers):
+    Fits every subset of up to `max_size` drivers and returns one row per model.
+
+- rank_models(models, criterion, alpha, expected_signs):
+    Orders models by sign rules, significance and the criterion.
+
+- branch_and_bound(y, X, x_names, max_size, top_k, constant, time_budget, cv):
+    Finds the `top_k` best models of each size without fitting every subset.
+
+- best_subsets(g_df, y_cols, x_cols, ...):
+    Searches and ranks the models of several series in a process pool.
+"""
+
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import combinations, islice
+from math import comb
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from apppages.utils.cross_validation import (
+    fold_moments,
+    make_folds,
+    subset_cv_errors,
+)
+from apppages.utils.ols import (
+    CONSTANT,
+    adjusted_r_squared,
+    information_criteria,
+    p_values,
+    r_squared,
+    robust_cov,
+)
+
+# Constants
+CRITERIA = {
+    "adj_r2": True,
+    "aic": False,
+    "bic": False,
+    "cv_rmse": False,
+    "cv_mape": False,
+}
+CV_CRITERIA = ("cv_rmse", "cv_mape")
+CHUNK_SIZE = 100_000
+ROBUST_CHUNK = 5_000
+METRIC_COLUMNS = ["nobs", "r2", "adj_r2", "aic", "bic", "max_p_value"]
+METHODS = ("exhaustive", "branch_and_bound")
+REPORT_COLUMNS = ["y", "method", "evaluated", "pruned", "total", "seconds", "complete"]
+VIF_LIMIT = 1e10
+
+
+def regression_sample(g_df, y_col, x_cols):
+    """
+    Select the periods where a series and all its candidate drivers are available.
+
+    Parameters:
+        g_df (pd.DataFrame): The growth dataframe.
+        y_col (str): The dependent series.
+        x_cols (list): The candidate drivers.
+
+    Returns:
+        tuple: The (y, X) arrays of the common sample.
+    """
+    sample = g_df[[y_col, *x_cols]].dropna()
+    return sample[y_col].to_numpy(dtype=float), sample[x_cols].to_numpy(dtype=float)
+
+
+def sample_moments(y, X, constant=True):
+    """
+    Compute the cross-products from which every candidate model is solved.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The candidate drivers, shape (nobs, drivers).
+        constant (bool): Whether the models include a constant; if so the data are
+                         centred.
+
+    Returns:
+        dict: The Gram matrix "gram", "xty", "yty" (the total sum of squares), the
+              means "x_mean" and "y_mean", "nobs" and "constant", and the centred
+              data "Xc" and "yc" from which robust covariances are computed.
+    """
+    x_mean = X.mean(axis=0) if constant else np.zeros(X.shape[1])
+    y_mean = y.mean() if constant else 0.0
+    Xc, yc = X - x_mean, y - y_mean
+    return {
+        "gram": Xc.T @ Xc,
+        "xty": Xc.T @ yc,
+        "yty": yc @ yc,
+        "x_mean": x_mean,
+        "y_mean": y_mean,
+        "nobs": len(y),
+        "constant": constant,
+        "Xc": Xc,
+        "yc": yc,
+    }
+
+
+def fit_subsets(moments, subsets, cov_type="nonrobust", maxlags=None):
+    """
+    Fit a batch of driver subsets of the same size from the shared moments.
+
+    A subset whose drivers are collinear (e.g. duplicated dummies) cannot be
+    estimated and gets NaN coefficients and metrics, so that `rank_models` leaves it
+    out; the other models of the batch are solved as usual.
+
+    Parameters:
+        moments (dict): The cross-products returned by `sample_moments`.
+        subsets (np.ndarray): Integer array (models, size) of driver positions.
+        cov_type (str): One of COV_TYPES; robust covariances need the centred data
+                        "Xc" and "yc" in the moments.
+        maxlags (int, optional): Lags of the HAC estimator, see `robust_cov`.
+
+    Returns:
+        dict: Arrays over the models: "params", "bse" and "pvalues" of the drivers
+              (shape (models, size)), "const", "const_bse" and "const_pvalue" (NaN
+              without a constant), "rss", "r2", "adj_r2", "aic" and "bic".
+    """
+    nobs, constant = moments["nobs"], moments["constant"]
+    k_params = subsets.shape[1] + int(constant)
+    df_resid = nobs - k_params
+
+    gram = moments["gram"][subsets[:, :, None], subsets[:, None, :]]
+    xty = moments["xty"][subsets]
+    inv = _invert_full_rank(gram)
+    params = np.einsum("mij,mj->mi", inv, xty)
+    rss = np.maximum(moments["yty"] - np.einsum("mi,mi->m", params, xty), 0.0)
+    scale = rss / df_resid
+    bse = np.sqrt(scale[:, None] * np.diagonal(inv, axis1=1, axis2=2))
+
+    if constant:
+        x_mean = moments["x_mean"][subsets]
+        const = moments["y_mean"] - np.einsum("mi,mi->m", params, x_mean)
+        const_var = 1 / nobs + np.einsum("mi,mij,mj->m", x_mean, inv, x_mean)
+        const_bse = np.sqrt(scale * const_var)
+        const_pvalue = p_values(const / const_bse, df_resid)
+    else:
+        const = const_bse = const_pvalue = np.full(len(subsets), np.nan)
+    pvalues = p_values(params / bse, df_resid)
+    if cov_type != "nonrobust":
+        bse, const_bse = _robust_bse(moments, subsets, inv, params, cov_type, maxlags)
+        pvalues = 2 * stats.norm.sf(np.abs(params / bse))
+        if constant:
+            const_pvalue = 2 * stats.norm.sf(np.abs(const / const_bse))
+
+    r2 = r_squared(rss, moments["yty"])
+    aic, bic = information_criteria(rss, nobs, k_params)
+    return {
+        "params": params,
+        "bse": bse,
+        "pvalues": pvalues,
+        "const": const,
+        "const_bse": const_bse,
+        "const_pvalue": const_pvalue,
+        "rss": rss,
+        "r2": r2,
+        "adj_r2": adjusted_r_squared(r2, nobs, k_params, constant),
+        "aic": aic,
+        "bic": bic,
+    }
+
+
+def _invert_full_rank(gram):
+    """
+    Invert a batch of Gram matrices, with NaN for those that are not of full rank.
+
+    A model counts as rank deficient when the variance inflation factor of one of its
+    drivers, diag(inv) * diag(gram) on centred data, reaches VIF_LIMIT. The batch is
+    inverted in one call; only when a matrix is exactly singular are the ranks
+    checked one by one, on the eigenvalues of the matrices scaled to a unit diagonal.
+
+    Parameters:
+        gram (np.ndarray): The Gram matrices, shape (models, size, size).
+
+    Returns:
+        np.ndarray: The inverses, NaN for the rank-deficient models.
+    """
+    diag = np.diagonal(gram, axis1=1, axis2=2)
+    try:
+        inv = np.linalg.inv(gram)
+    except np.linalg.LinAlgError:
+        scale = np.sqrt(np.where(diag > 0, diag, 1.0))
+        eigvals = np.linalg.eigvalsh(gram / scale[:, :, None] / scale[:, None, :])
+        full = eigvals[:, 0] > eigvals[:, -1] / VIF_LIMIT
+        inv = np.full(gram.shape, np.nan)
+        inv[full] = np.linalg.inv(gram[full])
+    with np.errstate(invalid="ignore", over="ignore"):
+        vif = np.diagonal(inv, axis1=1, axis2=2) * diag
+        full = ((diag > 0) & np.isfinite(vif) & (vif < VIF_LIMIT)).all(axis=1)
+    inv[~full] = np.nan
+    return inv
+
+
+def _robust_bse(moments, subsets, inv, params, cov_type, maxlags):
+    """
+    Compute robust standard errors of a batch of subsets from their residuals.
+
+    The models are solved on centred data, where the design with a constant has a
+    block-diagonal Gram matrix; the covariance of the constant follows from
+    const = y_mean - x_mean @ params. Models are processed in slices of ROBUST_CHUNK
+    to bound the memory of the per-period scores.
+
+    Parameters:
+        moments (dict): The moments returned by `sample_moments`.
+        subsets (np.ndarray): Integer array (models, size) of driver positions.
+        inv (np.ndarray): The inverse Gram matrices, shape (models, size, size).
+        params (np.ndarray): The driver coefficients, shape (models, size).
+        cov_type (str): "HC3" or "HAC".
+        maxlags (int, optional): Lags of the HAC estimator.
+
+    Returns:
+        tuple: The robust standard errors of the drivers (models, size) and of the
+               constant (models,), NaN without a constant.
+    """
+    nobs, constant = moments["nobs"], moments["constant"]
+    n_models, size = subsets.shape
+    k_params = size + int(constant)
+    bse = np.empty((n_models, size))
+    const_bse = np.full(n_models, np.nan)
+    for start in range(0, n_models, ROBUST_CHUNK):
+        part = slice(start, start + ROBUST_CHUNK)
+        Z = moments["Xc"][:, subsets[part]].transpose(1, 0, 2)
+        resid = moments["yc"] - np.einsum("mti,mi->mt", Z, params[part])
+        bread = np.zeros((len(Z), k_params, k_params))
+        bread[:, :size, :size] = inv[part]
+        if constant:
+            Z = np.concatenate([Z, np.ones((len(Z), nobs, 1))], axis=2)
+            bread[:, -1, -1] = 1 / nobs
+        cov = robust_cov(Z, resid, bread, cov_type, maxlags)
+        bse[part] = np.sqrt(np.diagonal(cov[:, :size, :size], axis1=1, axis2=2))
+        if constant:
+            # Map (slopes, centred intercept) to the constant of the original data
+            weights = np.concatenate(
+                [-moments["x_mean"][subsets[part]], np.ones((len(Z), 1))], axis=1
+            )
+            const_bse[part] = np.sqrt(np.einsum("mi,mij,mj->m", weights, cov, weights))
+    return bse, const_bse
+
+
+def _cv_moments(y, X, cv, constant):
+    """Return the fold moments for the cross-validation options, or None."""
+    if cv is None:
+        return None
+    return fold_moments(y, X, make_folds(len(y), **cv), constant)
+
+
+def models_frame(fits, subsets, x_names, nobs, cv_errors=None):
+    """
+    Lay out the fits of one batch as rows with one coefficient column per driver.
+
+    Parameters:
+        fits (dict): The arrays returned by `fit_subsets`.
+        subsets (np.ndarray): Integer array (models, size) of driver positions.
+        x_names (list): The names of all candidate drivers.
+        nobs (int): Number of observations.
+        cv_errors (dict, optional): The errors returned by `subset_cv_errors`,
+                                    added as "cv_rmse" and "cv_mape" columns.
+
+    Returns:
+        pd.DataFrame: One row per model.
+    """
+    n_models, size = subsets.shape
+    coefs = np.full((n_models, len(x_names)), np.nan)
+    np.put_along_axis(coefs, subsets, fits["params"], axis=1)
+    names = np.array(x_names, dtype=object)
+    models = pd.DataFrame(
+        {
+            "drivers": [" + ".join(row) for row in names[subsets]],
+            "n_drivers": size,
+            "nobs": nobs,
+            "r2": fits["r2"],
+            "adj_r2": fits["adj_r2"],
+            "aic": fits["aic"],
+            "bic": fits["bic"],
+            "max_p_value": fits["pvalues"].max(axis=1),
+        }
+    )
+    if cv_errors is not None:
+        models["cv_rmse"] = cv_errors["cv_rmse"]
+        models["cv_mape"] = cv_errors["cv_mape"]
+    return pd.concat(
+        [
+            models,
+            pd.DataFrame(coefs, columns=x_names),
+            pd.DataFrame({CONSTANT: fits["const"]}),
+        ],
+        axis=1,
+    )
+
+
+def search_models(
+    y,
+    X,
+    x_names,
+    max_size=4,
+    constant=True,
+    cv=None,
+    max_workers=1,
+    cov_type="nonrobust",
+    maxlags=None,
+):
+    """
+    Fit every subset of up to `max_size` drivers for one dependent series.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The candidate drivers, shape (nobs, drivers).
+        x_names (list): The names of the candidate drivers.
+        max_size (int): The largest number of drivers in a model.
+        constant (bool): Whether the models include a constant.
+        cv (dict, optional): Keyword arguments of `make_folds` (e.g. "scheme" and
+                             "n_folds"); when given, every model is also
+                             cross-validated.
+        max_workers (int, optional): Number of worker processes over the folds.
+        cov_type (str): The covariance the p-values are based on, one of COV_TYPES.
+        maxlags (int, optional): Lags of the HAC estimator.
+
+    Returns:
+        pd.DataFrame: One row per model with the drivers, fit statistics and one
+                      coefficient column per driver (NaN where not in the model).
+    """
+    moments = sample_moments(y, X, constant)
+    cv_moments = _cv_moments(y, X, cv, constant)
+    nobs = moments["nobs"]
+    frames = []
+    for size in range(1, min(max_size, len(x_names)) + 1):
+        if nobs - size - int(constant) <= 0:
+            break
+        subsets_iter = combinations(range(len(x_names)), size)
+        for _ in range(0, comb(len(x_names), size), CHUNK_SIZE):
+            subsets = np.array(list(islice(subsets_iter, CHUNK_SIZE)), dtype=np.intp)
+            fits = fit_subsets(moments, subsets, cov_type, maxlags)
+            cv_errors = (
+                subset_cv_errors(cv_moments, subsets, max_workers)
+                if cv_moments is not None
+                else None
+            )
+            frames.append(models_frame(fits, subsets, x_names, nobs, cv_errors))
+    if not frames:
+        return pd.DataFrame(columns=["drivers", "n_drivers", *METRIC_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _count_subsets(n_candidates, max_extra):
+    """Return the number of non-empty subsets of up to `max_extra` of `n_candidates`."""
+    return sum(comb(n_candidates, j) for j in range(1, max_extra + 1))
+
+
+def _prefix_rss(Xc, yc, yty, cols):
+    """
+    Compute the RSS of every leading block of columns with one QR factorisation.
+
+    For collinear columns the values are lower bounds of the true RSS, which is all
+    the pruning needs.
+
+    Parameters:
+        Xc (np.ndarray): The centred drivers.
+        yc (np.ndarray): The centred dependent series.
+        yty (float): The total sum of squares.
+        cols (list): Driver positions in the order in which they are added.
+
+    Returns:
+        np.ndarray: Entry j is the RSS of the model with the first j + 1 columns.
+    """
+    q = np.linalg.qr(Xc[:, cols])[0]
+    explained = np.cumsum((q.T @ yc) ** 2)
+    rss = np.zeros(len(cols))
+    rss[: len(explained)] = np.maximum(yty - explained, 0.0)
+    return rss
+
+
+def _child_rss(Xc, yc, subset, candidates):
+    """
+    Compute the RSS of the subset extended by each candidate driver in turn.
+
+    Parameters:
+        Xc (np.ndarray): The centred drivers.
+        yc (np.ndarray): The centred dependent series.
+        subset (tuple): Driver positions already in the model.
+        candidates (tuple): Driver positions that may be added.
+
+    Returns:
+        np.ndarray: The RSS of each one-driver extension.
+    """
+    x_cand, y_res = Xc[:, candidates], yc
+    if subset:
+        q = np.linalg.qr(Xc[:, subset])[0]
+        x_cand = x_cand - q @ (q.T @ x_cand)
+        y_res = yc - q @ (q.T @ yc)
+    xx = np.einsum("ij,ij->j", x_cand, x_cand)
+    xy = x_cand.T @ y_res
+    gain = np.divide(xy**2, xx, out=np.zeros_like(xx), where=xx > 1e-12 * len(yc))
+    return np.maximum(y_res @ y_res - gain, 0.0)
+
+
+def branch_and_bound(
+    y,
+    X,
+    x_names,
+    max_size=4,
+    top_k=5,
+    constant=True,
+    time_budget=None,
+    cv=None,
+    cov_type="nonrobust",
+    maxlags=None,
+):
+    """
+    Find the `top_k` lowest-RSS models of each size by branch and bound.
+
+    Each node of the search tree holds the drivers forced into the model and the
+    drivers that may still be added. Its one-driver extensions are evaluated in one
+    batch, and a child branch is pruned when the RSS of all its drivers together is
+    no lower than the current k-th best RSS of every size it could still produce.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The candidate drivers, shape (nobs, drivers).
+        x_names (list): The names of the candidate drivers.
+        max_size (int): The largest number of drivers in a model.
+        top_k (int): Number of models kept for each number of drivers.
+        constant (bool): Whether the models include a constant.
+        time_budget (float, optional): Seconds after which the search stops and
+                                       returns the best models found so far.
+        cv (dict, optional): Keyword arguments of `make_folds`; when given, the
+                             kept models are also cross-validated.
+        cov_type (str): The covariance the p-values of the kept models are based
+                        on, one of COV_TYPES.
+        maxlags (int, optional): Lags of the HAC estimator.
+
+    Returns:
+        tuple: A tuple containing:
+            - models (pd.DataFrame): The kept models, laid out as in
+              `search_models`.
+            - counts (dict): "evaluated", "pruned" and "total" numbers of models,
+              and whether the search was "complete".
+    """
+    start = time.perf_counter()
+    moments = sample_moments(y, X, constant)
+    nobs, n_drivers = X.shape
+    Xc, yc, yty = X - moments["x_mean"], y - moments["y_mean"], moments["yty"]
+    max_size = max(min(max_size, n_drivers, nobs - 1 - int(constant)), 0)
+    total = _count_subsets(n_drivers, max_size)
+
+    # Visiting strong drivers first tightens the thresholds early
+    order = tuple(
+        int(i)
+        for i in np.argsort(
+            _child_rss(Xc, yc, (), tuple(range(n_drivers))), kind="stable"
+        )
+    )
+    best = {size: [] for size in range(1, max_size + 1)}
+    evaluated = pruned = 0
+    complete = True
+
+    def threshold(size):
+        heap = best[size]
+        return -heap[0][0] if len(heap) >= top_k else np.inf
+
+    def prunable(bound, size, n_rest):
+        return all(
+            bound >= threshold(s)
+            for s in range(size + 1, min(max_size, size + n_rest) + 1)
+        )
+
+    stack = [((), order, -np.inf)] if max_size else []
+    while stack:
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            complete = False
+            break
+        subset, candidates, bound = stack.pop()
+        if prunable(bound, len(subset), len(candidates)):
+            pruned += _count_subsets(len(candidates), max_size - len(subset))
+            continue
+
+        size = len(subset) + 1
+        for driver, rss in zip(candidates, _child_rss(Xc, yc, subset, candidates)):
+            entry = (-rss, subset + (driver,))
+            if len(best[size]) < top_k:
+                heapq.heappush(best[size], entry)
+            elif rss < -best[size][0][0]:
+                heapq.heapreplace(best[size], entry)
+        evaluated += len(candidates)
+        if size >= max_size or len(candidates) < 2:
+            continue
+
+        # Bound of child i is the RSS of subset + candidates[i:], a leading block
+        # of the columns ordered as subset + reversed(candidates)
+        bounds = _prefix_rss(Xc, yc, yty, list(subset) + list(candidates[::-1]))
+        for i in range(len(candidates) - 2, -1, -1):
+            child, rest = subset + (candidates[i],), candidates[i + 1 :]
+            child_bound = bounds[len(subset) + len(candidates) - i - 1]
+            if prunable(child_bound, len(child), len(rest)):
+                pruned += _count_subsets(len(rest), max_size - len(child))
+            else:
+                stack.append((child, rest, child_bound))
+
+    cv_moments = _cv_moments(y, X, cv, constant)
+    frames = []
+    for size, heap in best.items():
+        if heap:
+            subsets = np.sort(np.array([entry[1] for entry in heap]), axis=1)
+            fits = fit_subsets(moments, subsets, cov_type, maxlags)
+            cv_errors = (
+                subset_cv_errors(cv_moments, subsets, max_workers=1)
+                if cv_moments is not None
+                else None
+            )
+            frames.append(models_frame(fits, subsets, x_names, nobs, cv_errors))
+    models = (
+        pd.concat(frames, ignore_index=True)
+        if frames
+        else pd.DataFrame(columns=["drivers", "n_drivers", *METRIC_COLUMNS])
+    )
+    counts = {
+        "evaluated": evaluated,
+        "pruned": pruned,
+        "total": total,
+        "complete": complete,
+    }
+    return models, counts
+
+
+def rank_models(models, criterion="adj_r2", alpha=0.05, expected_signs=None):
+    """
+    Order models by elasticity sign rules, significance and a fit criterion.
+
+    Parameters:
+        models (pd.DataFrame): Models as returned by `search_models`.
+        criterion (str): One of CRITERIA; the CV_CRITERIA need cross-validated
+                         models.
+        alpha (float): Significance level every driver must meet.
+        expected_signs (dict, optional): Driver name to expected coefficient sign
+                                         (+1 or -1).
+
+    Returns:
+        pd.DataFrame: The models with "significant", "signs_ok" and "rank" columns,
+                      best first. Models that could not be estimated (NaN R-squared,
+                      see `fit_subsets`) are left out.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(
+            f"Unknown criterion '{criterion}'. Choose one of {', '.join(CRITERIA)}."
+        )
+    if criterion not in models:
+        raise ValueError(f"The models were not cross-validated for '{criterion}'.")
+    models = models[models["r2"].notna()].copy()
+    models["significant"] = models["max_p_value"] <= alpha
+    signs_ok = np.ones(len(models), dtype=bool)
+    for driver, sign in (expected_signs or {}).items():
+        if driver in models:
+            signs_ok &= ~(np.sign(models[driver].to_numpy()) == -np.sign(sign))
+    models["signs_ok"] = signs_ok
+    models = models.sort_values(
+        ["signs_ok", "significant", criterion],
+        ascending=[False, False, not CRITERIA[criterion]],
+        kind="stable",
+        ignore_index=True,
+    )
+    models["rank"] = np.arange(1, len(models) + 1)
+    return models
+
+
+def _search_series(
+    job,
+    x_names,
+    max_size,
+    constant,
+    criterion,
+    alpha,
+    signs,
+    top_n,
+    method,
+    top_k,
+    time_budget,
+    cv,
+    fold_workers,
+    cov_type,
+    maxlags,
+):
+    """
+    Search and rank the models of one series; run in a worker process.
+
+    Parameters:
+        job (tuple): The (y_col, y, X) of the series.
+        x_names, max_size, constant, criterion, alpha, signs, top_n, method, top_k,
+        time_budget, cv, cov_type, maxlags: See `best_subsets`.
+        fold_workers (int, optional): Number of worker processes over the folds.
+
+    Returns:
+        tuple: The `top_n` best models of the series and its report row.
+    """
+    y_col, y, X = job
+    start = time.perf_counter()
+    if method == "branch_and_bound":
+        models, counts = branch_and_bound(
+            y,
+            X,
+            x_names,
+            max_size,
+            top_k,
+            constant,
+            time_budget,
+            cv,
+            cov_type,
+            maxlags,
+        )
+    else:
+        models = search_models(
+            y,
+            X,
+            x_names,
+            max_size,
+            constant,
+            cv,
+            fold_workers,
+            cov_type,
+            maxlags,
+        )
+        counts = {"evaluated": len(models), "pruned": 0, "complete": True}
+        counts["total"] = counts["evaluated"]
+    ranked = rank_models(models, criterion, alpha, signs).head(top_n)
+    ranked.insert(0, "y", y_col)
+    report = {
+        "y": y_col,
+        "method": method,
+        **counts,
+        "seconds": time.perf_counter() - start,
+    }
+    return ranked, report
+
+
+def best_subsets(
+    g_df,
+    y_cols,
+    x_cols,
+    max_size=4,
+    constant=True,
+    criterion="adj_r2",
+    alpha=0.05,
+    expected_signs=None,
+    top_n=20,
+    max_workers=None,
+    method="exhaustive",
+    top_k=5,
+    time_budget=None,
+    cv=None,
+    cov_type="nonrobust",
+    maxlags=None,
+):
+    """
+    Search the driver subsets of each dependent series and rank the models.
+
+    Parameters:
+        g_df (pd.DataFrame): The growth dataframe, restricted to the estimation
+                             window.
+        y_cols (list): The dependent series ("g: y:" columns).
+        x_cols (list): The candidate drivers ("g: x:" columns).
+        max_size (int): The largest number of drivers in a model.
+        constant (bool): Whether the models include a constant.
+        criterion (str): Ranking criterion: "adj_r2", "aic", "bic", "cv_rmse" or
+                         "cv_mape".
+        alpha (float): Significance level every driver must meet.
+        expected_signs (dict, optional): Driver name to expected sign (+1 or -1).
+        top_n (int): Number of models kept per series.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+                                     number of CPUs; 1 searches in the calling
+                                     process.
+        method (str): "exhaustive" fits every subset; "branch_and_bound" keeps the
+                      `top_k` best models of each size and prunes the rest.
+        top_k (int): Models kept per number of drivers by branch and bound.
+        time_budget (float, optional): Seconds allowed per series by branch and
+                                       bound.
+        cv (dict, optional): Keyword arguments of `make_folds` (e.g. "scheme",
+                             "n_folds", "min_train" and "gap"). When given, or when
+                             ranking by a CV criterion, the models get "cv_rmse"
+                             and "cv_mape" columns. Folds are spread over worker
+                             processes when only one series is searched.
+        cov_type (str): The covariance the significance rule uses, one of
+                        COV_TYPES; "HAC" guards against the autocorrelation of
+                        overlapping growth rates.
+        maxlags (int, optional): Lags of the HAC estimator, see `default_maxlags`.
+
+    Returns:
+        tuple: A tuple containing:
+            - models (pd.DataFrame): The best models of every series, with columns
+              "y", "drivers", "n_drivers", the fit statistics, "significant",
+              "signs_ok", "rank" and one coefficient column per driver plus "const".
+            - report (pd.DataFrame): One row per series with the numbers of models
+              evaluated and pruned out of the total, the seconds taken and whether
+              the search completed within the time budget.
+    """
+    if method not in METHODS:
+        raise ValueError(
+            f"Unknown search method '{method}'. Choose one of {', '.join(METHODS)}."
+        )
+    if criterion in CV_CRITERIA and cv is None:
+        cv = {}
+    jobs = [(y_col, *regression_sample(g_df, y_col, x_cols)) for y_col in y_cols]
+    serial = max_workers == 1 or len(jobs) <= 1
+    search = partial(
+        _search_series,
+        x_names=list(x_cols),
+        max_size=max_size,
+        constant=constant,
+        criterion=criterion,
+        alpha=alpha,
+        signs=expected_signs,
+        top_n=top_n,
+        method=method,
+        top_k=top_k,
+        time_budget=time_budget,
+        cv=cv,
+        fold_workers=max_workers if serial else 1,
+        cov_type=cov_type,
+        maxlags=maxlags,
+    )
+    if serial:
+        results = [search(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(search, jobs))
+    report = pd.DataFrame([row for _, row in results], columns=REPORT_COLUMNS)
+    if not results:
+        empty = pd.DataFrame(columns=["y", "drivers", "n_drivers", *METRIC_COLUMNS])
+        return empty, report
+    return pd.concat([models for models, _ in results], ignore_index=True), report
@@ -0,0 +1,365 @@
+"""
+Persistent Store of Fitted Models.
+
+This module keeps every fitted regression on disk so that revisiting a specification
+costs a lookup instead of a fit, and so that fitted models survive a browser refresh.
+A model is identified by its specification:
+
+- the hash of the dataset it was fitted on (the column hashes kept by `reload`);
+- the dependent series and the set of drivers;
+- whether it has a constant;
+- the first and last period of the estimation window;
+- the growth transform (horizon, log differences, precision).
+
+An SQLite database holds one row per model with every key in its own indexed column,
+so models can be looked up by any of them, together with the scalar diagnostics.
+The arrays are stored as Parquet blobs next to it: one file with the coefficients,
+standard errors, t and p-values and covariance matrix, and one with the residuals.
+Like the parse cache, the store lives on disk and is shared by every session on the
+same server. Streamlit reruns a page on every interaction, so the most recently
+loaded fits are also kept in memory and a repeated lookup does not touch the disk.
+
+Constants:
+- STORE_DIR (str): Default directory of the database and the Parquet blobs.
+- KEY_COLUMNS (list): The specification keys, each indexed in the database.
+- DIAGNOSTIC_COLUMNS (list): The scalar diagnostics stored with each model.
+
+Functions:
+- dataset_hash(df_hashes):
+    Returns one hash for the whole dataset from its column hashes.
+
+- transform_label(horizon, growth_settings):
+    Describes the growth transform of a model, e.g. "h4".
+
+- model_spec(dataset, y, x_cols, constant, window, transform):
+    Builds the specification that identifies a model in the store.
+
+- save_model(spec, fit, store_dir):
+    Stores a fit returned by `fit_ols` under its specification.
+
+- load_model(spec, store_dir):
+    Returns the stored fit of a specification, or None.
+
+- fit_or_load(spec, y, X, store_dir):
+    Returns the stored fit of a specification, fitting and storing it on a miss.
+
+- find_models(store_dir, **keys):
+    Lists the stored models matching any combination of the keys.
+
+- params_dict(fit):
+    Maps the parameter names of a fit to its coefficients.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import shutil
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from apppages.utils.ols import fit_ols
+
+# Constants
+STORE_DIR = "data/models"
+DATABASE_FILE = "models.sqlite"
+COEF_FILE = "coefficients.parquet"
+RESID_FILE = "residuals.parquet"
+KEY_COLUMNS = [
+    "dataset_hash",
+    "y",
+    "x_set",
+    "constant",
+    "window_start",
+    "window_end",
+    "transform",
+]
+DIAGNOSTIC_COLUMNS = ["nobs", "df_resid", "r2", "adj_r2", "aic", "bic", "durbin_watson"]
+X_SEPARATOR = " + "
+MEMORY_MODELS = 128
+
+# Streamlit serves every session from the same process; SQLite handles other
+# processes, this lock keeps a session's blob and row writes together.
+_LOCK = threading.Lock()
+_RECENT = OrderedDict()
+
+
+def dataset_hash(df_hashes):
+    """
+    Combine the per-column hashes of a dataset into one hash.
+
+    Parameters:
+        df_hashes (dict): Column name to digest, as returned by `column_hashes`.
+
+    Returns:
+        str: The hex digest of the whole dataset.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(sorted(df_hashes.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def transform_label(horizon, growth_settings):
+    """
+    Describe the growth transform the regression variables were built with.
+
+    Parameters:
+        horizon (int): The growth horizon in periods.
+        growth_settings (dict): The "log" and "float32" settings of the growth
+                                tensor.
+
+    Returns:
+        str: E.g. "h4", "h4 log" or "h12 log float32".
+    """
+    flags = [name for name in ("log", "float32") if growth_settings.get(name)]
+    return " ".join([f"h{horizon}", *flags])
+
+
+def model_spec(dataset, y, x_cols, constant, window, transform):
+    """
+    Build the specification that identifies a fitted model.
+
+    Parameters:
+        dataset (str): The dataset hash, see `dataset_hash`.
+        y (str): The dependent series.
+        x_cols (list): The drivers; their order does not matter.
+        constant (bool): Whether the model includes a constant.
+        window (tuple): The first and last period of the estimation window.
+        transform (str): The growth transform, see `transform_label`.
+
+    Returns:
+        dict: The KEY_COLUMNS values.
+    """
+    return {
+        "dataset_hash": dataset,
+        "y": y,
+        "x_set": X_SEPARATOR.join(sorted(x_cols)),
+        "constant": int(bool(constant)),
+        "window_start": str(window[0]),
+        "window_end": str(window[1]),
+        "transform": transform,
+    }
+
+
+def _spec_key(spec):
+    """Return the hex digest that names the blobs of a specification."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([str(spec[key]) for key in KEY_COLUMNS]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _connect(store_dir):
+    """
+    Open the store database, creating its table and indexes on first use.
+
+    Parameters:
+        store_dir (str): The store directory.
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    connection = sqlite3.connect(os.path.join(store_dir, DATABASE_FILE), timeout=30)
+    key_columns = ", ".join(
+        f"{key} INTEGER NOT NULL" if key == "constant" else f"{key} TEXT NOT NULL"
+        for key in KEY_COLUMNS
+    )
+    diagnostic_columns = ", ".join(f"{name} REAL" for name in DIAGNOSTIC_COLUMNS)
+    with connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            f"spec_key TEXT PRIMARY KEY, {key_columns}, {diagnostic_columns}, "
+            "names TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        for key in KEY_COLUMNS:
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_models_{key} ON models ({key})"
+            )
+    return connection
+
+
+def save_model(spec, fit, store_dir=STORE_DIR):
+    """
+    Store a fitted model under its specification, replacing any earlier fit.
+
+    Parameters:
+        spec (dict): The specification returned by `model_spec`.
+        fit (dict): The results returned by `fit_ols`.
+        store_dir (str): The store directory.
+    """
+    key = _spec_key(spec)
+    blob_dir = os.path.join(store_dir, key)
+    names = fit["names"]
+    coefficients = pd.DataFrame(
+        {
+            "variable": names,
+            "coef": fit["params"],
+            "std_err": fit["bse"],
+            "t_value": fit["tvalues"],
+            "p_value": fit["pvalues"],
+        }
+    )
+    covariance = pd.DataFrame(fit["cov_params"], columns=[f"cov: {n}" for n in names])
+    residuals = pd.DataFrame(
+        {"period": [str(p) for p in fit["index"]], "resid": fit["resid"]}
+    )
+
+    with _LOCK:
+        tmp_dir = f"{blob_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        pd.concat([coefficients, covariance], axis=1).to_parquet(
+            os.path.join(tmp_dir, COEF_FILE), index=False
+        )
+        residuals.to_parquet(os.path.join(tmp_dir, RESID_FILE), index=False)
+        shutil.rmtree(blob_dir, ignore_errors=True)
+        os.replace(tmp_dir, blob_dir)
+        _RECENT.pop((os.path.abspath(store_dir), key), None)
+
+        row = {
+            "spec_key": key,
+            **spec,
+            **{name: fit[name] for name in DIAGNOSTIC_COLUMNS},
+            "names": json.dumps(names),
+            "created": time.time(),
+        }
+        connection = _connect(store_dir)
+        try:
+            with connection:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO models ({', '.join(row)}) "
+                    f"VALUES ({', '.join('?' for _ in row)})",
+                    list(row.values()),
+                )
+        finally:
+            connection.close()
+
+
+def load_model(spec, store_dir=STORE_DIR):
+    """
+    Look up the stored fit of a specification.
+
+    Parameters:
+        spec (dict): The specification returned by `model_spec`.
+        store_dir (str): The store directory.
+
+    Returns:
+        dict: The fit in the layout of `fit_ols` (with "resid" as a Series indexed
+              by period label, and "index" holding those labels), or None if the
+              specification has not been fitted or its blobs are unreadable.
+    """
+    key = _spec_key(spec)
+    memo_key = (os.path.abspath(store_dir), key)
+    with _LOCK:
+        if memo_key in _RECENT:
+            _RECENT.move_to_end(memo_key)
+            return _RECENT[memo_key]
+
+    connection = _connect(store_dir)
+    try:
+        connection.row_factory = sqlite3.Row
+        row = connection.execute(
+            "SELECT * FROM models WHERE spec_key = ?", (key,)
+        ).fetchone()
+    finally:
+        connection.close()
+    if row is None:
+        return None
+    try:
+        table = pd.read_parquet(os.path.join(store_dir, key, COEF_FILE))
+        residuals = pd.read_parquet(os.path.join(store_dir, key, RESID_FILE))
+    except (OSError, ValueError):
+        return None
+
+    names = json.loads(row["names"])
+    fit = {
+        "names": names,
+        "params": table["coef"].to_numpy(),
+        "bse": table["std_err"].to_numpy(),
+        "tvalues": table["t_value"].to_numpy(),
+        "pvalues": table["p_value"].to_numpy(),
+        "cov_params": table[[f"cov: {n}" for n in names]].to_numpy(),
+        "resid": residuals.set_index("period")["resid"],
+        "index": pd.Index(residuals["period"]),
+        **{name: row[name] for name in DIAGNOSTIC_COLUMNS},
+        "nobs": int(row["nobs"]),
+        "df_resid": int(row["df_resid"]),
+    }
+    with _LOCK:
+        _RECENT[memo_key] = fit
+        while len(_RECENT) > MEMORY_MODELS:
+            _RECENT.popitem(last=False)
+    return fit
+
+
+def fit_or_load(spec, y, X, store_dir=STORE_DIR):
+    """
+    Return the stored fit of a specification, fitting and storing it on a miss.
+
+    Parameters:
+        spec (dict): The specification returned by `model_spec`.
+        y (pd.Series): The dependent series of the estimation window.
+        X (pd.DataFrame): The drivers of the estimation window, without a constant.
+        store_dir (str): The store directory.
+
+    Returns:
+        tuple: The fit (see `load_model`) and whether it came from the store.
+
+    Raises:
+        ValueError: If the model cannot be fitted, see `fit_ols`.
+    """
+    stored = load_model(spec, store_dir)
+    if stored is not None:
+        return stored, True
+    fit = fit_ols(y, X, bool(spec["constant"]))
+    save_model(spec, fit, store_dir)
+    return fit, False
+
+
+def find_models(store_dir=STORE_DIR, **keys):
+    """
+    List the stored models matching the given keys, newest first.
+
+    Every key column is indexed, so lookups by any combination of them are cheap.
+
+    Parameters:
+        store_dir (str): The store directory.
+        **keys: Values of KEY_COLUMNS to match, e.g. dataset_hash=..., y=....
+
+    Returns:
+        pd.DataFrame: One row per model with the keys and diagnostics.
+
+    Raises:
+        ValueError: If a key is not one of KEY_COLUMNS.
+    """
+    unknown = set(keys) - set(KEY_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown model keys: {', '.join(sorted(unknown))}.")
+    where = " AND ".join(f"{key} = ?" for key in keys) or "1"
+    connection = _connect(store_dir)
+    try:
+        models = pd.read_sql_query(
+            f"SELECT {', '.join(KEY_COLUMNS + DIAGNOSTIC_COLUMNS)}, created "
+            f"FROM models WHERE {where} ORDER BY created DESC",
+            connection,
+            params=[int(v) if isinstance(v, bool) else v for v in keys.values()],
+        )
+    finally:
+        connection.close()
+    models["created"] = pd.to_datetime(models["created"], unit="s")
+    return models
+
+
+def params_dict(fit):
+    """
+    Map parameter names to coefficients, as kept in `model_params`.
+
+    Parameters:
+        fit (dict): A fit returned by `fit_ols` or `load_model`.
+
+    Returns:
+        dict: Parameter name to coefficient (float).
+    """
+    return dict(zip(fit["names"], np.asarray(fit["params"], dtype=float).tolist()))
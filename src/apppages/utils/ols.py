@@ -0,0 +1,449 @@
+"""
+Ordinary Least Squares Statistics.
+
+This module holds the goodness-of-fit and inference formulas shared by the regression
+engines. Every function works element-wise on NumPy arrays, so the statistics of many
+models (e.g. every candidate of a model search) are computed in one call. The
+definitions follow statsmodels' `OLS` results so the numbers can be compared directly:
+R-squared is centred when the model has a constant and uncentred otherwise, and AIC
+and BIC are based on the Gaussian log-likelihood.
+
+Growth factors over an h-period horizon overlap, so their regression residuals are
+autocorrelated and the classical standard errors overstate significance. Robust
+covariances are available as sandwich estimators built from residuals that are
+already at hand: "HC3" (heteroskedasticity-robust, leverage-adjusted) and "HAC"
+(Newey-West with Bartlett weights). As with statsmodels' `cov_type`, their p-values
+use the normal distribution.
+
+Constants:
+- CONSTANT (str): Name of the constant, as in statsmodels' `add_constant`.
+- COV_TYPES (tuple): The covariance estimators: "nonrobust", "HC3" and "HAC".
+
+Functions:
+- r_squared(rss, tss):
+    Returns the coefficient of determination.
+
+- adjusted_r_squared(r2, nobs, k_params, constant):
+    Returns R-squared adjusted for the number of parameters.
+
+- log_likelihood(rss, nobs):
+    Returns the Gaussian log-likelihood of a least squares fit.
+
+- information_criteria(rss, nobs, k_params):
+    Returns the Akaike and Bayesian information criteria.
+
+- p_values(t_values, df_resid):
+    Returns two-sided p-values of t statistics.
+
+- durbin_watson(resid):
+    Returns the Durbin-Watson statistic of each column of residuals.
+
+- default_maxlags(nobs, horizon):
+    Returns the number of lags of the HAC estimator for a sample.
+
+- robust_cov(Z, resid, bread, cov_type, maxlags):
+    Returns the robust covariance matrices of a batch of regressions.
+
+- fit_ols(y, X, constant, cov_type, maxlags):
+    Fits one regression and returns its statistics as plain arrays.
+
+- robust_inference(fit, y, X, cov_type, maxlags):
+    Replaces the classical inference of a fit by a robust covariance.
+
+- fit_multi_ols(Y, X, constant):
+    Fits several dependent series on the same drivers with one QR factorisation.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+# Constants
+CONSTANT = "const"
+COEF_COLUMNS = ["y", "variable", "coef", "std_err", "t_value", "p_value"]
+FIT_COLUMNS = ["y", "nobs", "r2", "adj_r2", "aic", "bic", "durbin_watson"]
+COV_TYPES = ("nonrobust", "HC3", "HAC")
+
+
+def r_squared(rss, tss):
+    """
+    Compute the coefficient of determination.
+
+    Parameters:
+        rss (np.ndarray): Residual sums of squares.
+        tss (np.ndarray): Total sums of squares, centred if the model has a constant.
+
+    Returns:
+        np.ndarray: 1 - rss / tss.
+    """
+    return 1 - np.asarray(rss) / tss
+
+
+def adjusted_r_squared(r2, nobs, k_params, constant=True):
+    """
+    Adjust R-squared for the number of estimated parameters.
+
+    Parameters:
+        r2 (np.ndarray): R-squared values.
+        nobs (np.ndarray): Number of observations.
+        k_params (np.ndarray): Number of parameters, including the constant.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        np.ndarray: The adjusted R-squared values.
+    """
+    return 1 - (nobs - int(constant)) / (nobs - k_params) * (1 - np.asarray(r2))
+
+
+def log_likelihood(rss, nobs):
+    """
+    Compute the Gaussian log-likelihood of least squares fits.
+
+    Parameters:
+        rss (np.ndarray): Residual sums of squares.
+        nobs (np.ndarray): Number of observations.
+
+    Returns:
+        np.ndarray: The maximised log-likelihood values.
+    """
+    return -nobs / 2 * (np.log(2 * np.pi) + np.log(np.asarray(rss) / nobs) + 1)
+
+
+def information_criteria(rss, nobs, k_params):
+    """
+    Compute the Akaike and Bayesian information criteria.
+
+    Parameters:
+        rss (np.ndarray): Residual sums of squares.
+        nobs (np.ndarray): Number of observations.
+        k_params (np.ndarray): Number of parameters, including the constant.
+
+    Returns:
+        tuple: The (aic, bic) arrays.
+    """
+    llf = log_likelihood(rss, nobs)
+    return -2 * llf + 2 * k_params, -2 * llf + np.log(nobs) * k_params
+
+
+def p_values(t_values, df_resid):
+    """
+    Compute two-sided p-values of t statistics.
+
+    Parameters:
+        t_values (np.ndarray): The t statistics.
+        df_resid (np.ndarray): Residual degrees of freedom.
+
+    Returns:
+        np.ndarray: The p-values.
+    """
+    return 2 * stats.t.sf(np.abs(t_values), df_resid)
+
+
+def durbin_watson(resid):
+    """
+    Compute the Durbin-Watson statistic of residuals.
+
+    Parameters:
+        resid (np.ndarray): Residuals, shape (nobs,) or (nobs, series).
+
+    Returns:
+        np.ndarray: The statistic for each series; values near 2 indicate no
+                    first-order autocorrelation.
+    """
+    return (np.diff(resid, axis=0) ** 2).sum(axis=0) / (resid**2).sum(axis=0)
+
+
+def default_maxlags(nobs, horizon=1):
+    """
+    Choose the number of lags of the HAC estimator.
+
+    Growth over an h-period horizon makes the residuals a moving average of order
+    h - 1, so at least that many lags are used; otherwise Newey and West's rule of
+    thumb, floor(4 (nobs / 100)^(2/9)).
+
+    Parameters:
+        nobs (int): Number of observations.
+        horizon (int): The growth horizon in periods.
+
+    Returns:
+        int: The number of lags.
+    """
+    return max(int(horizon) - 1, int(4 * (nobs / 100) ** (2 / 9)))
+
+
+def robust_cov(Z, resid, bread, cov_type="HAC", maxlags=None):
+    """
+    Compute sandwich covariance matrices of a batch of regressions.
+
+    The covariance is bread @ meat @ bread, where the meat sums the outer products of
+    the scores z_t e_t: for "HC3" each scaled by 1 / (1 - h_t) with h_t the leverage
+    of period t, and for "HAC" also across periods up to `maxlags` apart with
+    Bartlett weights 1 - j / (maxlags + 1). The definitions match statsmodels'
+    `cov_type="HC3"` and `cov_type="HAC"` (without small-sample correction).
+
+    Parameters:
+        Z (np.ndarray): The design matrices, shape (models, nobs, k).
+        resid (np.ndarray): The residuals, shape (models, nobs).
+        bread (np.ndarray): The (Z'Z)^-1 matrices, shape (models, k, k).
+        cov_type (str): "HC3" or "HAC".
+        maxlags (int, optional): Lags of the HAC estimator. Defaults to
+                                 `default_maxlags(nobs)`.
+
+    Returns:
+        np.ndarray: The covariance matrices, shape (models, k, k).
+
+    Raises:
+        ValueError: If the covariance type is unknown.
+    """
+    if cov_type == "HC3":
+        leverage = np.einsum("mti,mij,mtj->mt", Z, bread, Z)
+        scores = Z * (resid / (1 - leverage))[:, :, None]
+        meat = np.einsum("mti,mtj->mij", scores, scores)
+    elif cov_type == "HAC":
+        nobs = Z.shape[1]
+        maxlags = default_maxlags(nobs) if maxlags is None else int(maxlags)
+        scores = Z * resid[:, :, None]
+        meat = np.einsum("mti,mtj->mij", scores, scores)
+        for lag in range(1, min(maxlags, nobs - 1) + 1):
+            gamma = np.einsum("mti,mtj->mij", scores[:, lag:], scores[:, :-lag])
+            meat += (1 - lag / (maxlags + 1)) * (gamma + gamma.transpose(0, 2, 1))
+    else:
+        raise ValueError(
+            f"Unknown covariance type '{cov_type}'. "
+            f"Choose one of {', '.join(COV_TYPES)}."
+        )
+    return bread @ meat @ bread
+
+
+def _fit_block(Y, Z, constant):
+    """
+    Fit every column of Y on the design matrix Z from one QR factorisation.
+
+    Parameters:
+        Y (np.ndarray): Dependent series, shape (nobs, series).
+        Z (np.ndarray): Design matrix including any constant column.
+        constant (bool): Whether Z includes a constant.
+
+    Returns:
+        dict: "params", "bse" and "pvalues" of shape (params, series), "resid" of
+              shape (nobs, series), "cov_unscaled" ((Z'Z)^-1) and "scale" (the
+              residual variance of each series), and "r2", "adj_r2", "aic", "bic"
+              and "durbin_watson" of shape (series,).
+
+    Raises:
+        ValueError: If the drivers are perfectly collinear.
+    """
+    nobs, k_params = Z.shape
+    q, r = np.linalg.qr(Z)
+    if np.abs(np.diag(r)).min() <= 1e-10 * np.abs(np.diag(r)).max():
+        raise ValueError("The drivers are perfectly collinear.")
+    params = linalg.solve_triangular(r, q.T @ Y)
+    resid = Y - Z @ params
+    rss = (resid**2).sum(axis=0)
+    df_resid = nobs - k_params
+    # (Z'Z)^-1 = R^-1 R^-T, whose diagonal is the squared row norms of R^-1
+    r_inv = linalg.solve_triangular(r, np.eye(k_params))
+    scale = rss / df_resid
+    bse = np.sqrt(np.outer((r_inv**2).sum(axis=1), scale))
+    tss = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0) if constant else (Y**2).sum(axis=0)
+    r2 = r_squared(rss, tss)
+    aic, bic = information_criteria(rss, nobs, k_params)
+    return {
+        "params": params,
+        "bse": bse,
+        "pvalues": p_values(params / bse, df_resid),
+        "resid": resid,
+        "cov_unscaled": r_inv @ r_inv.T,
+        "scale": scale,
+        "r2": r2,
+        "adj_r2": adjusted_r_squared(r2, nobs, k_params, constant),
+        "aic": aic,
+        "bic": bic,
+        "durbin_watson": durbin_watson(resid),
+    }
+
+
+def fit_ols(y, X, constant=True, cov_type="nonrobust", maxlags=None):
+    """
+    Fit one regression directly with NumPy/LAPACK.
+
+    This is the lean alternative to `sm.OLS(y, X).fit()` for when only the numbers
+    are needed. Periods where the series or any driver is missing are dropped.
+
+    Parameters:
+        y (pd.Series): The dependent series.
+        X (pd.DataFrame): The drivers, without a constant column.
+        constant (bool): Whether the model includes a constant, appended last as
+                         "const" like `sm.add_constant(X, prepend=False)`.
+        cov_type (str): One of COV_TYPES.
+        maxlags (int, optional): Lags of the HAC estimator, see `robust_cov`.
+
+    Returns:
+        dict: "names" of the parameters, the arrays "params", "bse", "tvalues" and
+              "pvalues", the covariance matrix "cov_params", the residuals "resid"
+              and the "index" of the periods fitted, the scalars "nobs",
+              "df_resid", "r2", "adj_r2", "aic", "bic" and "durbin_watson", and the
+              "cov_type" the inference is based on.
+
+    Raises:
+        ValueError: If the model has no parameters, too few periods, perfectly
+                    collinear drivers or an unknown covariance type.
+    """
+    names = list(X.columns) + ([CONSTANT] if constant else [])
+    if not names:
+        raise ValueError("The model has no parameters.")
+    y_values, Z, rows = _design(y, X, constant)
+    if len(Z) <= len(names):
+        raise ValueError("There are not enough periods to fit the model.")
+    fits = _fit_block(y_values[:, None], Z, constant)
+    params, bse = fits["params"][:, 0], fits["bse"][:, 0]
+    fit = {
+        "names": names,
+        "params": params,
+        "bse": bse,
+        "tvalues": params / bse,
+        "pvalues": fits["pvalues"][:, 0],
+        "cov_params": fits["cov_unscaled"] * fits["scale"][0],
+        "resid": fits["resid"][:, 0],
+        "index": y.index[rows],
+        "nobs": len(Z),
+        "df_resid": len(Z) - len(names),
+        **{key: float(fits[key][0]) for key in FIT_COLUMNS[2:]},
+        "cov_type": "nonrobust",
+    }
+    if cov_type == "nonrobust":
+        return fit
+    return _with_robust_cov(fit, Z, cov_type, maxlags)
+
+
+def _design(y, X, constant):
+    """
+    Drop the periods with a missing value and build the design matrix.
+
+    Parameters:
+        y (pd.Series): The dependent series.
+        X (pd.DataFrame): The drivers, without a constant column.
+        constant (bool): Whether to append a column of ones.
+
+    Returns:
+        tuple: The dependent values, the design matrix and the mask of periods kept.
+    """
+    y_values, Z = y.to_numpy(dtype=float), X.to_numpy(dtype=float)
+    rows = ~(np.isnan(y_values) | np.isnan(Z).any(axis=1))
+    if not rows.all():
+        y_values, Z = y_values[rows], Z[rows]
+    if constant:
+        Z = np.column_stack([Z, np.ones(len(Z))])
+    return y_values, Z, rows
+
+
+def _with_robust_cov(fit, Z, cov_type, maxlags):
+    """Return a copy of a fit with the inference of a robust covariance."""
+    resid = np.asarray(fit["resid"], dtype=float)
+    scale = resid @ resid / fit["df_resid"]
+    bread = np.asarray(fit["cov_params"]) / scale
+    cov = robust_cov(Z[None], resid[None], bread[None], cov_type, maxlags)[0]
+    bse = np.sqrt(np.diag(cov))
+    tvalues = fit["params"] / bse
+    return {
+        **fit,
+        "bse": bse,
+        "tvalues": tvalues,
+        "pvalues": 2 * stats.norm.sf(np.abs(tvalues)),
+        "cov_params": cov,
+        "cov_type": cov_type,
+    }
+
+
+def robust_inference(fit, y, X, cov_type="HAC", maxlags=None):
+    """
+    Replace the classical inference of a fit by a robust covariance.
+
+    Only the residuals of the fit and the drivers are needed, so this also applies
+    to fits loaded from the model store.
+
+    Parameters:
+        fit (dict): A classical fit returned by `fit_ols` or the model store.
+        y (pd.Series): The dependent series the fit was estimated on.
+        X (pd.DataFrame): The drivers, without a constant column.
+        cov_type (str): One of COV_TYPES.
+        maxlags (int, optional): Lags of the HAC estimator, see `robust_cov`.
+
+    Returns:
+        dict: The fit with robust "bse", "tvalues", "pvalues" and "cov_params" and
+              the "cov_type".
+    """
+    if cov_type == "nonrobust":
+        return fit
+    Z = _design(y, X, fit["names"][-1] == CONSTANT)[1]
+    return _with_robust_cov(fit, Z, cov_type, maxlags)
+
+
+def fit_multi_ols(Y, X, constant=True):
+    """
+    Fit several dependent series on the same drivers at once.
+
+    X is factorised once and the whole Y matrix is solved against it. Periods with a
+    missing driver are dropped; dependent series with the same missing periods share
+    one factorisation, so the usual case of fully aligned series needs only one.
+    Series with no more observations than parameters are left out.
+
+    Parameters:
+        Y (pd.DataFrame): The dependent series, one per column.
+        X (pd.DataFrame): The drivers, with the same index as Y.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        tuple: A tuple containing:
+            - coefficients (pd.DataFrame): One row per series and parameter with
+              columns "y", "variable", "coef", "std_err", "t_value" and "p_value".
+            - fit (pd.DataFrame): One row per series with "nobs", "r2", "adj_r2",
+              "aic", "bic" and "durbin_watson".
+
+    Raises:
+        ValueError: If the drivers are perfectly collinear.
+    """
+    rows = X.notna().all(axis=1).to_numpy()
+    Y, X = Y[rows], X[rows]
+    names = list(X.columns) + ([CONSTANT] if constant else [])
+    observed = Y.notna().to_numpy()
+
+    coef_frames, fit_frames = [], []
+    patterns, group_of = np.unique(observed, axis=1, return_inverse=True)
+    for group, pattern in enumerate(patterns.T):
+        cols = Y.columns[group_of.ravel() == group]
+        Z = X.to_numpy(dtype=float)[pattern]
+        if pattern.sum() <= len(names):
+            continue
+        if constant:
+            Z = np.column_stack([Z, np.ones(len(Z))])
+        fits = _fit_block(Y[cols].to_numpy(dtype=float)[pattern], Z, constant)
+        coef_frames.append(
+            pd.DataFrame(
+                {
+                    "y": np.repeat(cols, len(names)),
+                    "variable": np.tile(names, len(cols)),
+                    "coef": fits["params"].T.ravel(),
+                    "std_err": fits["bse"].T.ravel(),
+                    "t_value": (fits["params"] / fits["bse"]).T.ravel(),
+                    "p_value": fits["pvalues"].T.ravel(),
+                }
+            )
+        )
+        fit_frames.append(
+            pd.DataFrame(
+                {"y": cols, "nobs": int(pattern.sum())}
+                | {key: fits[key] for key in FIT_COLUMNS[2:]}
+            )
+        )
+
+    if not fit_frames:
+        return pd.DataFrame(columns=COEF_COLUMNS), pd.DataFrame(columns=FIT_COLUMNS)
+    order = {col: i for i, col in enumerate(Y.columns)}
+    coefficients = pd.concat(coef_frames, ignore_index=True).sort_values(
+        "y", key=lambda col: col.map(order), kind="stable", ignore_index=True
+    )
+    fit = pd.concat(fit_frames, ignore_index=True).sort_values(
+        "y", key=lambda col: col.map(order), ignore_index=True
+    )
+    return coefficients[COEF_COLUMNS], fit[FIT_COLUMNS]
@@ -0,0 +1,275 @@
+"""
+Input File Readers.
+
+This module lets the tool read its regression inputs from formats other than the
+Excel template. Every format holds the same logical layout as the template: one
+column per variable named "y:{name}" or "x:{name}", the timeline labels as the index
+and a type map mirroring the `var_dict` returned by `spreadsheet_to_df`.
+
+- CSV: the first column holds the timeline labels and the first data row, labelled
+  "abs/pct" as in column E of the template, holds each variable's type.
+- Parquet / Feather: the type map is stored as JSON under the "var_dict" key of the
+  Arrow schema metadata.
+
+Readers are looked up by file suffix in a registry, so further formats can be added
+with `register_reader`. Whatever the format, the inputs read go through the checks
+of the Excel template (see `validation`) before they are converted to numbers; the
+Excel reader runs them itself, on the worksheet cells. Converting a template to
+Parquet once with `template_to_parquet` lets repeat analyses skip openpyxl entirely.
+
+Constants:
+- TYPE_ROW (str): Index label of the CSV row holding the variable types.
+- VAR_DICT_KEY (bytes): Arrow schema metadata key holding the variable types.
+
+Functions:
+- register_reader(*suffixes, validated):
+    Decorator registering a reader function for the given file suffixes.
+
+- read_input_file(input_file_path):
+    Reads any supported input file into the (df, df_index, var_dict) tuple.
+
+- write_input_file(df, var_dict, output_path):
+    Writes the inputs to CSV, Parquet or Feather according to the file suffix.
+
+- template_to_parquet(input_file_path, output_path):
+    Converts a completed Excel template into a Parquet input file.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from apppages.utils.cache import cached_spreadsheet_to_df
+from apppages.utils.excel import spreadsheet_to_df
+from apppages.utils.timeline import labels_to_period_index, period_labels
+from apppages.utils.validation import InputValidationError, validate_frame
+
+# Constants
+TYPE_ROW = "abs/pct"
+VAR_DICT_KEY = b"var_dict"
+
+READERS = {}
+VALIDATED = set()
+
+
+def register_reader(*suffixes, validated=False):
+    """
+    Register the decorated function as the reader for the given file suffixes.
+
+    A reader takes the input file path and returns the (df, df_index, var_dict)
+    tuple returned by `spreadsheet_to_df`. The cells and the index of `df` may be left
+    as read from the file: `read_input_file` validates and converts them.
+
+    Parameters:
+        *suffixes (str): File suffixes including the dot, e.g. ".csv".
+        validated (bool): Whether the reader already validates and converts its
+                          inputs, as `spreadsheet_to_df` does.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(func):
+        for suffix in suffixes:
+            READERS[suffix.lower()] = func
+            if validated:
+                VALIDATED.add(suffix.lower())
+            else:
+                VALIDATED.discard(suffix.lower())
+        return func
+
+    return decorator
+
+
+def _file_suffix(file_path):
+    """Return the lower-case suffix of a file path, e.g. ".parquet"."""
+    return os.path.splitext(str(file_path))[1].lower()
+
+
+def _finalise(df, var_dict):
+    """
+    Validate the inputs of a reader and convert them as `spreadsheet_to_df` would.
+
+    Parameters:
+        df (pd.DataFrame): The variables, indexed by timeline label or period.
+        var_dict (dict): Variable name to type mapping.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple.
+
+    Raises:
+        InputValidationError: If the inputs fail validation; its `report` attribute
+                              holds the validation report.
+    """
+    report = validate_frame(df, var_dict)
+    if not report.empty:
+        raise InputValidationError(report)
+    df = df.astype(float)
+    if not isinstance(df.index, pd.PeriodIndex):
+        df.index = labels_to_period_index(df.index)
+    return df, df.index, var_dict
+
+
+@register_reader(".xlsx", ".xlsm", validated=True)
+def read_excel_template(input_file_path):
+    """
+    Read a completed Excel template through the parse cache.
+
+    Parameters:
+        input_file_path (str): The file path to the input Excel file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple.
+    """
+    return cached_spreadsheet_to_df(input_file_path)
+
+
+@register_reader(".csv")
+def read_csv_inputs(input_file_path):
+    """
+    Read inputs from a CSV file with an "abs/pct" type row under the header.
+
+    Parameters:
+        input_file_path (str): The file path to the CSV file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple, with the cells as read.
+    """
+    raw = pd.read_csv(input_file_path, index_col=0, dtype=str)
+    if TYPE_ROW not in raw.index:
+        raise ValueError(f"CSV inputs must contain a '{TYPE_ROW}' type row.")
+    types = raw.loc[TYPE_ROW]
+    var_dict = {col[2:]: types[col] for col in raw.columns}
+    raw = raw.drop(index=TYPE_ROW)
+    return raw, raw.index, var_dict
+
+
+def _read_arrow_table(table):
+    """
+    Convert an Arrow table written by `write_input_file` into the inputs tuple.
+
+    Parameters:
+        table (pa.Table): The table read from a Parquet or Feather file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple, with the cells as read.
+    """
+    metadata = table.schema.metadata or {}
+    if VAR_DICT_KEY not in metadata:
+        raise ValueError("Input file does not contain a variable type map.")
+    var_dict = json.loads(metadata[VAR_DICT_KEY])
+    df = table.to_pandas()
+    df.index.name = None
+    return df, df.index, var_dict
+
+
+@register_reader(".parquet", ".pq")
+def read_parquet_inputs(input_file_path):
+    """
+    Read inputs from a Parquet file.
+
+    Parameters:
+        input_file_path (str): The file path to the Parquet file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple.
+    """
+    return _read_arrow_table(pq.read_table(input_file_path))
+
+
+@register_reader(".feather", ".arrow")
+def read_feather_inputs(input_file_path):
+    """
+    Read inputs from a Feather (Arrow IPC) file.
+
+    Parameters:
+        input_file_path (str): The file path to the Feather file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple.
+    """
+    return _read_arrow_table(feather.read_table(input_file_path))
+
+
+def read_input_file(input_file_path):
+    """
+    Read any supported input file, choosing the reader from the file suffix.
+
+    Parameters:
+        input_file_path (str): The path of the input file.
+
+    Returns:
+        tuple: The (df, df_index, var_dict) tuple returned by `spreadsheet_to_df`.
+
+    Raises:
+        ValueError: If no reader is registered for the file suffix.
+        InputValidationError: If the inputs fail validation.
+    """
+    suffix = _file_suffix(input_file_path)
+    if suffix not in READERS:
+        raise ValueError(
+            f"Unsupported input file type '{suffix}'. "
+            f"Supported types: {', '.join(sorted(READERS))}"
+        )
+    inputs = READERS[suffix](input_file_path)
+    if suffix in VALIDATED:
+        return inputs
+    df, _, var_dict = inputs
+    return _finalise(df, var_dict)
+
+
+def write_input_file(df, var_dict, output_path):
+    """
+    Write the inputs to CSV, Parquet or Feather according to the file suffix.
+
+    Parameters:
+        df (pd.DataFrame): The variables, indexed by the timeline PeriodIndex.
+        var_dict (dict): Variable name to type mapping.
+        output_path (str): The destination file path.
+
+    Raises:
+        ValueError: If the file suffix is not a supported output format.
+    """
+    suffix = _file_suffix(output_path)
+    types = {col: var_dict.get(col[2:]) for col in df.columns}
+    # Periods are stored as their template labels, e.g. "2012 Q1"
+    df = df.set_axis(period_labels(df.index), axis=0)
+    if suffix == ".csv":
+        types_row = pd.DataFrame([types], index=[TYPE_ROW])
+        pd.concat([types_row, df.astype(object)]).to_csv(output_path)
+        return
+
+    table = pa.Table.from_pandas(df.rename_axis("period"))
+    # Key the type map by bare variable name, as in `var_dict`
+    var_types = json.dumps({col[2:]: t for col, t in types.items()})
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), VAR_DICT_KEY: var_types}
+    )
+    if suffix in (".parquet", ".pq"):
+        pq.write_table(table, output_path)
+    elif suffix in (".feather", ".arrow"):
+        feather.write_feather(table, output_path)
+    else:
+        raise ValueError(f"Unsupported output file type '{suffix}'.")
+
+
+def template_to_parquet(input_file_path, output_path=None):
+    """
+    Convert a completed Excel template into a Parquet input file.
+
+    Parameters:
+        input_file_path (str): The file path to the input Excel file.
+        output_path (str, optional): The destination path. Defaults to the template
+                                     path with a ".parquet" suffix.
+
+    Returns:
+        str: The path of the written Parquet file.
+    """
+    if output_path is None:
+        output_path = os.path.splitext(str(input_file_path))[0] + ".parquet"
+    df, _, var_dict = spreadsheet_to_df(input_file_path)
+    write_input_file(df, var_dict, output_path)
+    return output_path
@@ -0,0 +1,385 @@
+"""
+Penalised Regression Paths.
+
+With more candidate drivers than quarterly observations, ordinary least squares is
+singular or badly overfit. This module fits penalised regressions instead, over a
+whole grid of penalties at once:
+
+- "lasso" and "elastic_net" use scikit-learn's coordinate-descent solver
+  (`enet_path`). It walks the grid from the largest penalty, where every coefficient
+  is zero, to the smallest, starting each solve from the previous solution (a warm
+  start), and works from the precomputed cross-product (Gram) matrix, so a sweep
+  costs a pass over a drivers x drivers matrix rather than over the observations.
+- "ridge" has a closed form along the whole grid from one singular value
+  decomposition of the drivers.
+
+The drivers are standardised before they are penalised, so the penalty does not
+depend on their units; the constant is never penalised. Coefficients are reported
+in the original units, so they read as elasticities like the OLS coefficients.
+
+The penalty is chosen by time-series cross-validation with the folds of
+`cross_validation`: the path is refitted on every training set over the same grid
+and the penalty with the smallest pooled out-of-sample error is kept. Series are
+processed in parallel in a process pool.
+
+Constants:
+- PENALTIES (tuple): The penalties: "lasso", "elastic_net" and "ridge".
+- N_ALPHAS (int): Default number of penalties on the grid.
+
+Functions:
+- penalty_grid(X, y, penalty, l1_ratio, n_alphas, constant):
+    Returns the decreasing grid of penalties of a standardised problem.
+
+- penalised_path(y, X, alphas, penalty, l1_ratio, constant):
+    Returns the coefficients in original units at every penalty of a grid.
+
+- regularisation_path(y, X, x_names, penalty, l1_ratio, n_alphas, constant, cv,
+  criterion):
+    Fits the path of one series and selects its penalty by cross-validation.
+
+- penalised_models(g_df, y_cols, x_cols, ...):
+    Fits and selects the paths of several series in a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import enet_path
+from apppages.utils.cross_validation import make_folds
+from apppages.utils.model_search import CV_CRITERIA, regression_sample
+from apppages.utils.ols import CONSTANT
+
+# Constants
+PENALTIES = ("lasso", "elastic_net", "ridge")
+N_ALPHAS = 100
+PATH_EPS = 1e-3
+# Coordinate descent stops on the duality gap relative to ||y||²; growth series vary
+# little, so scikit-learn's default of 1e-4 leaves visible error in the elasticities
+PATH_TOL = 1e-6
+MAX_ITER = 10_000
+RIDGE_SPAN = 1e3
+SELECTED_COLUMNS = [
+    "y",
+    "penalty",
+    "l1_ratio",
+    "alpha",
+    "drivers",
+    "n_drivers",
+    "nobs",
+    "r2",
+    "cv_rmse",
+    "cv_mape",
+]
+
+
+def _l1_ratio(penalty, l1_ratio):
+    """Return the share of the L1 penalty for a penalty name."""
+    if penalty not in PENALTIES:
+        raise ValueError(
+            f"Unknown penalty '{penalty}'. Choose one of {', '.join(PENALTIES)}."
+        )
+    return {"lasso": 1.0, "ridge": 0.0}.get(penalty, float(l1_ratio))
+
+
+def _standardise(X, y, constant):
+    """
+    Centre (with a constant) and scale the drivers, and centre the series.
+
+    Parameters:
+        X (np.ndarray): The drivers, shape (nobs, drivers).
+        y (np.ndarray): The dependent series, shape (nobs,).
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        tuple: The standardised drivers, the centred series, and the driver means,
+               driver scales and series mean used.
+    """
+    x_mean = X.mean(axis=0) if constant else np.zeros(X.shape[1])
+    y_mean = y.mean() if constant else 0.0
+    Xc = X - x_mean
+    x_scale = np.sqrt((Xc**2).mean(axis=0))
+    # A constant driver has no variation to penalise; its coefficient stays zero
+    x_scale[x_scale == 0] = 1.0
+    return Xc / x_scale, y - y_mean, x_mean, x_scale, y_mean
+
+
+def penalty_grid(X, y, penalty="lasso", l1_ratio=0.5, n_alphas=N_ALPHAS, constant=True):
+    """
+    Build the decreasing grid of penalties for a series and its drivers.
+
+    For the lasso and the elastic net the grid starts at the smallest penalty that
+    sets every coefficient to zero and ends PATH_EPS times lower, as scikit-learn's.
+    Ridge never zeroes a coefficient, so its grid spans RIDGE_SPAN times the largest
+    eigenvalue of the standardised X'X / nobs down to that eigenvalue over RIDGE_SPAN.
+
+    Parameters:
+        X (np.ndarray): The drivers, shape (nobs, drivers).
+        y (np.ndarray): The dependent series, shape (nobs,).
+        penalty (str): One of PENALTIES.
+        l1_ratio (float): Share of the L1 penalty of the elastic net.
+        n_alphas (int): Number of penalties.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        np.ndarray: The penalties, largest first.
+    """
+    ratio = _l1_ratio(penalty, l1_ratio)
+    Xs, yc = _standardise(X, y, constant)[:2]
+    nobs = len(yc)
+    if ratio > 0:
+        alpha_max = np.abs(Xs.T @ yc).max() / (nobs * ratio)
+        alpha_min = alpha_max * PATH_EPS
+    else:
+        top = np.linalg.norm(Xs, ord=2) ** 2 / nobs
+        alpha_max, alpha_min = top * RIDGE_SPAN, top / RIDGE_SPAN
+    if not alpha_max > 0:
+        # The series does not vary, so every penalty gives the same model
+        alpha_max, alpha_min = 1.0, PATH_EPS
+    return np.geomspace(alpha_max, alpha_min, int(n_alphas))
+
+
+def penalised_path(y, X, alphas, penalty="lasso", l1_ratio=0.5, constant=True):
+    """
+    Fit a penalised regression at every penalty of a grid.
+
+    The objective is 1 / (2 nobs) ||y - Xb||² plus alpha times
+    l1_ratio ||b||₁ + (1 - l1_ratio) / 2 ||b||² on the standardised drivers, as in
+    scikit-learn's `ElasticNet`; ridge is the case l1_ratio = 0.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers).
+        alphas (np.ndarray): The penalties, largest first.
+        penalty (str): One of PENALTIES.
+        l1_ratio (float): Share of the L1 penalty of the elastic net.
+        constant (bool): Whether the models include a constant.
+
+    Returns:
+        tuple: The coefficients in original units, shape (alphas, drivers), and the
+               constants, shape (alphas,), zero without a constant.
+    """
+    ratio = _l1_ratio(penalty, l1_ratio)
+    Xs, yc, x_mean, x_scale, y_mean = _standardise(X, y, constant)
+    nobs = len(yc)
+    if ratio > 0:
+        Xs = np.asfortranarray(Xs)
+        _, coefs, _ = enet_path(
+            Xs,
+            yc,
+            l1_ratio=ratio,
+            alphas=alphas,
+            precompute=Xs.T @ Xs,
+            Xy=Xs.T @ yc,
+            check_input=False,
+            tol=PATH_TOL,
+            max_iter=MAX_ITER,
+        )
+        coefs = coefs.T
+    else:
+        # b(alpha) = V diag(s / (s² + nobs alpha)) U'y for every alpha at once
+        u, s, vt = np.linalg.svd(Xs, full_matrices=False)
+        shrink = s / (s**2 + nobs * np.asarray(alphas)[:, None])
+        coefs = (shrink * (u.T @ yc)) @ vt
+    coefs = coefs / x_scale
+    const = y_mean - coefs @ x_mean if constant else np.zeros(len(coefs))
+    return coefs, const
+
+
+def _path_cv_errors(y, X, alphas, folds, penalty, l1_ratio, constant):
+    """
+    Refit the path on every training set and pool its out-of-sample errors.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The drivers, shape (nobs, drivers).
+        alphas (np.ndarray): The penalties of the full-sample path.
+        folds (list): The folds returned by `make_folds`.
+        penalty, l1_ratio, constant: See `penalised_path`.
+
+    Returns:
+        dict: The pooled "cv_rmse" and "cv_mape" of every penalty.
+    """
+    sse = np.zeros(len(alphas))
+    ape = np.zeros(len(alphas))
+    n_test = n_ape = 0
+    for train, (start, stop) in folds:
+        rows = np.concatenate([np.arange(a, b) for a, b in train])
+        coefs, const = penalised_path(
+            y[rows], X[rows], alphas, penalty, l1_ratio, constant
+        )
+        actual = y[start:stop]
+        errors = X[start:stop] @ coefs.T + const - actual[:, None]
+        valid = actual != 0
+        sse += (errors**2).sum(axis=0)
+        ape += np.abs(errors[valid] / actual[valid, None]).sum(axis=0)
+        n_test += stop - start
+        n_ape += valid.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"cv_rmse": np.sqrt(sse / n_test), "cv_mape": 100 * ape / n_ape}
+
+
+def regularisation_path(
+    y,
+    X,
+    x_names,
+    penalty="lasso",
+    l1_ratio=0.5,
+    n_alphas=N_ALPHAS,
+    constant=True,
+    cv=None,
+    criterion="cv_rmse",
+):
+    """
+    Fit the penalised path of one series and select its penalty.
+
+    Parameters:
+        y (np.ndarray): The dependent series, shape (nobs,).
+        X (np.ndarray): The candidate drivers, shape (nobs, drivers).
+        x_names (list): The names of the drivers.
+        penalty (str): One of PENALTIES.
+        l1_ratio (float): Share of the L1 penalty of the elastic net.
+        n_alphas (int): Number of penalties on the grid.
+        constant (bool): Whether the models include a constant.
+        cv (dict, optional): Keyword arguments of `make_folds`. Defaults to five
+                             rolling-origin folds.
+        criterion (str): The error minimised by the selected penalty, "cv_rmse" or
+                         "cv_mape".
+
+    Returns:
+        tuple: A tuple containing:
+            - path (pd.DataFrame): Indexed by "alpha", largest first, with the
+              number of drivers kept, "r2", "cv_rmse", "cv_mape" and one
+              coefficient column per driver plus "const".
+            - selected (dict): The selected penalty with its driver set, fit and
+              errors, and the coefficients of the drivers kept plus "const".
+
+    Raises:
+        ValueError: If the penalty or criterion is unknown or the sample is too
+                    short for the folds.
+    """
+    if criterion not in CV_CRITERIA:
+        raise ValueError(
+            f"Unknown criterion '{criterion}'. Choose one of {', '.join(CV_CRITERIA)}."
+        )
+    alphas = penalty_grid(X, y, penalty, l1_ratio, n_alphas, constant)
+    coefs, const = penalised_path(y, X, alphas, penalty, l1_ratio, constant)
+    folds = make_folds(len(y), **(cv or {}))
+    errors = _path_cv_errors(y, X, alphas, folds, penalty, l1_ratio, constant)
+
+    resid = y[:, None] - X @ coefs.T - const
+    centred = y - y.mean() if constant else y
+    kept = coefs != 0
+    index = pd.Index(alphas, name="alpha")
+    path = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "n_drivers": kept.sum(axis=1),
+                    "r2": 1 - (resid**2).sum(axis=0) / (centred @ centred),
+                    **errors,
+                },
+                index=index,
+            ),
+            pd.DataFrame(coefs, columns=list(x_names), index=index),
+            pd.DataFrame({CONSTANT: const}, index=index),
+        ],
+        axis=1,
+    )
+
+    best = int(np.nanargmin(errors[criterion]))
+    drivers = [name for name, keep in zip(x_names, kept[best]) if keep]
+    selected = {
+        "penalty": penalty,
+        "l1_ratio": _l1_ratio(penalty, l1_ratio),
+        "alpha": alphas[best],
+        "drivers": " + ".join(drivers),
+        "n_drivers": len(drivers),
+        "nobs": len(y),
+        "r2": path["r2"].iat[best],
+        "cv_rmse": errors["cv_rmse"][best],
+        "cv_mape": errors["cv_mape"][best],
+        **{name: path[name].iat[best] for name in drivers},
+        CONSTANT: const[best],
+    }
+    return path, selected
+
+
+def _path_series(job, settings):
+    """
+    Fit and select the path of one series; run in a worker process.
+
+    Parameters:
+        job (tuple): The (y_col, y, X) of the series.
+        settings (dict): Keyword arguments of `regularisation_path`.
+
+    Returns:
+        tuple: The path and the selected model of the series.
+    """
+    y_col, y, X = job
+    path, selected = regularisation_path(y, X, **settings)
+    return path, {"y": y_col, **selected}
+
+
+def penalised_models(
+    g_df,
+    y_cols,
+    x_cols,
+    penalty="lasso",
+    l1_ratio=0.5,
+    n_alphas=N_ALPHAS,
+    constant=True,
+    cv=None,
+    criterion="cv_rmse",
+    max_workers=None,
+):
+    """
+    Fit the penalised path of each dependent series and select its penalty.
+
+    Parameters:
+        g_df (pd.DataFrame): The growth dataframe, restricted to the estimation
+                             window.
+        y_cols (list): The dependent series ("g: y:" columns).
+        x_cols (list): The candidate drivers ("g: x:" columns).
+        penalty (str): One of PENALTIES.
+        l1_ratio (float): Share of the L1 penalty of the elastic net.
+        n_alphas (int): Number of penalties on the grid.
+        constant (bool): Whether the models include a constant.
+        cv (dict, optional): Keyword arguments of `make_folds`.
+        criterion (str): The error minimised by the selected penalty, "cv_rmse" or
+                         "cv_mape".
+        max_workers (int, optional): Number of worker processes. Defaults to the
+                                     number of CPUs; 1 fits in the calling process.
+
+    Returns:
+        tuple: A tuple containing:
+            - selected (pd.DataFrame): One row per series with SELECTED_COLUMNS and
+              one coefficient column per driver plus "const"; drivers the penalty
+              removed are left empty, as in the model search results.
+            - paths (dict): Series name to its path, see `regularisation_path`.
+    """
+    jobs = [(y_col, *regression_sample(g_df, y_col, x_cols)) for y_col in y_cols]
+    fit = partial(
+        _path_series,
+        settings={
+            "x_names": list(x_cols),
+            "penalty": penalty,
+            "l1_ratio": l1_ratio,
+            "n_alphas": n_alphas,
+            "constant": constant,
+            "cv": cv,
+            "criterion": criterion,
+        },
+    )
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [fit(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fit, jobs))
+    selected = pd.DataFrame(
+        [row for _, row in results],
+        columns=[*SELECTED_COLUMNS, *x_cols, CONSTANT],
+    )
+    paths = {y_col: path for (y_col, _, _), (path, _) in zip(jobs, results)}
+    return selected, paths
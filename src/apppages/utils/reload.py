@@ -0,0 +1,211 @@
+"""
+Incremental Reload of Input Data.
+
+When an analyst edits a workbook and reads it again, most variables are usually
+unchanged. This module compares the newly parsed data with the previous load column
+by column, using a hash of each variable's values and type, and then invalidates only
+the results that depend on the variables that changed:
+
+- growth rates (for every horizon of the growth tensor) are recomputed for changed and
+  added variables only and dropped for removed ones;
+- the regression dataframe, fitted model parameters and their bootstrap intervals
+  are cleared only if the selected dependent or independent variables changed;
+- the backcast results are cleared only if the variables they use changed;
+- the model search results are cleared only if a searched variable changed.
+
+A change to the timeline itself invalidates everything.
+
+Functions:
+- column_hashes(df, var_dict):
+    Returns a content hash per variable plus one for the index.
+
+- diff_inputs(old_hashes, new_hashes):
+    Compares two sets of hashes and lists the added, removed and changed variables.
+
+- apply_reload(state, df, df_index, var_dict):
+    Stores newly parsed inputs in the session state, invalidating only what changed.
+"""
+
+import hashlib
+
+import pandas as pd
+from apppages.utils.design import NO_TERMS, add_design_terms
+from apppages.utils.lag_search import base_column
+
+INDEX_KEY = "__index__"
+
+
+def _digest(*parts):
+    """Return the hex digest of the concatenated byte strings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def column_hashes(df, var_dict):
+    """
+    Hash each variable's values and type, and the timeline index.
+
+    Parameters:
+        df (pd.DataFrame): The parsed inputs.
+        var_dict (dict): Variable name to type mapping.
+
+    Returns:
+        dict: Column name to hex digest, plus the index digest under "__index__".
+    """
+    values = df.to_numpy(dtype=float)
+    hashes = {
+        col: _digest(values[:, i].tobytes(), str(var_dict.get(col[2:])).encode("utf-8"))
+        for i, col in enumerate(df.columns)
+    }
+    index = df.index
+    index_bytes = (
+        index.asi8.tobytes() + index.freqstr.encode("utf-8")
+        if isinstance(index, pd.PeriodIndex)
+        else "\x1f".join(map(str, index)).encode("utf-8")
+    )
+    hashes[INDEX_KEY] = _digest(index_bytes)
+    return hashes
+
+
+def diff_inputs(old_hashes, new_hashes):
+    """
+    Compare the column hashes of two loads.
+
+    Parameters:
+        old_hashes (dict): Hashes of the previous load (may be empty).
+        new_hashes (dict): Hashes of the new load.
+
+    Returns:
+        dict: Lists of "added", "removed" and "changed" variables, and whether the
+              index changed ("index_changed").
+    """
+    old_cols = {c for c in old_hashes if c != INDEX_KEY}
+    new_cols = {c for c in new_hashes if c != INDEX_KEY}
+    return {
+        "added": sorted(new_cols - old_cols),
+        "removed": sorted(old_cols - new_cols),
+        "changed": sorted(
+            c for c in old_cols & new_cols if old_hashes[c] != new_hashes[c]
+        ),
+        "index_changed": old_hashes.get(INDEX_KEY) != new_hashes.get(INDEX_KEY),
+    }
+
+
+def _reset_results(state):
+    """Clear every result derived from the input data."""
+    state.growth_tensor = None
+    state.g_df = None
+    state.g_df_idx = None
+    state.r_df = None
+    state.model_params = []
+    state.model_intervals = None
+    state.bc_df = None
+    state.bc_plot_df = None
+    state.search_results = None
+    state.search_report = None
+    state.penalised_results = None
+    state.design_terms = NO_TERMS
+    state.design_columns = []
+
+
+def _update_growth(state, df, var_dict, refresh, removed):
+    """
+    Recompute the growth tensor for the `refresh` variables and drop removed ones.
+
+    Generated terms that have the name of a new input variable are all cleared.
+
+    Parameters:
+        state: The Streamlit session state.
+        df (pd.DataFrame): The new inputs.
+        var_dict (dict): Variable name to type mapping.
+        refresh (list): Variables whose growth must be recomputed.
+        removed (list): Variables that no longer exist.
+    """
+    state.growth_tensor = state.growth_tensor.update(df, var_dict, refresh, removed)
+    g_df = state.growth_tensor.frame(state.horizon)
+    try:
+        state.g_df, state.design_columns = add_design_terms(
+            g_df, state.get("design_terms")
+        )
+    except ValueError:
+        state.design_terms = NO_TERMS
+        state.g_df, state.design_columns = g_df, []
+    state.g_df_idx = state.g_df.index
+
+
+def apply_reload(state, df, df_index, var_dict):
+    """
+    Store newly parsed inputs in the session state, invalidating only what changed.
+
+    Parameters:
+        state: The Streamlit session state.
+        df (pd.DataFrame): The newly parsed inputs.
+        df_index (pd.PeriodIndex): The time series index of the inputs.
+        var_dict (dict): Variable name to type mapping.
+
+    Returns:
+        dict: The differences found by `diff_inputs`, plus "full_reload" (bool) and
+              "invalidated" (list of the session results that were cleared).
+    """
+    new_hashes = column_hashes(df, var_dict)
+    diff = diff_inputs(state.get("df_hashes") or {}, new_hashes)
+    full_reload = (
+        state.get("df") is None
+        or state.get("growth_tensor") is None
+        or state.get("horizon") not in state.growth_tensor.horizons
+        or diff["index_changed"]
+    )
+
+    state.df, state.df_index, state.var_dict = df, df_index, var_dict
+    state.df_hashes = new_hashes
+
+    if full_reload:
+        _reset_results(state)
+        return {**diff, "full_reload": True, "invalidated": ["all"]}
+
+    affected = set(diff["changed"]) | set(diff["removed"]) | set(diff["added"])
+    if affected:
+        _update_growth(
+            state, df, var_dict, diff["changed"] + diff["added"], diff["removed"]
+        )
+
+    invalidated = []
+    y_sel_g = state.get("y_sel_g") or []
+    x_sel_g = state.get("x_sel_g") or []
+    regression_vars = {
+        c[3:] for c in ([y_sel_g] if isinstance(y_sel_g, str) else y_sel_g) + x_sel_g
+    }
+    if regression_vars & affected:
+        state.r_df = None
+        state.model_params = []
+        state.model_intervals = None
+        invalidated += ["r_df", "model_params", "model_intervals"]
+
+    y_sel = state.get("y_sel") or []
+    backcast_vars = regression_vars | set([y_sel] if isinstance(y_sel, str) else y_sel)
+    if backcast_vars & affected:
+        state.bc_df = None
+        state.bc_plot_df = None
+        invalidated += ["bc_df", "bc_plot_df"]
+
+    results = state.get("search_results")
+    if results is not None:
+        searched = {
+            base_column(c)[3:] for c in set(results.columns) | set(results["y"])
+        }
+        if searched & affected:
+            state.search_results = None
+            state.search_report = None
+            invalidated.append("search_results")
+
+    penalised = state.get("penalised_results")
+    if penalised is not None:
+        selected = penalised[0]
+        fitted = {c[3:] for c in set(selected.columns) | set(selected["y"])}
+        if fitted & affected:
+            state.penalised_results = None
+            invalidated.append("penalised_results")
+
+    return {**diff, "full_reload": False, "invalidated": invalidated}
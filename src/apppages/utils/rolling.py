@@ -0,0 +1,157 @@
+"""
+Rolling and Expanding Window Regressions.
+
+This module estimates how the elasticities of a regression change over time by fitting
+it on every window of the sample: either an expanding window that starts at the first
+observation, or a rolling window of fixed length. Rather than refitting each window
+from scratch, the inverse of the normal-equations matrix X'X is carried from one
+window to the next with Sherman-Morrison rank-one updates as observations are added
+and removed, so the whole path costs O(n k^2) instead of O(n^2 k^2). The inverse is
+recomputed from the exactly accumulated X'X every `refresh` steps to stop rounding
+errors from building up. The data are shifted by their full-sample means first,
+which keeps X'X well conditioned for growth factors close to one.
+
+A rank-one update is only valid while X'X stays invertible. Dummies make singular
+windows common: a step dummy is constant before its date, and a pulse dummy leaves a
+rolling window. When an update would almost zero the determinant of X'X, the
+inverse is dropped and rebuilt from the accumulated X'X instead. Windows where X'X
+is not of full rank have NaN coefficients, as a driver is not identified in them.
+
+Constants:
+- MODES (tuple): The window modes: "expanding" and "rolling".
+
+Functions:
+- rolling_ols(y, X, window, constant, min_nobs, refresh):
+    Returns the coefficients and fit of the regression for every window end.
+"""
+
+import numpy as np
+import pandas as pd
+from apppages.utils.ols import CONSTANT
+
+# Constants
+MODES = ("expanding", "rolling")
+REFRESH_STEPS = 50
+RANK_TOL = 1e-10
+UPDATE_TOL = 1e-8
+
+
+def _inverse(gram):
+    """
+    Return the inverse of X'X, or None if X'X is not of full rank.
+
+    The rank is judged on X'X scaled to a unit diagonal, so that it does not depend
+    on the scale of the drivers.
+    """
+    scale = np.sqrt(np.diag(gram))
+    if not np.all(scale > 0):
+        return None
+    eigenvalues = np.linalg.eigvalsh(gram / np.outer(scale, scale))
+    if eigenvalues[0] <= RANK_TOL * eigenvalues[-1]:
+        return None
+    return np.linalg.inv(gram)
+
+
+def _add_row(inv, x, sign):
+    """
+    Update the inverse of X'X in place for one added (+1) or removed (-1) row.
+
+    Parameters:
+        inv (np.ndarray): The inverse of X'X, shape (k, k).
+        x (np.ndarray): The row, shape (k,).
+        sign (int): +1 to add the row, -1 to remove it.
+
+    Returns:
+        bool: False, leaving `inv` unchanged, if the row (almost) removes a
+              dimension of X'X, whose determinant changes by the factor
+              1 + sign * x' inv x.
+    """
+    u = inv @ x
+    leverage = x @ u
+    denominator = 1 + sign * leverage
+    if abs(denominator) <= UPDATE_TOL * (1 + abs(leverage)):
+        return False
+    inv -= sign * np.outer(u, u) / denominator
+    return True
+
+
+def rolling_ols(y, X, window=None, constant=True, min_nobs=None, refresh=None):
+    """
+    Fit the regression on every expanding or rolling window of the sample.
+
+    Parameters:
+        y (pd.Series): The dependent series, indexed by period.
+        X (pd.DataFrame): The drivers, with the same index as `y`.
+        window (int, optional): Length of the rolling window. None fits expanding
+                                windows that all start at the first observation.
+        constant (bool): Whether the regression includes a constant.
+        min_nobs (int, optional): Smallest number of observations fitted. Defaults
+                                  to the number of parameters plus one.
+        refresh (int, optional): Number of updates after which the inverse is
+                                 recomputed from scratch. Defaults to 50.
+
+    Returns:
+        pd.DataFrame: Indexed by the last period of each window, with one column per
+                      coefficient (plus "const"), "nobs" and "r2". Windows with too
+                      few observations, or where a coefficient is not identified,
+                      are NaN.
+    """
+    refresh = refresh or REFRESH_STEPS
+    names = list(X.columns) + ([CONSTANT] if constant else [])
+    k_params = len(names)
+    min_nobs = max(min_nobs or k_params + 1, k_params + 1)
+    if window is not None:
+        min_nobs = window
+
+    y_shift = y.mean() if constant else 0.0
+    x_shift = X.mean().to_numpy() if constant else np.zeros(X.shape[1])
+    yv = y.to_numpy(dtype=float) - y_shift
+    Z = X.to_numpy(dtype=float) - x_shift
+    if constant:
+        Z = np.column_stack([Z, np.ones(len(Z))])
+
+    n_obs = len(yv)
+    params = np.full((n_obs, k_params), np.nan)
+    nobs = np.zeros(n_obs, dtype=int)
+    r2 = np.full(n_obs, np.nan)
+
+    gram = np.zeros((k_params, k_params))
+    xty = np.zeros(k_params)
+    yty = y_sum = 0.0
+    inv = None
+    updates = 0
+    for t in range(n_obs):
+        rows = [(t, 1)]
+        if window is not None and t >= window:
+            rows.append((t - window, -1))
+        for row, sign in rows:
+            gram += sign * np.outer(Z[row], Z[row])
+            xty += sign * Z[row] * yv[row]
+            yty += sign * yv[row] ** 2
+            y_sum += sign * yv[row]
+            if inv is not None:
+                if _add_row(inv, Z[row], sign):
+                    updates += 1
+                else:
+                    inv = None
+
+        count = min(t + 1, window or n_obs)
+        if count < min_nobs:
+            continue
+        if inv is None or updates >= refresh:
+            inv, updates = _inverse(gram), 0
+        if inv is None:
+            nobs[t] = count
+            continue
+        beta = inv @ xty
+        rss = yty - beta @ xty
+        tss = yty - y_sum**2 / count if constant else yty
+        params[t], nobs[t], r2[t] = beta, count, 1 - rss / tss
+
+    if constant:
+        # Undo the mean shift: y - c0 = a + (x - m0) b  =>  y = (a + c0 - m0 b) + x b
+        params[:, -1] += y_shift - params[:, :-1] @ x_shift
+    path = pd.DataFrame(params, index=y.index, columns=names)
+    path["nobs"] = nobs
+    path["r2"] = r2
+    return path
@@ -6,22 +6,39 @@ within the Streamlit application, focusing on time series data.
 """
 
 import numpy as np
-import pandas as pd
 import streamlit as st
 import plotly.express as px
+from apppages.utils.design import add_design_terms
+from apppages.utils.model_store import (
+    KEY_COLUMNS,
+    X_SEPARATOR,
+    dataset_hash,
+    find_models,
+    load_model,
+    model_spec,
+    params_dict,
+    transform_label,
+)
+from apppages.utils.timeline import format_period, periods_per_year, with_period_labels
+from apppages.utils.transforms import (
+    GrowthTensor,
+    default_horizons,
+    growth_transform,
+    horizon_label,
+)
 
 
 def stringify(i: int = 0) -> str:
     """
-    Convert a slider integer index to a corresponding dataframe index string.
+    Convert a slider integer index to the label of the corresponding dataframe period.
 
     Parameters:
     i (int): The index value from the slider, default is 0.
 
     Returns:
-    str: The corresponding index string from the dataframe.
+    str: The label of the corresponding period of the dataframe, e.g. "2012 Q1".
     """
-    return st.session_state.df_index[i]
+    return format_period(st.session_state.df_index[i])
 
 
 def create_and_show_df(df, slider_value_start, slider_value_end, x_sel, y_sel):
@@ -50,8 +67,8 @@ def create_and_show_df(df, slider_value_start, slider_value_end, x_sel, y_sel):
     for x in x_sel:
         filt_cols.append(x)
 
-    filt_df = df[slider_value_start : slider_value_end + 1][filt_cols]
-    st.dataframe(data=filt_df)
+    filt_df = df.iloc[slider_value_start : slider_value_end + 1][filt_cols]
+    st.dataframe(data=with_period_labels(filt_df))
 
     return filt_df
 
@@ -66,16 +83,8 @@ def visualise_data(df):
     Returns:
     None
     """
-    df_idx = df.index
-    df_x = pd.DataFrame(index=df_idx)
-    df_y = pd.DataFrame(index=df_idx)
-
-    # Split x and y columns into separate dataframes
-    for col in df.columns:
-        if col[0] == "x":
-            df_x[col] = df[col]
-        elif col[0] == "y":
-            df_y[col] = df[col]
+    # Periods are plotted by their timeline labels
+    df = with_period_labels(df)
 
     # Create a line plot for the original data
     fig = px.line(
@@ -101,45 +110,301 @@ def visualise_data(df):
 
 def stringify_g_df(i: int = 0) -> str:
     """
-    Convert a slider integer index to a corresponding growth dataframe index string.
+    Convert a slider integer index to the label of the corresponding growth dataframe period.
 
     Parameters:
     i (int): The index value from the slider, default is 0.
 
     Returns:
-    str: The corresponding index string from the growth dataframe.
+    str: The label of the corresponding period of the growth dataframe, e.g. "2012 Q1".
     """
-    return st.session_state.g_df_idx[i]
+    return format_period(st.session_state.g_df_idx[i])
 
 
 def growth_df(df):
     """
     Calculate growth rates for variables in the dataframe based on their types.
 
+    The lag is the number of periods per year of the dataframe's timeline, and the
+    dataframe itself is not modified (see `growth_transform`).
+
     Parameters:
     df (pd.DataFrame): The dataframe containing the original data.
 
     Returns:
     tuple: A tuple containing the growth dataframe and its index.
     """
-    prd = 4  # Quarterly data
+    g_df = growth_transform(df, st.session_state.var_dict)
+    return g_df, g_df.index
+
+
+def growth_settings():
+    """
+    Let the user configure the growth tensor and rebuild it if the settings changed.
 
-    # Identify columns of each type and calculate growth rates
-    for df_col in df.columns:
-        var_type = st.session_state.var_dict[df_col[2:]]
-        if var_type == "abs":
-            df["g: " + df_col] = df[df_col].pct_change(periods=prd) + 1
-        elif var_type == "pct_val_or_dummy":
-            df["g: " + df_col] = np.exp(df[df_col] - df[df_col].shift(prd))
-        elif var_type == "pct_change":
-            df["g: " + df_col] = df[df_col] + 1
+    Returns:
+    GrowthTensor: The growth tensor of the loaded inputs.
+    """
+    prd = periods_per_year(st.session_state.df_index)
+    candidates = sorted({1, 2, 3, prd, 2 * prd, 3 * prd, 5 * prd})
+    with st.expander("Growth settings"):
+        horizons = st.multiselect(
+            "Horizons to precompute:",
+            options=candidates,
+            default=[h for h in st.session_state.growth_settings["horizons"] or []]
+            or list(default_horizons(prd)),
+            format_func=lambda h: horizon_label(h, prd),
+        )
+        log = st.checkbox(
+            "Use log differences instead of growth factors",
+            value=st.session_state.growth_settings["log"],
+        )
+        float32 = st.checkbox(
+            "Store in single precision (halves memory use)",
+            value=st.session_state.growth_settings["float32"],
+        )
+    settings = {
+        "horizons": sorted(set(horizons)) or [prd],
+        "log": log,
+        "float32": float32,
+    }
+    if (
+        st.session_state.growth_tensor is None
+        or settings != st.session_state.growth_settings
+    ):
+        st.session_state.growth_settings = settings
+        st.session_state.growth_tensor = GrowthTensor.from_frame(
+            st.session_state.df,
+            st.session_state.var_dict,
+            horizons=settings["horizons"],
+            log=log,
+            dtype=np.float32 if float32 else np.float64,
+        )
+        st.session_state.g_df = None
+    st.caption(f"Growth tensor: {st.session_state.growth_tensor.describe()}")
+    return st.session_state.growth_tensor
+
+
+def select_growth_horizon(tensor, key=None):
+    """
+    Let the user pick a horizon of the growth tensor and point `g_df` at it.
 
-    # Filter growth columns and drop rows with all NaN values
-    g_cols = [c for c in df.columns if c.startswith("g:")]
-    g_df = df[g_cols].dropna(how="all")
-    g_df_idx = g_df.index
+    Switching horizon only slices the precomputed tensor. The regression dataframe
+    and model search results are cleared because they come from the previous
+    horizon's growth rates.
+
+    Parameters:
+    tensor (GrowthTensor): The growth tensor of the loaded inputs.
+    key (str, optional): Widget key, needed when several pages show the selector.
+
+    Returns:
+    int: The selected horizon in periods.
+    """
+    prd = periods_per_year(tensor.index)
+    current = st.session_state.horizon
+    if current not in tensor.horizons:
+        current = prd if prd in tensor.horizons else tensor.horizons[0]
+    horizon = st.selectbox(
+        "Growth horizon:",
+        options=tensor.horizons,
+        index=tensor.horizons.index(current),
+        format_func=lambda h: horizon_label(h, prd),
+        key=key,
+    )
+    if horizon != st.session_state.horizon or st.session_state.g_df is None:
+        if st.session_state.horizon is not None and horizon != st.session_state.horizon:
+            st.session_state.r_df = None
+            st.session_state.search_results = None
+            st.session_state.search_report = None
+            st.session_state.penalised_results = None
+        st.session_state.horizon = horizon
+        st.session_state.g_df, st.session_state.design_columns = add_design_terms(
+            tensor.frame(horizon), st.session_state.design_terms
+        )
+        st.session_state.g_df_idx = st.session_state.g_df.index
+    return horizon
+
+
+def session_model_spec(y_col, x_cols, constant, window):
+    """
+    Build the model store specification of a regression on the loaded inputs.
 
-    return g_df, g_df_idx
+    Parameters:
+    y_col (str): The dependent growth column.
+    x_cols (list): The driver growth columns.
+    constant (bool): Whether the regression includes a constant.
+    window (tuple): The first and last period of the estimation window.
+
+    Returns:
+    dict: The specification, see `model_spec`.
+    """
+    return model_spec(
+        dataset_hash(st.session_state.df_hashes),
+        y_col,
+        x_cols,
+        constant,
+        window,
+        transform_label(st.session_state.horizon, st.session_state.growth_settings),
+    )
+
+
+def _set_horizon(horizon):
+    """
+    Point `g_df` at another horizon of the growth tensor, as `select_growth_horizon`.
+
+    The horizon selectors are reset so that they show the new horizon.
+
+    Parameters:
+    horizon (int): One of the horizons of the growth tensor.
+
+    Returns:
+    None
+    """
+    state = st.session_state
+    if horizon == state.horizon:
+        return
+    state.horizon = horizon
+    state.g_df, state.design_columns = add_design_terms(
+        state.growth_tensor.frame(horizon), state.design_terms
+    )
+    state.g_df_idx = state.g_df.index
+    state.r_df = None
+    state.search_results = None
+    state.search_report = None
+    state.penalised_results = None
+    for key in ("regression_horizon", "backcast_horizon", "regression_window"):
+        state.pop(key, None)
+
+
+def session_cached(name, inputs, compute):
+    """
+    Return `compute()`, reusing the last result while its inputs are unchanged.
+
+    Streamlit reruns the whole page on every widget change, also inside collapsed
+    expanders. Sections that fit many models keep their last result in session state
+    under `name`, together with the inputs it was computed from. The loaded data,
+    growth horizon and generated terms are always part of the inputs.
+
+    Parameters:
+    name (str): Session state key of the result.
+    inputs (tuple): The section's own inputs, compared with ==.
+    compute (callable): Computes the result from scratch.
+
+    Returns:
+    The result of `compute()` for these inputs.
+    """
+    state = st.session_state
+    inputs = (
+        dataset_hash(state.df_hashes),
+        state.horizon,
+        state.design_terms,
+        *inputs,
+    )
+    cached = state.get(name)
+    if cached is not None and cached[0] == inputs:
+        return cached[1]
+    result = compute()
+    state[name] = (inputs, result)
+    return result
+
+
+def select_model(y_col, x_cols, params, horizon=None, window=None):
+    """
+    Make a model the selection of the Regression Control page.
+
+    Run as a button callback, before the page reruns, so that the variable and
+    window widgets show the model and the single fit does not replace its
+    coefficients with those of the previous selection. The model's coefficients are
+    kept for the Model Evaluation page until the regression dataframe is updated.
+
+    Parameters:
+    y_col (str): The dependent growth column.
+    x_cols (list): The driver growth columns.
+    params (dict): Coefficient of each driver and of the constant.
+    horizon (int, optional): Growth horizon the model was estimated at.
+    window (tuple, optional): First and last period of the estimation window, as
+                              strings, e.g. ("2013Q1", "2023Q4").
+
+    Returns:
+    None
+    """
+    state = st.session_state
+    if horizon is not None:
+        _set_horizon(horizon)
+    if window is not None:
+        periods = list(state.g_df.index.astype(str))
+        if window[0] in periods and window[1] in periods:
+            state.regression_window_default = (
+                periods.index(window[0]),
+                periods.index(window[1]),
+            )
+            state.pop("regression_window", None)
+    state.y_sel_widget = y_col
+    state.x_sel_widget = list(x_cols)
+    state.y_sel_g = y_col
+    state.x_sel_g = list(x_cols)
+    state.model_params = dict(params)
+    state.model_intervals = None
+    # Refitting the previous regression dataframe would overwrite the coefficients
+    state.r_df = None
+
+
+def stored_models_section():
+    """
+    Let the user reload a model fitted earlier on the loaded inputs.
+
+    Loading a stored model makes it the model used on the Model Evaluation page,
+    also after a browser refresh has cleared the session. Its growth horizon and
+    estimation window are restored with it; a model fitted with other log or
+    precision settings cannot be loaded until the settings match.
+
+    Returns:
+    None
+    """
+    with st.expander("Stored models for this dataset"):
+        models = find_models(dataset_hash=dataset_hash(st.session_state.df_hashes))
+        if models.empty:
+            st.info("No model has been fitted on this dataset yet.")
+            return
+        st.dataframe(models.drop(columns="dataset_hash"), hide_index=True)
+        choice = st.selectbox(
+            "Stored model:",
+            options=models.index,
+            format_func=lambda i: (
+                f"{models.at[i, 'y']} ~ {models.at[i, 'x_set']} "
+                f"({models.at[i, 'window_start']}–{models.at[i, 'window_end']}, "
+                f"{models.at[i, 'transform']})"
+            ),
+        )
+        spec = models.loc[choice, KEY_COLUMNS].to_dict()
+        horizons = [
+            h
+            for h in st.session_state.growth_tensor.horizons
+            if transform_label(h, st.session_state.growth_settings) == spec["transform"]
+        ]
+        if not horizons:
+            st.warning(
+                f"This model was fitted on growth transform '{spec['transform']}', "
+                "which the current growth settings do not provide. Change the "
+                "growth settings on the Regression Control page to load it."
+            )
+            return
+        fit = load_model(spec)
+        if fit is None:
+            st.error("The stored files of this model could not be read.")
+            return
+        if st.button(
+            "Load this model",
+            on_click=select_model,
+            args=(
+                spec["y"],
+                spec["x_set"].split(X_SEPARATOR),
+                params_dict(fit),
+                horizons[0],
+                (spec["window_start"], spec["window_end"]),
+            ),
+        ):
+            st.success(f"Loaded {spec['y']} ~ {spec['x_set']}.")
 
 
 def growth_list(elements):
@@ -0,0 +1,147 @@
+"""
+Timeline Index Utilities.
+
+The Excel template labels its timeline with strings such as "2012 Q1", "2012 Jan"
+or "2012" (see `generate_timeline`). This module converts those labels into a pandas
+`PeriodIndex` with a real frequency, which is what the DataFrames used throughout the
+app are indexed by, and back into the same strings for display.
+
+Constants:
+- FREQUENCIES (dict): Template timestep name to pandas period frequency.
+- PERIODS_PER_YEAR (dict): Pandas period frequency to number of periods per year.
+
+Functions:
+- labels_to_period_index(labels):
+    Parses template timeline labels into a PeriodIndex.
+
+- format_period(period):
+    Formats a single period as its template label, e.g. "2012 Q1".
+
+- period_labels(index):
+    Formats every period of an index as its template label.
+
+- with_period_labels(df):
+    Returns a copy of a DataFrame indexed by template labels, for display.
+
+- periods_per_year(index):
+    Returns the number of periods per year of a PeriodIndex.
+"""
+
+from calendar import month_abbr
+
+import numpy as np
+import pandas as pd
+
+# Constants
+FREQUENCIES = {"Monthly": "M", "Quarterly": "Q", "Yearly": "Y"}
+PERIODS_PER_YEAR = {"M": 12, "Q": 4, "Y": 1}
+MONTHS = {name: number for number, name in enumerate(month_abbr) if name}
+
+
+def _freq_code(index):
+    """Return the single-letter frequency code ("M", "Q" or "Y") of a PeriodIndex."""
+    return index.freqstr[0]
+
+
+def labels_to_period_index(labels):
+    """
+    Parse template timeline labels into a PeriodIndex.
+
+    Labels may be quarterly ("2012 Q1"), monthly ("2012 Jan") or yearly ("2012"),
+    and all labels must share the same frequency.
+
+    Parameters:
+        labels (list): The timeline labels as strings.
+
+    Returns:
+        pd.PeriodIndex: The timeline with a monthly, quarterly or yearly frequency.
+
+    Raises:
+        ValueError: If a label does not follow one of the template formats.
+    """
+    parts = pd.Series([str(label).strip() for label in labels], dtype=object)
+    if parts.empty:
+        return pd.PeriodIndex([], freq="Y")
+    split = parts.str.split(" ", n=1, expand=True)
+    try:
+        years = split[0].astype(int).to_numpy() - 1970
+        if split.shape[1] == 1 or split[1].isna().all():
+            return pd.PeriodIndex.from_ordinals(years, freq="Y")
+        steps = split[1]
+        if steps.str.match(r"^Q[1-4]$").all():
+            quarters = steps.str[1:].astype(int).to_numpy()
+            return pd.PeriodIndex.from_ordinals(years * 4 + quarters - 1, freq="Q")
+        months = steps.map(MONTHS)
+        if months.notna().all():
+            months = months.astype(int).to_numpy()
+            return pd.PeriodIndex.from_ordinals(years * 12 + months - 1, freq="M")
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Unrecognised timeline labels: {e}") from e
+    raise ValueError(
+        "Unrecognised timeline labels: expected e.g. '2012 Q1', '2012 Jan' or '2012'."
+    )
+
+
+def format_period(period):
+    """
+    Format a period as its template timeline label.
+
+    Parameters:
+        period (pd.Period): A monthly, quarterly or yearly period.
+
+    Returns:
+        str: The label, e.g. "2012 Q1", "2012 Jan" or "2012".
+    """
+    code = period.freqstr[0]
+    if code == "Q":
+        return f"{period.year} Q{period.quarter}"
+    if code == "M":
+        return f"{period.year} {month_abbr[period.month]}"
+    return str(period.year)
+
+
+def period_labels(index):
+    """
+    Format every period of an index as its template timeline label.
+
+    Parameters:
+        index (pd.PeriodIndex): A monthly, quarterly or yearly timeline.
+
+    Returns:
+        list: The labels as strings. A non-period index is returned as strings as is.
+    """
+    if not isinstance(index, pd.PeriodIndex):
+        return [str(i) for i in index]
+    years = index.year.astype(str)
+    code = _freq_code(index)
+    if code == "Q":
+        return list(years + " Q" + index.quarter.astype(str))
+    if code == "M":
+        return list(years + " " + np.array(month_abbr, dtype=object)[index.month])
+    return list(years)
+
+
+def with_period_labels(df):
+    """
+    Return a copy of a DataFrame indexed by template labels, for display.
+
+    Parameters:
+        df (pd.DataFrame): A DataFrame indexed by a PeriodIndex.
+
+    Returns:
+        pd.DataFrame: The same data indexed by timeline label strings.
+    """
+    return df.set_axis(period_labels(df.index), axis=0)
+
+
+def periods_per_year(index):
+    """
+    Return the number of periods per year of a timeline.
+
+    Parameters:
+        index (pd.PeriodIndex): A monthly, quarterly or yearly timeline.
+
+    Returns:
+        int: 12, 4 or 1.
+    """
+    return PERIODS_PER_YEAR[_freq_code(index)]
@@ -0,0 +1,282 @@
+"""
+Growth Transforms.
+
+This module turns the raw input variables into the growth factors used by the
+regressions. The transform applied to each variable depends on its "abs/pct" type:
+
+- "abs": the ratio to the value one year earlier, x[t] / x[t - p].
+- "pct_val_or_dummy": the exponential of the difference to the value one year
+  earlier, exp(x[t] - x[t - p]).
+- "pct_change": the growth rate as a factor, x[t] + 1.
+
+Here p is the number of periods per year of the data's timeline (12, 4 or 1), taken
+from its PeriodIndex. Columns are grouped by type and each group is transformed with a
+single NumPy operation on its 2-D block of values, so the cost does not grow with a
+Python loop over the variables.
+
+`GrowthTensor` applies the same transforms for several horizons at once (e.g. one
+period, one year and three years) and keeps the results as one horizon x time x
+variable array, optionally as log differences and in single precision. Switching
+between horizons then only slices the array. A "pct_change" variable already holds a
+growth rate, so its factor is the same at every horizon.
+
+Constants:
+- GROWTH_PREFIX (str): Prefix of the growth column names, e.g. "g: y:Traffic".
+
+Classes:
+- GrowthTensor: Growth factors or log differences for several horizons.
+
+Functions:
+- growth_transform(df, var_dict, prd):
+    Returns a new DataFrame of growth factors for the variables of `df`.
+
+- default_horizons(prd):
+    Returns the default horizons (one period, one year, three years) in periods.
+
+- horizon_label(horizon, prd):
+    Describes a horizon in words, e.g. "1 year (4 periods)".
+"""
+
+import numpy as np
+import pandas as pd
+from apppages.utils.timeline import periods_per_year
+from apppages.utils.validation import VALID_TYPES
+
+# Constants
+GROWTH_PREFIX = "g: "
+
+
+def _growth_block(values, types, lag, log=False):
+    """
+    Transform a 2-D block of values into growth factors for one lag.
+
+    Parameters:
+        values (np.ndarray): Array of shape (time, variables).
+        types (np.ndarray): The type of each variable.
+        lag (int): The lag in periods.
+        log (bool): Return the natural logarithm of the growth factors instead.
+
+    Returns:
+        np.ndarray: Array of the same shape as `values`, NaN where the lagged value
+                    is not available or the type is not recognised.
+    """
+    growth = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if 0 < lag < len(values):
+            current, lagged = values[lag:], values[:-lag]
+
+            is_abs = types == "abs"
+            ratio = current[:, is_abs] / lagged[:, is_abs]
+            growth[lag:, is_abs] = np.log(ratio) if log else ratio
+
+            is_pct_val = types == "pct_val_or_dummy"
+            diff = current[:, is_pct_val] - lagged[:, is_pct_val]
+            growth[lag:, is_pct_val] = diff if log else np.exp(diff)
+
+        is_pct_change = types == "pct_change"
+        rate = values[:, is_pct_change]
+        growth[:, is_pct_change] = np.log1p(rate) if log else rate + 1
+    return growth
+
+
+def _column_types(df, var_dict):
+    """Return the type of each column of `df` as an object array."""
+    return np.array([var_dict.get(col[2:]) for col in df.columns], dtype=object)
+
+
+def growth_transform(df, var_dict, prd=None):
+    """
+    Calculate the growth factor of every variable according to its type.
+
+    The input DataFrame is not modified. Variables whose type is not recognised are
+    left out, and rows where every growth factor is missing are dropped.
+
+    Parameters:
+        df (pd.DataFrame): The raw variables, indexed by a PeriodIndex.
+        var_dict (dict): Variable name (without the "y:"/"x:" prefix) to type mapping.
+        prd (int, optional): The lag in periods. Defaults to the number of periods
+                             per year of the index.
+
+    Returns:
+        pd.DataFrame: The growth factors in columns named "g: {column}", in the order
+                      of the input columns.
+    """
+    if prd is None:
+        prd = periods_per_year(df.index)
+    types = _column_types(df, var_dict)
+    growth = _growth_block(df.to_numpy(dtype=float), types, prd)
+
+    known = np.isin(types, VALID_TYPES)
+    g_df = pd.DataFrame(
+        growth[:, known],
+        index=df.index,
+        columns=[GROWTH_PREFIX + col for col in df.columns[known]],
+    )
+    return g_df.dropna(how="all")
+
+
+def default_horizons(prd):
+    """
+    Return the default growth horizons for a timeline.
+
+    Parameters:
+        prd (int): The number of periods per year (12, 4 or 1).
+
+    Returns:
+        tuple: One period, one year and three years, in periods, without repeats.
+    """
+    return tuple(sorted({1, prd, 3 * prd}))
+
+
+def horizon_label(horizon, prd):
+    """
+    Describe a horizon in words.
+
+    Parameters:
+        horizon (int): The horizon in periods.
+        prd (int): The number of periods per year (12, 4 or 1).
+
+    Returns:
+        str: E.g. "1 period", "1 year (4 periods)" or "3 years (12 periods)".
+    """
+    periods = f"{horizon} period{'s' if horizon != 1 else ''}"
+    if horizon % prd or prd == 1:
+        return periods
+    years = horizon // prd
+    return f"{years} year{'s' if years != 1 else ''} ({periods})"
+
+
+class GrowthTensor:
+    """
+    Growth factors (or log differences) of every variable for several horizons.
+
+    The values are held in one array of shape (horizons, time, variables) covering the
+    full timeline of the inputs, with NaN where a lagged value is not available.
+
+    Attributes:
+        values (np.ndarray): The horizon x time x variable array.
+        horizons (tuple): The horizons in periods, in the order of the first axis.
+        index (pd.PeriodIndex): The timeline, along the second axis.
+        columns (pd.Index): The growth column names ("g: {column}"), along the third.
+        types (np.ndarray): The type of each input variable.
+        log (bool): Whether the values are log differences rather than factors.
+    """
+
+    def __init__(self, values, horizons, index, columns, types, log=False):
+        self.values = values
+        self.horizons = tuple(horizons)
+        self.index = index
+        self.columns = pd.Index(columns)
+        self.types = types
+        self.log = log
+
+    @classmethod
+    def from_frame(cls, df, var_dict, horizons=None, log=False, dtype=np.float64):
+        """
+        Compute the growth tensor of the inputs in one pass over the horizons.
+
+        Parameters:
+            df (pd.DataFrame): The raw variables, indexed by a PeriodIndex.
+            var_dict (dict): Variable name to type mapping.
+            horizons (iterable, optional): The horizons in periods. Defaults to
+                                           `default_horizons` of the timeline.
+            log (bool): Store log differences instead of growth factors.
+            dtype (np.dtype): Storage type, e.g. np.float32 to halve memory use.
+
+        Returns:
+            GrowthTensor: The growth tensor. Variables of unknown type are left out.
+        """
+        if horizons is None:
+            horizons = default_horizons(periods_per_year(df.index))
+        horizons = tuple(sorted(set(int(h) for h in horizons)))
+        types = _column_types(df, var_dict)
+        known = np.isin(types, VALID_TYPES)
+        values = df.to_numpy(dtype=float)[:, known]
+        types = types[known]
+
+        tensor = np.empty((len(horizons), *values.shape), dtype=dtype)
+        for i, horizon in enumerate(horizons):
+            tensor[i] = _growth_block(values, types, horizon, log)
+        columns = [GROWTH_PREFIX + col for col in df.columns[known]]
+        return cls(tensor, horizons, df.index, columns, types, log)
+
+    @property
+    def nbytes(self):
+        """int: Memory used by the values array in bytes."""
+        return self.values.nbytes
+
+    def describe(self):
+        """
+        Summarise the shape and memory use of the tensor.
+
+        Returns:
+            str: E.g. "3 horizons x 48 periods x 12 variables, 0.01 MB (float64)".
+        """
+        n_horizons, n_periods, n_variables = self.values.shape
+        return (
+            f"{n_horizons} horizons x {n_periods} periods x {n_variables} variables, "
+            f"{self.nbytes / 1024**2:.2f} MB ({self.values.dtype})"
+        )
+
+    def frame(self, horizon, factors=False):
+        """
+        Return the growth of every variable at one horizon as a DataFrame.
+
+        Rows where every value is missing are dropped, as in `growth_transform`.
+
+        Parameters:
+            horizon (int): One of `horizons`, in periods.
+            factors (bool): Return growth factors even if the tensor holds log
+                            differences.
+
+        Returns:
+            pd.DataFrame: The growth in columns named "g: {column}".
+        """
+        values = self.values[self.horizons.index(horizon)]
+        if factors and self.log:
+            values = np.exp(values)
+        return pd.DataFrame(values, index=self.index, columns=self.columns).dropna(
+            how="all"
+        )
+
+    def update(self, df, var_dict, refresh, removed):
+        """
+        Return a tensor for new inputs, recomputing only the given variables.
+
+        The timeline of `df` must be the same as that of the tensor.
+
+        Parameters:
+            df (pd.DataFrame): The new raw variables.
+            var_dict (dict): Variable name to type mapping.
+            refresh (list): Input columns whose growth must be recomputed.
+            removed (list): Input columns that no longer exist.
+
+        Returns:
+            GrowthTensor: The updated tensor, with columns in the order of `df`.
+        """
+        fresh = GrowthTensor.from_frame(
+            df[refresh], var_dict, self.horizons, self.log, self.values.dtype
+        )
+        stale = {GROWTH_PREFIX + col for col in refresh + removed}
+        keep = [i for i, col in enumerate(self.columns) if col not in stale]
+        values = np.concatenate(
+            [self.values[:, :, keep], fresh.values.astype(self.values.dtype)], axis=2
+        )
+        columns = self.columns[keep].append(fresh.columns)
+        types = np.concatenate([self.types[keep], fresh.types])
+
+        order = columns.get_indexer(
+            [
+                GROWTH_PREFIX + col
+                for col in df.columns
+                if GROWTH_PREFIX + col in columns
+            ]
+        )
+        return GrowthTensor(
+            values[:, :, order],
+            self.horizons,
+            self.index,
+            columns[order],
+            types[order],
+            self.log,
+        )
@@ -0,0 +1,248 @@
+"""
+Input Template Validation.
+
+This module checks a scanned input template (see `scan_spreadsheet`) before it is
+turned into a DataFrame. All checks run together on the whole numeric block as array
+operations, so a single load reports every problem in the workbook at once instead of
+stopping at the first one.
+
+Checks:
+- "non_numeric": a text (or other non-numeric) cell inside the timeline.
+- "gap": a blank cell inside the timeline that is followed by further values.
+- "ragged": a series whose length differs from the timeline, or that has values
+  beyond the last timeline period.
+- "duplicate": a variable name that appears more than once.
+- "unknown_type": a variable whose "abs/pct" type is missing or not recognised.
+- "timeline": timeline labels that cannot be parsed into periods.
+
+Constants:
+- VALID_TYPES (tuple): The recognised variable types.
+- REPORT_COLUMNS (list): Columns of the validation report.
+
+Classes:
+- InputValidationError: Raised when a template fails validation; carries the report.
+
+Functions:
+- validate_scan(scan, numeric):
+    Runs every check on a scanned template and returns the validation report.
+
+- validate_frame(df, var_dict):
+    Runs every check on inputs read from another file type than the template.
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+from apppages.utils.timeline import labels_to_period_index, period_labels
+
+# Constants
+VALID_TYPES = ("abs", "pct_change", "pct_val_or_dummy")
+REPORT_COLUMNS = ["check", "variable", "cell", "period", "message"]
+FIRST_DATA_COLUMN = 7  # Column G
+
+
+class InputValidationError(ValueError):
+    """Raised when an input template fails validation; `report` lists every issue."""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(
+            f"The input template has {len(report)} issue(s): "
+            + ", ".join(
+                f"{count} {check}"
+                for check, count in report["check"].value_counts().items()
+            )
+        )
+
+
+def _cell_issues(check, mask, scan, message):
+    """
+    Build report rows for every flagged cell of the numeric block.
+
+    Parameters:
+        check (str): The name of the check.
+        mask (np.ndarray): Boolean array (variables x timeline columns) of flagged cells.
+        scan (dict): The scanned template.
+        message (str): Description of the issue.
+
+    Returns:
+        pd.DataFrame: One report row per flagged cell.
+    """
+    var_idx, col_idx = np.nonzero(mask)
+    labels = np.array(scan["labels"] + [None], dtype=object)
+    rows = np.array(scan["rows"], dtype=int)[var_idx]
+    return pd.DataFrame(
+        {
+            "check": check,
+            "variable": np.array(scan["names"], dtype=object)[var_idx],
+            "cell": [
+                f"{get_column_letter(FIRST_DATA_COLUMN + c)}{r}"
+                for c, r in zip(col_idx, rows)
+            ],
+            "period": labels[np.minimum(col_idx, len(labels) - 1)],
+            "message": message,
+        },
+        columns=REPORT_COLUMNS,
+    )
+
+
+def validate_scan(scan, numeric):
+    """
+    Run every validation check on a scanned template.
+
+    Parameters:
+        scan (dict): The scanned template returned by `scan_spreadsheet`.
+        numeric (np.ndarray): Object array of the same shape as `scan["values"]`
+                              holding each cell as a float, or None if not numeric.
+
+    Returns:
+        pd.DataFrame: The validation report with columns "check", "variable", "cell",
+                      "period" and "message"; empty if the template is valid.
+    """
+    values = scan["values"]
+    names = scan["names"]
+    n_periods = len(scan["labels"])
+    issues = []
+
+    is_numeric = np.not_equal(numeric, None)
+    is_blank = np.equal(values, None)
+    in_timeline = np.arange(values.shape[1]) < n_periods
+
+    issues.append(
+        _cell_issues(
+            "non_numeric",
+            ~is_numeric & ~is_blank & in_timeline,
+            scan,
+            "Cell is not a number.",
+        )
+    )
+    # Blanks followed by a later number in the same series; trailing blanks are
+    # reported once per series by the "ragged" check below
+    numeric_later = np.flip(
+        np.logical_or.accumulate(np.flip(is_numeric & in_timeline, axis=1), axis=1),
+        axis=1,
+    )
+    issues.append(
+        _cell_issues(
+            "gap", is_blank & in_timeline & numeric_later, scan, "Cell is blank."
+        )
+    )
+
+    # Series-level checks on the length of each variable's run of numbers
+    padded = np.concatenate([is_numeric, np.zeros((len(names), 1), bool)], axis=1)
+    lengths = np.argmin(padded, axis=1)
+    beyond = (is_numeric & ~in_timeline).sum(axis=1)
+    series = pd.DataFrame(
+        {"variable": names, "length": lengths, "beyond": beyond, "row": scan["rows"]}
+    )
+    short = series[series["length"] != n_periods]
+    issues.append(
+        pd.DataFrame(
+            {
+                "check": "ragged",
+                "variable": short["variable"],
+                "cell": "D" + short["row"].astype(str),
+                "message": [
+                    f"Series has {n} value(s) but the timeline has {n_periods} period(s)."
+                    for n in short["length"]
+                ],
+            },
+            columns=REPORT_COLUMNS,
+        )
+    )
+    long = series[series["beyond"] > 0]
+    issues.append(
+        pd.DataFrame(
+            {
+                "check": "ragged",
+                "variable": long["variable"],
+                "cell": "D" + long["row"].astype(str),
+                "message": [
+                    f"{n} value(s) beyond the last timeline period."
+                    for n in long["beyond"]
+                ],
+            },
+            columns=REPORT_COLUMNS,
+        )
+    )
+
+    # Variable names and types
+    bare_names = pd.Series([name[2:] for name in names], dtype=object)
+    duplicated = series[bare_names.duplicated(keep=False).to_numpy()]
+    issues.append(
+        pd.DataFrame(
+            {
+                "check": "duplicate",
+                "variable": duplicated["variable"],
+                "cell": "D" + duplicated["row"].astype(str),
+                "message": "Variable name appears more than once.",
+            },
+            columns=REPORT_COLUMNS,
+        )
+    )
+    types = bare_names.map(scan["var_dict"])
+    unknown = series[(~types.isin(VALID_TYPES)).to_numpy()]
+    issues.append(
+        pd.DataFrame(
+            {
+                "check": "unknown_type",
+                "variable": unknown["variable"],
+                "cell": "E" + unknown["row"].astype(str),
+                "message": [
+                    f"Type {t!r} is not one of {', '.join(VALID_TYPES)}."
+                    for t in types[unknown.index]
+                ],
+            },
+            columns=REPORT_COLUMNS,
+        )
+    )
+
+    try:
+        labels_to_period_index(scan["labels"])
+    except ValueError as e:
+        issues.append(
+            pd.DataFrame(
+                [{"check": "timeline", "message": str(e)}], columns=REPORT_COLUMNS
+            )
+        )
+
+    issues = [issue for issue in issues if not issue.empty]
+    if not issues:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(issues, ignore_index=True)
+
+
+def validate_frame(df, var_dict):
+    """
+    Run every validation check on inputs read from another file type than the template.
+
+    The cells are checked as they were read, so a text cell is reported like in the
+    template instead of failing the conversion to numbers. There are no worksheet
+    cells to point at, so the "cell" column of the report is left empty.
+
+    Parameters:
+        df (pd.DataFrame): One "y:{name}" or "x:{name}" column per variable, indexed
+                           by the timeline labels or by a PeriodIndex.
+        var_dict (dict): Variable name to type mapping.
+
+    Returns:
+        pd.DataFrame: The validation report, see `validate_scan`.
+    """
+    values = df.T.to_numpy(dtype=object)
+    cells = pd.DataFrame(values)
+    blank = cells.isna() | cells.apply(lambda col: col.astype(str).str.strip() == "")
+    numbers = cells.apply(pd.to_numeric, errors="coerce")
+    labels = df.index
+    if isinstance(labels, pd.PeriodIndex):
+        labels = period_labels(labels)
+    scan = {
+        "values": np.where(blank, None, values),
+        "names": list(df.columns),
+        "labels": list(labels),
+        "rows": np.zeros(len(df.columns), dtype=int),
+        "var_dict": var_dict,
+    }
+    numeric = np.where(blank | numbers.isna(), None, numbers.to_numpy(dtype=object))
+    report = validate_scan(scan, numeric)
+    report["cell"] = None
+    return report
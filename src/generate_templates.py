@@ -0,0 +1,17 @@
+"""
+Bulk Template Generation Command.
+
+Generates the Excel input templates of every project listed in a YAML or JSON
+manifest. Run it from the repository root so the bundled Excel template is found:
+
+    python src/generate_templates.py manifest.yaml --workers 4
+
+See `apppages/utils/bulk_templates.py` for the manifest format.
+"""
+
+import sys
+
+from apppages.utils.bulk_templates import main
+
+if __name__ == "__main__":
+    sys.exit(main())